@@ -0,0 +1,384 @@
+"""
+Multi-snake arena on one shared board.
+
+Arena runs many snakes at once (AI or scripted) on a single OccupancyGrid. Each snake is an
+engine.Snake marking its blocks on the grid's snake layer, so collisions are resolved per tick by
+cell lookups rather than by comparing snakes pairwise:
+
+  1. every living snake turns and moves; tails leave their cells before any head is checked, so
+     a snake may follow another one's tail into the cell it just left;
+  2. the heads are gathered in a dict from cell to snakes, a spatial hash of this tick's heads;
+  3. a head off the board, on an obstacle, on a cell shared with another head (head-to-head) or on
+     a cell holding more blocks than heads (head-to-body, including its own body) kills its snake;
+  4. a head on a fruit grows its snake and moves the fruit to a free cell.
+
+A tick costs O(snakes) plus the length of the snakes that died, which are taken off the grid. Dead
+snakes come back respawn_ticks later, three blocks long on a random free stretch of the board.
+
+    python arena.py --board 200 --snakes 100 --ticks 2000
+    python arena.py --board 60 --snakes 20 --watch
+"""
+import argparse
+import random
+import time
+
+from engine import DIRECTIONS, STOP, Item, Snake
+from grid import OccupancyGrid
+
+START_LENGTH = 3
+SPAWN_ATTEMPTS = 32
+
+DEATH_WALL = 'wall'
+DEATH_OBSTACLE = 'obstacle'
+DEATH_HEAD = 'head'
+DEATH_BODY = 'body'
+
+
+class Contestant:
+    """
+    One snake of the arena and its record.
+
+    Attributes
+    ----------
+    snake : engine.Snake
+        The snake, on the arena's shared grid.
+    alive : bool
+        Whether the snake is on the board.
+    score : int
+        Fruits eaten since the snake last spawned.
+    best : int
+        Highest score reached.
+    deaths : int
+        Number of times the snake died.
+    respawn_tick : int
+        Tick at which a dead snake comes back.
+    """
+    __slots__ = ('snake', 'alive', 'score', 'best', 'deaths', 'respawn_tick')
+
+    def __init__(self, snake):
+        self.snake = snake
+        self.alive = False
+        self.score = 0
+        self.best = 0
+        self.deaths = 0
+        self.respawn_tick = 0
+
+
+class Arena:
+    """
+    Runs many snakes on one board.
+
+    step() advances every snake by one tick. The deaths of the last step are in the deaths list as
+    (index, cause) pairs, and the number of deaths of each cause since reset() in death_counts.
+    """
+
+    def __init__(self, width=100, height=100, snakes=20, fruits=None, obstacles=0, respawn_ticks=10, seed=None):
+        """
+        Initializes the arena and starts a round.
+        Args:
+            width (int, optional): Board width in cells. Defaults to 100.
+            height (int, optional): Board height in cells. Defaults to 100.
+            snakes (int, optional): Number of snakes. Defaults to 20.
+            fruits (int, optional): Number of fruits on the board. Defaults to one per snake.
+            obstacles (int, optional): Number of obstacles on the board. Defaults to 0.
+            respawn_ticks (int, optional): Ticks a dead snake waits before it comes back, or None
+                to leave dead snakes off the board. Defaults to 10.
+            seed (int, optional): Seed for the arena's random number generator. Defaults to None.
+        """
+        self.width = width
+        self.height = height
+        self.snake_count = snakes
+        self.fruit_count = snakes if fruits is None else fruits
+        self.obstacle_count = obstacles
+        self.respawn_ticks = respawn_ticks
+        self.rng = random.Random()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """
+        Starts a new round on an empty board.
+        Args:
+            seed (int, optional): Seed for the round. Defaults to None, which picks a fresh seed.
+        """
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.rng.seed(seed)
+        self.grid = grid = OccupancyGrid(self.width, self.height)
+        self.tick = 0
+        self.deaths = []
+        self.death_counts = dict.fromkeys((DEATH_WALL, DEATH_OBSTACLE, DEATH_HEAD, DEATH_BODY), 0)
+        self.fruits = []
+        self.obstacles = []
+        for _ in range(self.obstacle_count):
+            obstacle = Item('obstacle')
+            self.obstacles.append(obstacle)
+            self.spawn_item(obstacle)
+        self.contestants = []
+        for _ in range(self.snake_count):
+            snake = Snake(grid, capacity=8, body=())
+            contestant = Contestant(snake)
+            self.contestants.append(contestant)
+            self.spawn_snake(contestant)
+        for _ in range(self.fruit_count):
+            fruit = Item('fruit')
+            self.fruits.append(fruit)
+            self.spawn_item(fruit)
+
+    def spawn_item(self, item):
+        """
+        Moves an item to a random free cell.
+        Returns:
+            tuple: The new (x, y) cell, or None if the board is full.
+        """
+        grid = self.grid
+        grid.remove_item(item)
+        index = grid.free.sample(self.rng.random)
+        if index is None:
+            item.pos = None
+            return None
+        y, x = divmod(index, self.width)
+        grid.place_item(item, (x, y))
+        return x, y
+
+    def spawn_snake(self, contestant):
+        """
+        Lays a snake of START_LENGTH blocks in a straight line on free cells, heading away from its tail.
+        Returns:
+            bool: True if a free stretch was found; otherwise the snake stays dead and tries again next tick.
+        """
+        grid = self.grid
+        rng = self.rng
+        for _ in range(SPAWN_ATTEMPTS):
+            index = grid.free.sample(rng.random)
+            if index is None:
+                return False
+            y, x = divmod(index, self.width)
+            dx, dy = direction = rng.choice(DIRECTIONS)
+            body = [(x - dx * offset, y - dy * offset) for offset in range(START_LENGTH)]
+            ahead = (x + dx, y + dy)
+            if all(grid.contains(*cell) and grid.is_free(*cell) for cell in body + [ahead]):
+                snake = contestant.snake
+                snake.set_body(body)
+                snake.direction = direction
+                snake.growth = 0
+                contestant.alive = True
+                contestant.score = 0
+                return True
+        return False
+
+    def clear(self, snake):
+        """
+        Takes a snake's blocks off the grid.
+        """
+        snake.set_body(())
+        snake.growth = 0
+        snake.direction = STOP
+
+    def turn(self, contestant, direction):
+        """
+        Turns a snake, unless that would move its head back into its neck.
+        """
+        snake = contestant.snake
+        x, y = snake.head
+        if direction != STOP and (snake.length < 2 or (x + direction[0], y + direction[1]) != snake.block(1)):
+            snake.direction = direction
+
+    def step(self, actions=None):
+        """
+        Advances every snake by one tick.
+        Args:
+            actions (sequence or dict, optional): The direction each snake turns to, by index; None,
+                or a missing index, keeps a snake going. Defaults to None.
+        Returns:
+            list of tuple: The (index, cause) of every snake that died this tick.
+        """
+        self.tick += 1
+        contestants = self.contestants
+        grid = self.grid
+        width = self.width
+        height = self.height
+        if actions:
+            pairs = actions.items() if isinstance(actions, dict) else enumerate(actions)
+            for index, direction in pairs:
+                if direction is not None and contestants[index].alive:
+                    self.turn(contestants[index], direction)
+
+        heads = {}
+        deaths = []
+        for index, contestant in enumerate(contestants):
+            if not contestant.alive:
+                continue
+            x, y = contestant.snake.move()
+            if 0 <= x < width and 0 <= y < height:
+                cell = y * width + x
+                if cell in heads:
+                    heads[cell].append(index)
+                else:
+                    heads[cell] = [index]
+            else:
+                deaths.append((index, DEATH_WALL))
+
+        counts = grid.snake
+        items = grid.items
+        eaten = []
+        for cell, indices in heads.items():
+            if len(indices) > 1:
+                deaths.extend((index, DEATH_HEAD) for index in indices)
+            elif counts[cell] > 1:
+                deaths.append((indices[0], DEATH_BODY))
+            else:
+                item = items[cell]
+                if item is None:
+                    continue
+                if item.kind == 'obstacle':
+                    deaths.append((indices[0], DEATH_OBSTACLE))
+                else:
+                    eaten.append((indices[0], item))
+
+        for index, cause in deaths:
+            contestant = contestants[index]
+            contestant.alive = False
+            contestant.deaths += 1
+            contestant.respawn_tick = self.tick + (self.respawn_ticks or 0)
+            self.death_counts[cause] += 1
+            self.clear(contestant.snake)
+        for index, fruit in eaten:
+            contestant = contestants[index]
+            contestant.snake.add_block()
+            contestant.score += 1
+            contestant.best = max(contestant.best, contestant.score)
+            self.spawn_item(fruit)
+
+        if self.respawn_ticks is not None:
+            for contestant in contestants:
+                if not contestant.alive and contestant.respawn_tick <= self.tick:
+                    self.spawn_snake(contestant)
+        self.deaths = deaths
+        return deaths
+
+    def alive(self):
+        """
+        Returns the number of snakes on the board.
+        """
+        return sum(contestant.alive for contestant in self.contestants)
+
+    def snake_cells(self):
+        """
+        Returns the number of blocks of all the snakes on the board.
+        """
+        return sum(contestant.snake.length for contestant in self.contestants)
+
+    def greedy_action(self, index):
+        """
+        A simple AI: heads for the fruit with the same index (modulo the number of fruits) along
+        whichever axis is further off, and avoids walls, obstacles and blocks one step ahead.
+        Returns:
+            tuple: The direction to turn to, or None to keep going.
+        """
+        snake = self.contestants[index].snake
+        x, y = snake.head
+        fruit = self.fruits[index % len(self.fruits)].pos if self.fruits else None
+        if fruit is None:
+            preferred = [snake.direction]
+        else:
+            dx, dy = fruit[0] - x, fruit[1] - y
+            horizontal = (1, 0) if dx > 0 else (-1, 0)
+            vertical = (0, 1) if dy > 0 else (0, -1)
+            preferred = [horizontal, vertical] if abs(dx) >= abs(dy) else [vertical, horizontal]
+            if not dx:
+                preferred.remove(horizontal)
+            if not dy:
+                preferred.remove(vertical)
+        grid = self.grid
+        neck = snake.block(1) if snake.length > 1 else None
+        for direction in preferred + [snake.direction] + list(DIRECTIONS):
+            cell = (x + direction[0], y + direction[1])
+            if direction == STOP or cell == neck or not grid.contains(*cell):
+                continue
+            index_ = cell[1] * self.width + cell[0]
+            item = grid.items[index_]
+            if not grid.snake[index_] and (item is None or item.kind != 'obstacle'):
+                return direction if direction != snake.direction else None
+        return None
+
+    def greedy_actions(self):
+        """
+        Returns greedy_action() of every living snake, as a list indexed like the snakes.
+        """
+        return [self.greedy_action(index) if contestant.alive else None
+                for index, contestant in enumerate(self.contestants)]
+
+
+def watch(arena, ticks, tick_ms, cell_size):
+    """
+    Shows the arena in a window, driving every snake with greedy_action().
+    """
+    import pygame
+
+    from render import ChunkedBackground, Camera
+
+    pygame.init()
+    camera = Camera(arena.width, arena.height, 800 // cell_size, 800 // cell_size)
+    screen = pygame.display.set_mode((camera.columns * cell_size, camera.rows * cell_size))
+    background = ChunkedBackground(cell_size, chunk_cells=max(8, 256 // cell_size))
+    colors = [pygame.Color(0) for _ in arena.contestants]
+    for index, color in enumerate(colors):
+        color.hsva = (index * 137.5 % 360, 70, 80, 100)
+    clock = pygame.time.Clock()
+    while arena.tick < ticks:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return
+        arena.step(arena.greedy_actions())
+        leader = max(arena.contestants, key=lambda contestant: (contestant.alive, contestant.snake.length))
+        if leader.alive:
+            camera.follow(leader.snake.head)
+        background.blit(screen, camera)
+        positions = camera.positions(cell_size)
+        for contestant, color in zip(arena.contestants, colors):
+            snake = contestant.snake
+            for offset in range(snake.length):
+                position = positions.get(snake.cell(offset))
+                if position is not None:
+                    screen.fill(color, (position[0], position[1], cell_size, cell_size))
+        for fruit in arena.fruits:
+            if fruit.pos is not None and camera.visible(*fruit.pos):
+                screen.fill((220, 40, 40), camera.cell_rect(fruit.pos[0], fruit.pos[1], cell_size))
+        for obstacle in arena.obstacles:
+            if obstacle.pos is not None and camera.visible(*obstacle.pos):
+                screen.fill((60, 60, 60), camera.cell_rect(obstacle.pos[0], obstacle.pos[1], cell_size))
+        pygame.display.flip()
+        clock.tick(1000 / tick_ms)
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run many greedy snakes on one board.')
+    parser.add_argument('--board', type=int, default=100, help='cells along each side')
+    parser.add_argument('--snakes', type=int, default=20)
+    parser.add_argument('--fruits', type=int, default=None, help='default: one per snake')
+    parser.add_argument('--obstacles', type=int, default=0)
+    parser.add_argument('--ticks', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--watch', action='store_true', help='show the arena in a window')
+    parser.add_argument('--tick-ms', type=int, default=100, help='tick period when watching')
+    parser.add_argument('--cell-size', type=int, default=10, help='cell size in pixels when watching')
+    args = parser.parse_args()
+    arena = Arena(args.board, args.board, args.snakes, args.fruits, args.obstacles, seed=args.seed)
+    if args.watch:
+        watch(arena, args.ticks, args.tick_ms, args.cell_size)
+        return
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        arena.step(arena.greedy_actions())
+    elapsed = time.perf_counter() - start
+    best = max(arena.contestants, key=lambda contestant: contestant.best)
+    print(f'{args.ticks} ticks in {elapsed:.2f} s ({args.ticks / elapsed:.0f} ticks/s), '
+          f'{arena.alive()} of {args.snakes} snakes alive, {arena.snake_cells()} snake blocks')
+    print('deaths: ' + ', '.join(f'{cause} {count}' for cause, count in arena.death_counts.items()))
+    print(f'best score {best.best}')
+
+
+if __name__ == '__main__':
+    main()
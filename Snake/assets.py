@@ -0,0 +1,134 @@
+"""
+Shared registry of the game's images and sounds.
+
+Every view used to load its own copy of its sprites, so restarting a game decoded all of them again
+and each obstacle held its own obstacle.png. AssetManager decodes each file once and hands the same
+Surface or Sound to everyone who asks. Files are loaded lazily on first use, or ahead of time on a
+background thread with preload(); the time each load took is recorded for report().
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+IMAGE_NAMES = ('head_up', 'head_down', 'head_right', 'head_left', 'tail_up', 'tail_down', 'tail_right',
+               'tail_left', 'body_vertical', 'body_horizontal', 'body_tr', 'body_tl', 'body_br', 'body_bl',
+               'apple', 'banana', 'boom', 'obstacle', 'power_up')
+SOUND_NAMES = ('crunch', 'crash')
+
+
+class AssetManager:
+    """
+    Loads images from the Graphics folder and sounds from the Sound folder, once each.
+
+    Attributes
+    ----------
+    load_times : dict
+        Seconds spent loading each asset, keyed by ('image', name) or ('sound', name).
+    """
+
+    def __init__(self, image_dir='Graphics', sound_dir='Sound'):
+        """
+        Initializes an empty registry.
+        Args:
+            image_dir (str, optional): Folder of the .png images. Defaults to 'Graphics'.
+            sound_dir (str, optional): Folder of the .wav sounds. Defaults to 'Sound'.
+        """
+        self.image_dir = image_dir
+        self.sound_dir = sound_dir
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.images = {}
+        self.sounds = {}
+        self.load_times = {}
+        self.executor = None
+
+    def decode(self, key):
+        """
+        Reads one asset from disk and records how long it took.
+        Images are decoded here but converted to the display format on first use, on the main thread.
+        """
+        kind, name = key
+        start = time.perf_counter()
+        if kind == 'image':
+            asset = pygame.image.load(f'{self.image_dir}/{name}.png')
+        else:
+            asset = pygame.mixer.Sound(f'{self.sound_dir}/{name}.wav')
+        self.load_times[key] = time.perf_counter() - start
+        return asset
+
+    def fetch(self, key):
+        """
+        Returns the decoded asset, waiting for a background load in progress or decoding it now.
+        The background load is forgotten afterwards, so only the caller's copy stays in memory.
+        """
+        with self.lock:
+            future = self.pending.pop(key, None)
+        if future is not None:
+            return future.result()
+        return self.decode(key)
+
+    def image(self, name):
+        """
+        Returns the image with the given name, loading it on first use.
+        Args:
+            name (str): Name of the image file without the extension.
+        Returns:
+            pygame.Surface: The shared image. Callers must not draw on it.
+        """
+        image = self.images.get(name)
+        if image is None:
+            key = ('image', name)
+            decoded = self.fetch(key)
+            start = time.perf_counter()
+            image = self.images[name] = decoded.convert_alpha()
+            self.load_times[key] += time.perf_counter() - start
+        return image
+
+    def sound(self, name):
+        """
+        Returns the sound with the given name, loading it on first use.
+        Args:
+            name (str): Name of the sound file without the extension.
+        Returns:
+            pygame.mixer.Sound: The shared sound.
+        """
+        sound = self.sounds.get(name)
+        if sound is None:
+            sound = self.sounds[name] = self.fetch(('sound', name))
+        return sound
+
+    def preload(self, images=IMAGE_NAMES, sounds=SOUND_NAMES):
+        """
+        Starts loading assets on a background thread. Assets already loaded or queued are skipped.
+        Args:
+            images (iterable, optional): Names of the images to load. Defaults to all the game's images.
+            sounds (iterable, optional): Names of the sounds to load. Defaults to all the game's sounds.
+        """
+        keys = [('image', name) for name in images] + [('sound', name) for name in sounds]
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='assets')
+            for key in keys:
+                loaded = self.images if key[0] == 'image' else self.sounds
+                if key not in self.pending and key[1] not in loaded:
+                    self.pending[key] = self.executor.submit(self.decode, key)
+
+    def wait(self):
+        """
+        Blocks until every queued background load has finished.
+        """
+        with self.lock:
+            futures = list(self.pending.values())
+        for future in futures:
+            future.result()
+
+    def report(self):
+        """
+        Returns a summary of how long loading the assets took, slowest first.
+        """
+        lines = [f'{len(self.load_times)} assets loaded in {sum(self.load_times.values()) * 1000:.1f} ms']
+        for (kind, name), seconds in sorted(self.load_times.items(), key=lambda item: -item[1]):
+            lines.append(f'  {kind:<5} {name:<16} {seconds * 1000:7.2f} ms')
+        return '\n'.join(lines)
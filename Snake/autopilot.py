@@ -0,0 +1,438 @@
+"""
+Pathfinding autopilot for the snake.
+
+Autopilot picks the direction of the engine's snake on each tick. It plans a route to the fruit,
+or to the big fruit when that is closer and can be reached before it expires, with A* on the
+board, treating obstacles, the active boom and the snake's own body as walls. The body is handled
+in time: a block is a wall only until the tail has moved past it, so a route may run through
+cells the tail will have left by the time the head gets there.
+
+A route to a fruit is only taken if, once the fruit is eaten, the snake can still get back onto
+the trail its tail leaves behind (or into open room); otherwise the autopilot heads for that trail
+and follows its tail (the safe-tail fallback) until a safe route opens up, and as a last resort
+takes whichever move leaves it the most room.
+
+Plans are kept across ticks. The snake only moves into cells it planned for, so a plan stays
+valid until the target moves, the snake changes length or a hazard appears or disappears on one
+of the plan's cells; only then does the autopilot search again. Most decisions are a lookup.
+
+Searches stop at a deadline of budget_ms after the decision started. The search for the target may
+use ROUTE_SHARE of the budget and checking that its route is safe runs until TARGET_SHARE, so there
+is always time left to find the way out. A search for the target cut short returns the route to the
+cell nearest the target it got to; the snake follows it and searches again from there. Any other
+search cut short counts as no route, and the snake falls back to the next option for this tick.
+"""
+import heapq
+import time
+from collections import deque
+
+from engine import BIG_FRUIT_DURATION, DIRECTIONS
+
+DEADLINE_CHECK_EVERY = 64
+ROUTE_SHARE = 0.3
+TARGET_SHARE = 0.7
+OPEN_ROOM_PER_BLOCK = 4
+NEVER = float('inf')
+
+
+def percentile(values, fraction):
+    """
+    Returns the value below which the given fraction of a non-empty sorted sequence lies.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class Neighbours(dict):
+    """
+    Map from a packed cell to the packed cells next to it on a width x height board, filled in as
+    cells are looked up so that big boards only pay for the cells the searches reach.
+    """
+
+    def __init__(self, width, height):
+        """
+        Initializes an empty map for a board of the given size.
+        """
+        super().__init__()
+        self.width = width
+        self.height = height
+
+    def __missing__(self, cell):
+        width = self.width
+        y, x = divmod(cell, width)
+        cells = []
+        if y > 0:
+            cells.append(cell - width)
+        if y < self.height - 1:
+            cells.append(cell + width)
+        if x > 0:
+            cells.append(cell - 1)
+        if x < width - 1:
+            cells.append(cell + 1)
+        self[cell] = cells = tuple(cells)
+        return cells
+
+
+class Autopilot:
+    """
+    Drives the snake of a SnakeEngine.
+
+    decide() returns the direction for the next tick. The time each decision took is kept in
+    decision_times, how many searches were run in searches and how many hit the deadline in timeouts.
+    """
+
+    def __init__(self, engine, budget_ms=1.0, retry_ticks=8, samples=4096):
+        """
+        Initializes the autopilot with no plan.
+        Args:
+            engine (SnakeEngine): The engine whose snake it drives.
+            budget_ms (float, optional): Time the searches of one decision may take. Defaults to 1.
+            retry_ticks (int, optional): Ticks between attempts to route to the fruit while
+                following the tail. Defaults to 8.
+            samples (int, optional): Number of recent decision times kept. Defaults to 4096.
+        """
+        self.engine = engine
+        self.budget = budget_ms / 1000
+        self.retry_ticks = retry_ticks
+        self.decision_times = deque(maxlen=samples)
+        self.decisions = 0
+        self.searches = 0
+        self.timeouts = 0
+        self.expansions = 0
+        self.started = 0.0
+        self.deadline = 0.0
+        self.neighbours = Neighbours(0, 0)
+        self.forget()
+
+    def forget(self):
+        """
+        Drops the current plan, so the next decision searches again.
+        """
+        self.mode = None
+        self.plan = deque()
+        self.plan_head = None
+        self.plan_state = None
+        self.plan_generation = None
+        self.plan_length = None
+        self.plan_target = None
+        self.plan_cells = set()
+        self.hazards = None
+        self.retry_at = 0
+
+    def decide(self):
+        """
+        Chooses the direction of the snake for the next tick.
+        Returns:
+            tuple: One of DIRECTIONS, or None to keep going (only when every move is fatal).
+        """
+        start = time.perf_counter()
+        self.started = start
+        self.deadline = start + self.budget
+        state = self.engine.state
+        snake = state.snake
+        width = state.width
+        if (self.neighbours.width, self.neighbours.height) != (width, state.height):
+            self.neighbours = Neighbours(width, state.height)
+        hazards = self.hazard_cells(state)
+        head = snake.head[1] * width + snake.head[0]
+        if self.mode == 'fruit' and head == self.plan_target and state is self.plan_state:
+            # Just ate: the rest of the plan is the way out found before taking the fruit.
+            self.mode = 'tail'
+            self.plan_length = len(snake)
+            self.retry_at = state.tick
+        if not self.plan_is_valid(state, hazards, head):
+            self.replan(state, hazards, head)
+        elif self.mode == 'tail' and state.tick >= self.retry_at and not self.route_to_target(state, hazards, head):
+            self.retry_at = state.tick + self.retry_ticks
+        self.hazards = hazards
+        if self.plan:
+            cell = self.plan.popleft()
+            self.plan_head = cell
+            action = DIRECTIONS[self.step_code(head, cell, width)]
+        else:
+            action = self.roomiest_move(state, hazards, head)
+            self.forget()
+        self.decisions += 1
+        self.decision_times.append(time.perf_counter() - start)
+        return action
+
+    @staticmethod
+    def step_code(head, cell, width):
+        """
+        Returns the index in DIRECTIONS of the step between two adjacent packed cells.
+        """
+        difference = cell - head
+        if difference == -width:
+            return 0
+        if difference == width:
+            return 1
+        return 2 if difference == -1 else 3
+
+    def hazard_cells(self, state):
+        """
+        Returns the packed cells of the obstacles and the active boom.
+        """
+        width = state.width
+        cells = {obstacle.pos[1] * width + obstacle.pos[0] for obstacle in state.obstacles
+                 if obstacle.pos is not None and state.grid.item_at(*obstacle.pos) is obstacle}
+        if state.boom_active and state.boom.pos is not None:
+            cells.add(state.boom.pos[1] * width + state.boom.pos[0])
+        return frozenset(cells)
+
+    def target(self, state):
+        """
+        Returns the packed cell to head for: the big fruit if it is active, closer than the fruit
+        and reachable before it expires, otherwise the fruit; None if there is neither.
+        """
+        head_x, head_y = state.snake.head
+        best = None
+        if state.fruit.pos is not None:
+            best = (abs(state.fruit.pos[0] - head_x) + abs(state.fruit.pos[1] - head_y), state.fruit.pos)
+        if state.big_fruit_active and state.big_fruit.pos is not None:
+            x, y = state.big_fruit.pos
+            distance = abs(x - head_x) + abs(y - head_y)
+            left_ms = state.big_fruit_timer + BIG_FRUIT_DURATION - state.time_ms
+            if distance * self.engine.tick_ms < left_ms and (best is None or distance < best[0]):
+                best = (distance, state.big_fruit.pos)
+        return None if best is None else best[1][1] * state.width + best[1][0]
+
+    def plan_is_valid(self, state, hazards, head):
+        """
+        Checks whether the current plan can still be followed from the given head cell.
+        """
+        snake = state.snake
+        if (not self.plan or state is not self.plan_state or snake.generation != self.plan_generation
+                or head != self.plan_head or len(snake) != self.plan_length):
+            return False
+        if self.mode == 'fruit' and self.target(state) != self.plan_target:
+            return False
+        if hazards is not self.hazards and hazards != self.hazards and not self.plan_cells.isdisjoint(
+                hazards.symmetric_difference(self.hazards)):
+            return False
+        cell = self.plan[0]
+        return not state.grid.snake[cell] or (cell == snake.cell(-1) and not snake.growth)
+
+    def body_free_at(self, cells, growth, hazards):
+        """
+        Returns a dict from every body cell to the number of moves after which the head may enter it,
+        and from every hazard to NEVER.
+        Args:
+            cells (list): Packed body cells, head first.
+            growth (int): Blocks still to grow, which keep the tail in place for as many moves.
+            hazards (frozenset): Packed cells the head may never enter.
+        """
+        length = len(cells)
+        free_at = dict.fromkeys(hazards, NEVER)
+        free_at.update((cell, length - offset + growth) for offset, cell in enumerate(cells))
+        return free_at
+
+    def search(self, state, start, goal, free_at):
+        """
+        Finds a shortest route with A*, moving one cell per move.
+        Args:
+            state (engine.GameState): The game.
+            start (int): Packed cell of the head.
+            goal (int): Packed cell to reach.
+            free_at (dict): Packed cells the head may enter only from the given move on.
+        Returns:
+            list: The packed cells of the route after start, ending with goal; None if there is
+            none. If the deadline passes first, the route to the cell nearest the goal found so far,
+            or None if that is start.
+        """
+        self.searches += 1
+        width = state.width
+        neighbours = self.neighbours
+        goal_y, goal_x = divmod(goal, width)
+        steps = {start: 0}
+        came_from = {}
+        y, x = divmod(start, width)
+        # Ties on the estimate go to the cell furthest from the start, so on open ground the search
+        # runs straight down one shortest route instead of filling the rectangle between the ends.
+        queue = [(abs(x - goal_x) + abs(y - goal_y), 0, start)]
+        nearest = (queue[0][0], 0, start)
+        expansions = 0
+        push = heapq.heappush
+        pop = heapq.heappop
+        deadline = self.deadline
+        clock = time.perf_counter
+        while queue:
+            if expansions % DEADLINE_CHECK_EVERY == 0 and expansions and clock() > deadline:
+                self.timeouts += 1
+                goal = nearest[2]
+                break
+            estimate, moves, cell = pop(queue)
+            if cell == goal:
+                break
+            moves = -moves
+            if moves > steps[cell]:
+                continue
+            if (estimate - moves, -moves) < nearest[:2]:
+                nearest = (estimate - moves, -moves, cell)
+            expansions += 1
+            moves += 1
+            for neighbour in neighbours[cell]:
+                if free_at.get(neighbour, 0) > moves:
+                    continue
+                if moves < steps.get(neighbour, moves + 1):
+                    steps[neighbour] = moves
+                    came_from[neighbour] = cell
+                    ny, nx = divmod(neighbour, width)
+                    push(queue, (moves + abs(nx - goal_x) + abs(ny - goal_y), -moves, neighbour))
+        self.expansions += expansions
+        if goal not in came_from:
+            return None
+        route = [goal]
+        while route[-1] in came_from:
+            route.append(came_from[route[-1]])
+        route.pop()
+        route.reverse()
+        return route
+
+    def replan(self, state, hazards, head):
+        """
+        Plans a safe route to the target, or failing that along the tail. A snake that was already
+        following its tail looks for the way out first and tries the target again on the next tick,
+        so a search for the target cut short by the deadline cannot leave it without a plan.
+        """
+        snake = state.snake
+        following = self.mode == 'tail'
+        self.forget()
+        self.plan_state = state
+        self.plan_generation = snake.generation
+        self.plan_length = len(snake)
+        self.plan_head = head
+        if not following and self.route_to_target(state, hazards, head):
+            return
+        body = [snake.cell(offset) for offset in range(snake.length)]
+        route = self.escape_route(state, hazards, body, snake.growth) if len(body) > 1 else None
+        if route:
+            self.mode = 'tail'
+            self.retry_at = state.tick + (1 if following else self.retry_ticks)
+            self.use(route)
+        elif not (following and self.route_to_target(state, hazards, head)):
+            self.mode = None
+
+    def route_to_target(self, state, hazards, head):
+        """
+        Plans a route to the target, or towards it if the search was cut short, if there is a safe
+        one; the current plan is kept otherwise.
+        Returns:
+            bool: True if the plan now leads to or towards the target.
+        """
+        goal = self.target(state)
+        if goal is None or goal in hazards:
+            return False
+        snake = state.snake
+        body = [snake.cell(offset) for offset in range(snake.length)]
+        deadline = self.deadline
+        self.deadline = min(deadline, self.started + ROUTE_SHARE * self.budget)
+        route = self.search(state, head, goal, self.body_free_at(body, snake.growth, hazards))
+        escape = None
+        if route is not None:
+            self.deadline = min(deadline, self.started + TARGET_SHARE * self.budget)
+            escape = self.escape_route(state, hazards, (route[::-1] + body)[:len(body) + snake.growth], 1)
+        self.deadline = deadline
+        if escape is None:
+            return False
+        self.mode = 'fruit'
+        self.plan_target = goal
+        self.use(route + escape if route[-1] == goal else route)
+        return True
+
+    def use(self, route):
+        """
+        Makes a route the current plan.
+        """
+        self.plan = deque(route)
+        self.plan_cells = set(route)
+
+    def escape_route(self, state, hazards, cells, growth):
+        """
+        Finds the way out for a snake lying on the given cells: the shortest route to one of its own
+        blocks after the tail has left it, then on along its trail towards where the head was (each
+        of those cells is left one move after the one before), or to open room (more free cells than
+        OPEN_ROOM_PER_BLOCK times its length).
+        Args:
+            state (engine.GameState): The game.
+            hazards (frozenset): Packed cells the head may never enter.
+            cells (list): Packed cells of the snake, head first.
+            growth (int): Blocks still to grow.
+        Returns:
+            list: The packed cells of the route after the head (only its first step for open room);
+            None if the snake is shut in or the deadline passed.
+        """
+        if len(cells) < 2:
+            return []
+        offsets = {cell: offset for offset, cell in enumerate(cells)}
+        free_at = self.body_free_at(cells, growth, hazards)
+        room = OPEN_ROOM_PER_BLOCK * (len(cells) + growth)
+        neighbours = self.neighbours
+        start = cells[0]
+        came_from = {start: None}
+        frontier = deque([(start, 0)])
+        visits = 0
+        deadline = self.deadline
+        clock = time.perf_counter
+        while frontier:
+            visits += 1
+            if visits % DEADLINE_CHECK_EVERY == 0 and clock() > deadline:
+                self.timeouts += 1
+                return None
+            cell, moves = frontier.popleft()
+            moves += 1
+            for neighbour in neighbours[cell]:
+                if neighbour in came_from:
+                    continue
+                free_from = free_at.get(neighbour, 0)
+                if free_from > moves:
+                    continue
+                came_from[neighbour] = cell
+                if free_from or len(came_from) > room:
+                    route = [neighbour]
+                    while came_from[route[-1]] != start:
+                        route.append(came_from[route[-1]])
+                    route.reverse()
+                    if not free_from:
+                        # Open room is only checked from here: following the whole route could wall
+                        # part of it off, so take one step and look again.
+                        return route[:1]
+                    route.extend(reversed(cells[1:offsets[neighbour]]))
+                    return route
+                frontier.append((neighbour, moves))
+        return None
+
+    def roomiest_move(self, state, hazards, head):
+        """
+        Returns the move into a free cell with the most free neighbours, or None if every move is fatal.
+        """
+        width = state.width
+        height = state.height
+        grid = state.grid.snake
+        snake = state.snake
+        tail = snake.cell(-1) if not snake.growth else None
+
+        def free(cell, inside):
+            return inside and cell not in hazards and (not grid[cell] or cell == tail)
+
+        best = None
+        y, x = divmod(head, width)
+        for code, (neighbour, inside) in enumerate(((head - width, y > 0), (head + width, y < height - 1),
+                                                    (head - 1, x > 0), (head + 1, x < width - 1))):
+            if not free(neighbour, inside):
+                continue
+            ny, nx = divmod(neighbour, width)
+            room = sum(free(cell, ok) for cell, ok in ((neighbour - width, ny > 0), (neighbour + width, ny < height - 1),
+                                                       (neighbour - 1, nx > 0), (neighbour + 1, nx < width - 1)))
+            if best is None or room > best[0]:
+                best = (room, code)
+        return None if best is None else DIRECTIONS[best[1]]
+
+    def report(self):
+        """
+        Returns the decision time percentiles and the share of decisions that searched as text.
+        """
+        if not self.decision_times:
+            return 'autopilot: no decisions yet'
+        times = sorted(self.decision_times)
+        return (f'autopilot: {self.decisions} decisions, {self.searches} searches, {self.timeouts} timeouts, '
+                f'p50 {percentile(times, 0.5) * 1000:.3f} ms, p99 {percentile(times, 0.99) * 1000:.3f} ms, '
+                f'max {times[-1] * 1000:.3f} ms')
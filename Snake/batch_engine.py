@@ -0,0 +1,355 @@
+"""
+Vectorized batch version of the headless engine.
+
+BatchEngine advances N boards in lockstep with NumPy. Every board follows the same rules as
+engine.SnakeEngine: the snake moves, eats fruit and big fruit, dies on walls, itself, obstacles and
+active booms unless a power-up is running, and booms, big fruits and extra obstacles come and go on
+the simulated clock. Boards that finish are reset automatically at the end of the step that ended them.
+
+Snakes are stored as ring buffers of cell indices (cell = y * width + x) next to a per-board
+occupancy grid, so a step costs the same whatever the snakes' lengths are.
+"""
+import numpy as np
+
+from engine import (CELL_NUMBER, DIRECTIONS, START_BODY, START_OBSTACLES, MAX_OBSTACLES, LEVEL_TICK_MS,
+                    POWER_UP_DURATION, BIG_FRUIT_DURATION, BIG_FRUIT_EVERY, BOOM_INTERVAL, BOOM_DURATION)
+
+STOP = len(DIRECTIONS)
+DX = np.array([dx for dx, dy in DIRECTIONS] + [0], dtype=np.int32)
+DY = np.array([dy for dx, dy in DIRECTIONS] + [0], dtype=np.int32)
+TICK_MS = np.array([0] + [LEVEL_TICK_MS[level] for level in (1, 2, 3)], dtype=np.int64)
+SPAWN_ATTEMPTS = 8
+
+EMPTY, BODY, HEAD, FRUIT, OBSTACLE, BOOM, BIG_FRUIT, POWER_UP = range(8)
+
+
+class BatchState:
+    """
+    The state of N boards as NumPy arrays, one row or element per board. Item positions are cell
+    indices, or -1 when the item is not on the board.
+    """
+
+    def __init__(self, n, width=CELL_NUMBER, height=CELL_NUMBER):
+        """
+        Allocates the arrays for n boards.
+        Args:
+            n (int): Number of boards.
+            width (int, optional): Board width in cells. Defaults to CELL_NUMBER.
+            height (int, optional): Board height in cells. Defaults to CELL_NUMBER.
+        """
+        self.n = n
+        self.width = width
+        self.height = height
+        self.cells = cells = width * height
+        cell_type = np.int16 if cells < 2 ** 15 else np.int32
+        self.body = np.zeros((n, cells), dtype=cell_type)
+        self.head = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.growth = np.zeros(n, dtype=np.int32)
+        self.occupied = np.zeros((n, cells), dtype=bool)
+        self.direction = np.full(n, STOP, dtype=np.int8)
+        self.fruit = np.full(n, -1, dtype=np.int32)
+        self.big_fruit = np.full(n, -1, dtype=np.int32)
+        self.boom = np.full(n, -1, dtype=np.int32)
+        self.power_up = np.full(n, -1, dtype=np.int32)
+        self.obstacles = np.full((n, MAX_OBSTACLES), -1, dtype=np.int32)
+        self.obstacle_count = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.big_score = np.zeros(n, dtype=np.int64)
+        self.high_score = np.zeros(n, dtype=np.int64)
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int8)
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.time_ms = np.zeros(n, dtype=np.int64)
+        self.start_ms = np.zeros(n, dtype=np.int64)
+        self.boom_active = np.zeros(n, dtype=bool)
+        self.boom_timer = np.zeros(n, dtype=np.int64)
+        self.big_fruit_active = np.zeros(n, dtype=bool)
+        self.big_fruit_timer = np.zeros(n, dtype=np.int64)
+        self.big_fruit_milestone = np.zeros(n, dtype=np.int64)
+        self.power_up_active = np.zeros(n, dtype=bool)
+        self.power_up_timer = np.zeros(n, dtype=np.int64)
+        self.games = np.zeros(n, dtype=np.int64)
+
+    def head_cells(self):
+        """
+        Returns the cell index of every snake's head.
+        """
+        return self.body[np.arange(self.n), self.head].astype(np.int32)
+
+    def grids(self):
+        """
+        Returns every board as a (n, height, width) array of EMPTY, BODY, HEAD, FRUIT, OBSTACLE, BOOM,
+        BIG_FRUIT and POWER_UP codes.
+        """
+        grids = np.where(self.occupied, BODY, EMPTY).astype(np.int8)
+        rows = np.arange(self.n)
+        for cells, code, shown in ((self.fruit, FRUIT, None), (self.boom, BOOM, self.boom_active),
+                                   (self.big_fruit, BIG_FRUIT, self.big_fruit_active),
+                                   (self.power_up, POWER_UP, ~self.power_up_active)):
+            mask = cells >= 0
+            if shown is not None:
+                mask &= shown
+            grids[rows[mask], cells[mask]] = code
+        for slot in range(MAX_OBSTACLES):
+            cells = self.obstacles[:, slot]
+            mask = cells >= 0
+            grids[rows[mask], cells[mask]] = OBSTACLE
+        grids[rows, self.head_cells()] = HEAD
+        return grids.reshape(self.n, self.height, self.width)
+
+
+class BatchEngine:
+    """
+    Runs the game rules on n boards at once.
+
+    step(actions) takes one action per board (an index into engine.DIRECTIONS, or -1 to keep going)
+    and returns (state, rewards, dones). A board reported as done has already been reset; its score
+    at game over is kept in state.final_score.
+    """
+
+    def __init__(self, n, width=CELL_NUMBER, height=CELL_NUMBER, seed=None):
+        """
+        Initializes the engine and starts a new game on every board.
+        Args:
+            n (int): Number of boards.
+            width (int, optional): Board width in cells. Defaults to CELL_NUMBER.
+            height (int, optional): Board height in cells. Defaults to CELL_NUMBER.
+            seed (int, optional): Seed for the batch's random number generator. Defaults to None.
+        """
+        self.rng = np.random.default_rng(seed)
+        self.state = BatchState(n, width, height)
+        self.boards = np.arange(n)
+        self.reset_boards(self.boards)
+
+    def reset(self, seed=None):
+        """
+        Starts a new game on every board.
+        Args:
+            seed (int, optional): Seed for the batch's random number generator. Defaults to None.
+        Returns:
+            BatchState: The state of the new games.
+        """
+        self.rng = np.random.default_rng(seed)
+        self.reset_boards(self.boards)
+        return self.state
+
+    def reset_boards(self, boards):
+        """
+        Starts a new game on the given boards.
+        Args:
+            boards (numpy.ndarray): Indices of the boards to reset.
+        """
+        if not len(boards):
+            return
+        s = self.state
+        start = np.array([y * s.width + x for x, y in reversed(START_BODY)], dtype=s.body.dtype)
+        s.occupied[boards] = False
+        s.body[boards, :len(start)] = start
+        s.occupied[boards[:, None], start[None, :]] = True
+        s.head[boards] = len(start) - 1
+        s.length[boards] = len(start)
+        s.growth[boards] = 0
+        s.direction[boards] = STOP
+        for cells in (s.fruit, s.big_fruit, s.boom, s.power_up):
+            cells[boards] = -1
+        s.obstacles[boards] = -1
+        s.obstacle_count[boards] = 0
+        for values in (s.score, s.big_score, s.tick, s.time_ms, s.start_ms, s.boom_timer, s.big_fruit_timer,
+                       s.big_fruit_milestone, s.power_up_timer):
+            values[boards] = 0
+        s.level[boards] = 1
+        s.boom_active[boards] = False
+        s.big_fruit_active[boards] = False
+        s.power_up_active[boards] = False
+        s.games[boards] += 1
+        s.fruit[boards] = self.free_cells(boards)
+        for _ in range(START_OBSTACLES):
+            self.add_obstacles(boards)
+        s.power_up[boards] = self.free_cells(boards)
+
+    def step(self, actions=None):
+        """
+        Advances every board by one tick.
+        Args:
+            actions (numpy.ndarray, optional): One direction index per board, -1 to keep going.
+        Returns:
+            tuple: (state, rewards, dones) with one reward and one done flag per board.
+        """
+        s = self.state
+        boards = self.boards
+        width = s.width
+        cap = s.cells
+        score_before = s.score.copy()
+        s.tick += 1
+        s.time_ms += TICK_MS[s.level]
+
+        head = s.body[boards, s.head].astype(np.int32)
+        hx = head % width
+        hy = head // width
+        if actions is not None:
+            actions = np.asarray(actions)
+            turning = (actions >= 0) & (actions < STOP)
+            wanted = np.where(turning, actions, STOP)
+            nx = hx + DX[wanted]
+            ny = hy + DY[wanted]
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < s.height)
+            neck = s.body[boards, (s.head - 1) % cap]
+            turning &= ~(inside & (ny * width + nx == neck))
+            s.direction[turning] = wanted[turning]
+
+        moving = s.direction != STOP
+        nx = hx + DX[s.direction]
+        ny = hy + DY[s.direction]
+        inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < s.height)
+        crash = moving & ~inside
+        moved = moving & inside
+
+        growing = moved & (s.growth > 0)
+        s.growth[growing] -= 1
+        b = boards[moved & ~growing]
+        tail = (s.head[b] - s.length[b] + 1) % cap
+        s.occupied[b, s.body[b, tail]] = False
+        s.length[b] -= 1
+
+        b = boards[moved]
+        new_head = (ny * width + nx)[b]
+        self_hit = np.zeros(s.n, dtype=bool)
+        self_hit[b] = s.occupied[b, new_head]
+        s.head[b] = (s.head[b] + 1) % cap
+        s.body[b, s.head[b]] = new_head
+        s.occupied[b, new_head] = True
+        s.length[b] += 1
+        head = np.where(moved, ny * width + nx, -2)
+
+        eaten = head == s.fruit
+        s.score[eaten] += 1
+        s.big_score[eaten] += 1
+        s.growth[eaten] += 1
+        self.respawn(s.fruit, boards[eaten])
+
+        invincible = s.power_up_active
+        boom_hit = s.boom_active & (head == s.boom)
+        obstacle_hits = s.obstacles == head[:, None]
+        obstacle_hit = obstacle_hits.any(axis=1)
+        dead = crash | self_hit | ((boom_hit | obstacle_hit) & ~invincible)
+        alive = ~dead
+        self.respawn(s.boom, boards[boom_hit & alive])
+        b = boards[obstacle_hit & alive]
+        if len(b):
+            slots = obstacle_hits[b].argmax(axis=1)
+            s.obstacles[b, slots] = -1
+            s.obstacles[b, slots] = self.free_cells(b)
+        big_eaten = s.big_fruit_active & (head == s.big_fruit) & alive
+        s.big_fruit_active[big_eaten] = False
+        s.score[big_eaten] += 3
+        grown = s.length + s.growth - len(START_BODY)
+        s.level[:] = np.where(grown > 10, 3, np.where(grown > 5, 2, 1))
+
+        now = s.time_ms
+        power = alive & (head == s.power_up)
+        self.respawn(s.power_up, boards[power])
+        s.power_up_active[power] = True
+        s.power_up_timer[power] = now[power]
+        s.power_up_active &= ~(now - s.power_up_timer > POWER_UP_DURATION)
+
+        elapsed = (now - s.start_ms) // 1000
+        boom = alive & ~s.boom_active & (elapsed - s.boom_timer >= BOOM_INTERVAL)
+        s.boom_active[boom] = True
+        self.respawn(s.boom, boards[boom])
+        s.boom_timer[boom] = elapsed[boom]
+        big = (alive & ~s.big_fruit_active & (s.big_score % BIG_FRUIT_EVERY == 0)
+               & (s.big_score != s.big_fruit_milestone))
+        s.big_fruit_active[big] = True
+        self.respawn(s.big_fruit, boards[big])
+        s.big_fruit_timer[big] = now[big]
+        s.big_fruit_milestone[big] = s.big_score[big]
+        s.big_fruit_active &= ~(now - s.big_fruit_timer >= BIG_FRUIT_DURATION)
+        s.boom_active &= ~(elapsed - s.boom_timer >= BOOM_DURATION)
+
+        self.add_obstacles(boards[alive & (s.level == 3) & (s.obstacle_count < MAX_OBSTACLES)])
+
+        rewards = s.score - score_before
+        finished = boards[dead]
+        s.final_score[finished] = s.score[finished]
+        np.maximum(s.high_score, s.score, out=s.high_score)
+        self.reset_boards(finished)
+        return s, rewards, dead
+
+    def respawn(self, cells, boards):
+        """
+        Moves an item to a random free cell on the given boards.
+        Args:
+            cells (numpy.ndarray): The per-board position array of the item, e.g. state.fruit.
+            boards (numpy.ndarray): Indices of the boards to update.
+        """
+        if len(boards):
+            cells[boards] = -1
+            cells[boards] = self.free_cells(boards)
+
+    def add_obstacles(self, boards):
+        """
+        Places one more obstacle on each of the given boards.
+        Args:
+            boards (numpy.ndarray): Indices of the boards to update.
+        """
+        if len(boards):
+            s = self.state
+            s.obstacles[boards, s.obstacle_count[boards]] = self.free_cells(boards)
+            s.obstacle_count[boards] += 1
+
+    def is_free(self, boards, cells):
+        """
+        Checks whether nothing occupies the given cells.
+        Args:
+            boards (numpy.ndarray): Board index of each cell.
+            cells (numpy.ndarray): The cells to check.
+        Returns:
+            numpy.ndarray: True where the snake and every active item are elsewhere.
+        """
+        s = self.state
+        return (~s.occupied[boards, cells]
+                & (cells != s.fruit[boards]) & (cells != s.power_up[boards])
+                & ~(s.boom_active[boards] & (cells == s.boom[boards]))
+                & ~(s.big_fruit_active[boards] & (cells == s.big_fruit[boards]))
+                & ~(s.obstacles[boards] == cells[:, None]).any(axis=1))
+
+    def free_cells(self, boards):
+        """
+        Picks a random free cell on each of the given boards. A few rounds of rejection sampling
+        place almost every item; boards that are still unlucky fall back to sampling among all
+        of their free cells.
+        Args:
+            boards (numpy.ndarray): Indices of the boards.
+        Returns:
+            numpy.ndarray: One cell per board, or -1 where the board is full.
+        """
+        s = self.state
+        cells = np.full(len(boards), -1, dtype=np.int32)
+        pending = np.arange(len(boards))
+        for _ in range(SPAWN_ATTEMPTS):
+            if not len(pending):
+                return cells
+            candidates = self.rng.integers(0, s.cells, size=len(pending), dtype=np.int32)
+            free = self.is_free(boards[pending], candidates)
+            cells[pending[free]] = candidates[free]
+            pending = pending[~free]
+        if len(pending):
+            b = boards[pending]
+            rows = np.arange(len(b))
+            blocked = s.occupied[b].copy()
+            for item, shown in ((s.fruit, None), (s.power_up, None), (s.boom, s.boom_active),
+                                (s.big_fruit, s.big_fruit_active)):
+                mask = item[b] >= 0
+                if shown is not None:
+                    mask &= shown[b]
+                blocked[rows[mask], item[b][mask]] = True
+            for slot in range(MAX_OBSTACLES):
+                item = s.obstacles[b, slot]
+                mask = item >= 0
+                blocked[rows[mask], item[mask]] = True
+            keys = self.rng.random(blocked.shape)
+            keys[blocked] = -1.0
+            choice = keys.argmax(axis=1)
+            cells[pending] = np.where(keys[rows, choice] < 0, -1, choice)
+        return cells
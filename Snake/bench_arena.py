@@ -0,0 +1,77 @@
+"""
+Arena tick cost by number of snakes.
+
+Runs arenas with more and more greedy snakes on one board and times Arena.step(), which moves
+every snake and resolves collisions through the shared occupancy grid, separately from the greedy
+AI that picks the actions. For comparison it times the collision check done the old way, scanning
+the body list of every snake for every head, on the same positions.
+
+    python bench_arena.py --board 500 --snakes 10 50 100 200 500 --ticks 500
+"""
+import argparse
+import time
+
+from arena import Arena
+
+
+def pairwise_collisions(arena):
+    """
+    Finds the snakes whose head is on another block by comparing every head with every body.
+    """
+    bodies = [contestant.snake.body for contestant in arena.contestants if contestant.alive]
+    hits = 0
+    for index, body in enumerate(bodies):
+        head = body[0]
+        for other, blocks in enumerate(bodies):
+            if head in (blocks[1:] if other == index else blocks):
+                hits += 1
+                break
+    return hits
+
+
+def run(board, snakes, warmup, ticks, pairwise_every, seed):
+    """
+    Returns the mean step and AI times and the mean pairwise check time in microseconds, and the
+    mean number of snake blocks on the board.
+    """
+    arena = Arena(board, board, snakes, seed=seed)
+    for _ in range(warmup):
+        arena.step(arena.greedy_actions())
+    step_time = ai_time = pairwise_time = 0.0
+    cells = pairwise_runs = 0
+    for tick in range(ticks):
+        start = time.perf_counter()
+        actions = arena.greedy_actions()
+        ai_time += time.perf_counter() - start
+        start = time.perf_counter()
+        arena.step(actions)
+        step_time += time.perf_counter() - start
+        cells += arena.snake_cells()
+        if tick % pairwise_every == 0:
+            start = time.perf_counter()
+            pairwise_collisions(arena)
+            pairwise_time += time.perf_counter() - start
+            pairwise_runs += 1
+    return step_time / ticks * 1e6, ai_time / ticks * 1e6, pairwise_time / pairwise_runs * 1e6, cells / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time arena ticks for several numbers of snakes.')
+    parser.add_argument('--board', type=int, default=500, help='cells along each side')
+    parser.add_argument('--snakes', type=int, nargs='+', default=[10, 50, 100, 200, 500])
+    parser.add_argument('--warmup', type=int, default=300, help='ticks played before timing, to grow the snakes')
+    parser.add_argument('--ticks', type=int, default=500)
+    parser.add_argument('--pairwise-every', type=int, default=25, help='ticks between pairwise checks')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(f"{'snakes':>6} {'blocks':>8} {'step us':>9} {'us/snake':>9} {'ns/block':>9} {'AI us':>9} "
+          f"{'pairwise us':>12}")
+    for snakes in args.snakes:
+        step_us, ai_us, pairwise_us, cells = run(args.board, snakes, args.warmup, args.ticks,
+                                                 args.pairwise_every, args.seed)
+        print(f'{snakes:>6} {cells:>8.0f} {step_us:>9.1f} {step_us / snakes:>9.2f} {step_us / cells * 1000:>9.1f} '
+              f'{ai_us:>9.1f} {pairwise_us:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
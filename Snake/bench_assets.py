@@ -0,0 +1,97 @@
+"""
+Cost of loading the game's assets on a restart, with and without the shared asset manager.
+
+A restart ('C' after game over) builds new views for the snake, fruits, boom, power-up and
+obstacles. Each view used to decode its own files:
+  before: every view calls pygame.image.load() / pygame.mixer.Sound() for its files;
+  after:  every view asks an AssetManager, which decoded each file once.
+Also times a cold start: loading everything on the main thread, against preload() on a
+background thread while the main thread does other start-up work, then waiting for the rest.
+
+    python bench_assets.py --restarts 20 --obstacles 10
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from assets import AssetManager, IMAGE_NAMES, SOUND_NAMES
+
+
+def restart_files(obstacles):
+    """
+    Returns the (kind, name) files the views of one game load, duplicates included.
+    """
+    snake = [('image', name) for name in IMAGE_NAMES[:14]] + [('sound', 'crunch')]
+    items = [('image', 'apple'), ('image', 'banana'), ('image', 'obstacle'), ('image', 'boom'), ('image', 'power_up')]
+    return snake + items + [('image', 'obstacle')] * obstacles
+
+
+def load_directly(files):
+    """
+    Decodes every file, the way the views used to.
+    """
+    for kind, name in files:
+        if kind == 'image':
+            pygame.image.load(f'Graphics/{name}.png').convert_alpha()
+        else:
+            pygame.mixer.Sound(f'Sound/{name}.wav')
+
+
+def load_shared(manager, files):
+    """
+    Gets every file from the asset manager.
+    """
+    for kind, name in files:
+        if kind == 'image':
+            manager.image(name)
+        else:
+            manager.sound(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time asset loading on restarts and at start-up.')
+    parser.add_argument('--restarts', type=int, default=20)
+    parser.add_argument('--obstacles', type=int, default=10)
+    parser.add_argument('--startup-work-ms', type=float, default=20.0,
+                        help='main-thread work that runs while the background preload is going')
+    args = parser.parse_args()
+    pygame.init()
+    pygame.mixer.init()
+    pygame.display.set_mode((800, 800))
+    files = restart_files(args.obstacles)
+    all_files = [('image', name) for name in IMAGE_NAMES] + [('sound', name) for name in SOUND_NAMES]
+
+    start = time.perf_counter()
+    load_directly(all_files)
+    cold_direct = time.perf_counter() - start
+    manager = AssetManager()
+    start = time.perf_counter()
+    manager.preload()
+    time.sleep(args.startup_work_ms / 1000)
+    manager.wait()
+    load_shared(manager, all_files)
+    cold_preload = time.perf_counter() - start - args.startup_work_ms / 1000
+
+    start = time.perf_counter()
+    for _ in range(args.restarts):
+        load_directly(files)
+    before = (time.perf_counter() - start) / args.restarts
+    start = time.perf_counter()
+    for _ in range(args.restarts):
+        load_shared(manager, files)
+    after = (time.perf_counter() - start) / args.restarts
+
+    print(f'cold start: {cold_direct * 1000:.2f} ms on the main thread, '
+          f'{max(cold_preload, 0.0) * 1000:.2f} ms left after {args.startup_work_ms:.0f} ms of other work with preload()')
+    print(f'restart with {len(files)} file requests: before {before * 1000:.3f} ms, after {after * 1000:.3f} ms')
+    print(f'distinct surfaces held: before {len(files) - 1} per game, after {len(manager.images)} in total')
+    print(manager.report())
+
+
+if __name__ == '__main__':
+    main()
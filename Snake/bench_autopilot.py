@@ -0,0 +1,57 @@
+"""
+Autopilot decision time by board size.
+
+Lets the autopilot play on boards of several sizes and reports the time Autopilot.decide() took per
+tick (median, 99th percentile and worst), how many searches it ran and how many of them hit the
+per-decision deadline, and how far the snake got. Each board is played twice: once keeping plans
+across ticks, as the game does, and once dropping the plan before every decision, so that each tick
+searches from scratch.
+
+    python bench_autopilot.py --boards 20 50 100 200 --ticks 5000 --budget-ms 1
+"""
+import argparse
+import time
+
+from autopilot import Autopilot, percentile
+from engine import SnakeEngine
+
+
+def run(size, ticks, budget_ms, seed, keep_plans):
+    """
+    Plays up to the given number of ticks, starting a new game after each game over, and returns
+    the sorted decision times in milliseconds, the autopilot and the best score.
+    """
+    engine = SnakeEngine(size, size, seed)
+    autopilot = Autopilot(engine, budget_ms, samples=ticks)
+    best = 0
+    for tick in range(ticks):
+        if not keep_plans:
+            autopilot.forget()
+        state, reward, done = engine.step(autopilot.decide())
+        if done:
+            best = max(best, state.score)
+            engine.reset(seed + tick + 1)
+    best = max(best, engine.state.score)
+    return sorted(t * 1000 for t in autopilot.decision_times), autopilot, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time autopilot decisions on boards of several sizes.')
+    parser.add_argument('--boards', type=int, nargs='+', default=[20, 50, 100, 200], help='cells along each side')
+    parser.add_argument('--ticks', type=int, default=5000)
+    parser.add_argument('--budget-ms', type=float, default=1.0, help='time the searches of one decision may take')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(f"{'board':>9} {'plans':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'searches':>9} "
+          f"{'timeouts':>9} {'best score':>11} {'seconds':>8}")
+    for size in args.boards:
+        for keep_plans in (True, False):
+            start = time.perf_counter()
+            times, autopilot, best = run(size, args.ticks, args.budget_ms, args.seed, keep_plans)
+            print(f"{size:>4}x{size:<4} {'kept' if keep_plans else 'dropped':>7} {percentile(times, 0.5):>8.3f} "
+                  f'{percentile(times, 0.99):>8.3f} {times[-1]:>8.3f} {autopilot.searches:>9} '
+                  f'{autopilot.timeouts:>9} {best:>11} {time.perf_counter() - start:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
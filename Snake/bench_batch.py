@@ -0,0 +1,72 @@
+"""
+Scaling benchmark for the vectorized batch engine.
+
+For each batch size N, steps a BatchEngine of N boards and, for comparison, N SnakeEngine objects
+one by one, both with the same seeded random policy. Prints board-steps per second for each.
+
+    python bench_batch.py --sizes 1 64 1024 16384
+"""
+import argparse
+import time
+
+import numpy as np
+
+from batch_engine import BatchEngine
+from engine import SnakeEngine, DIRECTIONS
+
+
+def random_actions(rng, n, turn_chance):
+    """
+    Returns one random action per board: a direction index, or -1 to keep going.
+    """
+    return np.where(rng.random(n) < turn_chance, rng.integers(0, len(DIRECTIONS), n), -1)
+
+
+def bench_batch(n, steps, seed, turn_chance):
+    """
+    Measures board-steps per second of a BatchEngine with n boards.
+    """
+    rng = np.random.default_rng(seed)
+    engine = BatchEngine(n, seed=seed)
+    actions = [random_actions(rng, n, turn_chance) for _ in range(steps)]
+    start = time.perf_counter()
+    for action in actions:
+        engine.step(action)
+    return n * steps / (time.perf_counter() - start)
+
+
+def bench_sequential(n, steps, seed, turn_chance):
+    """
+    Measures board-steps per second of n SnakeEngine objects stepped one after another.
+    """
+    rng = np.random.default_rng(seed)
+    engines = [SnakeEngine(seed=seed + i) for i in range(n)]
+    actions = [[DIRECTIONS[a] if a >= 0 else None for a in random_actions(rng, n, turn_chance)]
+               for _ in range(steps)]
+    start = time.perf_counter()
+    for step_actions in actions:
+        for engine, action in zip(engines, step_actions):
+            state, reward, done = engine.step(action)
+            if done:
+                engine.reset()
+    return n * steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare BatchEngine with stepping SnakeEngine objects one by one.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 64, 1024, 16384])
+    parser.add_argument('--board-steps', type=int, default=200000,
+                        help='approximate number of board-steps to time per batch size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--turn-chance', type=float, default=0.2)
+    args = parser.parse_args()
+    print(f"{'N':>7} {'batch steps/s':>15} {'one-by-one steps/s':>20} {'speed-up':>9}")
+    for n in args.sizes:
+        steps = max(20, args.board_steps // n)
+        batch = bench_batch(n, steps, args.seed, args.turn_chance)
+        sequential = bench_sequential(n, steps, args.seed, args.turn_chance)
+        print(f'{n:>7} {batch:>15,.0f} {sequential:>20,.0f} {batch / sequential:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
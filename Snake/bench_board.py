@@ -0,0 +1,101 @@
+"""
+Render cost on boards much bigger than the window.
+
+Plays a game with a fruit-chasing policy on boards of several sizes, showing the same window of
+cells through a camera that follows the head, and times:
+  frame    DirtyRenderer.render() plus pygame.display.update(), averaged over every frame,
+           including the frames where the camera scrolled and the window was repainted;
+  repaint  a full repaint of the window after invalidate(), as after a menu or pause;
+  draw     the immediate-mode path: the visible grass chunks, the snake and the items.
+It also prints how many background chunks were drawn and how big the single background surface
+the renderer used to keep for the whole board would have been.
+
+    python bench_board.py --boards 20 200 2000 --view 20 --cell-size 40
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from engine import SnakeEngine
+from render import Camera, DirtyRenderer, snake_blits
+from bench_render import load_images, choose_action, Hud
+
+
+def draw_immediate(screen, renderer, state, images, cell_size):
+    """
+    Draws the window the way MAIN.draw_elements() does, through the renderer's camera.
+    """
+    camera = renderer.camera
+    renderer.background.blit(screen, camera)
+    screen.blits(snake_blits(state.snake, images, cell_size, camera), doreturn=False)
+    for item, name in ((state.fruit, 'apple'), (state.power_up, 'power_up')):
+        if item.pos is not None:
+            rect = camera.cell_rect(item.pos[0], item.pos[1], cell_size)
+            if rect:
+                screen.blit(images[name], rect)
+
+
+def run(size, view, cell_size, frames, frames_per_tick, seed):
+    """
+    Plays frames on a size x size board and returns the timings in milliseconds and the renderer.
+    """
+    screen = pygame.display.set_mode((min(size, view) * cell_size, min(size, view) * cell_size))
+    images = load_images(cell_size)
+    font = pygame.font.Font('Font/PoetsenOne-Regular.ttf', 25)
+    engine = SnakeEngine(size, size, seed)
+    renderer = DirtyRenderer(screen, cell_size, Hud(screen, font, engine).draw, Camera(size, size, view, view))
+    renderer.images = images
+    rng = random.Random(seed)
+    frame_time = repaint_time = draw_time = 0.0
+    repaints = 0
+    for frame in range(frames):
+        if frame % frames_per_tick == 0:
+            state, reward, done = engine.step(choose_action(engine.state, rng))
+            if done:
+                engine.reset(seed + frame)
+        state = engine.state
+        hud_key = (state.score, state.elapsed_seconds(), state.level)
+        start = time.perf_counter()
+        rects = renderer.render(state, hud_key)
+        if rects:
+            pygame.display.update(rects)
+        frame_time += time.perf_counter() - start
+        if frame % 50 == 0:
+            renderer.invalidate()
+            start = time.perf_counter()
+            pygame.display.update(renderer.render(state, hud_key))
+            repaint_time += time.perf_counter() - start
+            start = time.perf_counter()
+            draw_immediate(screen, renderer, state, images, cell_size)
+            draw_time += time.perf_counter() - start
+            repaints += 1
+    return frame_time / frames * 1000, repaint_time / repaints * 1000, draw_time / repaints * 1000, renderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time rendering a fixed window onto boards of several sizes.')
+    parser.add_argument('--boards', type=int, nargs='+', default=[20, 200, 2000], help='cells along each side')
+    parser.add_argument('--view', type=int, default=20, help='cells along each side of the window')
+    parser.add_argument('--cell-size', type=int, default=40)
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--frames-per-tick', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    pygame.init()
+    print(f"{'board':>11} {'frame ms':>9} {'repaint ms':>11} {'draw ms':>8} {'chunks':>7} {'length':>7} "
+          f"{'whole-board bg MiB':>19}")
+    for size in args.boards:
+        frame_ms, repaint_ms, draw_ms, renderer = run(size, args.view, args.cell_size, args.frames,
+                                                      args.frames_per_tick, args.seed)
+        whole = (size * args.cell_size) ** 2 * 4 / 2**20
+        print(f'{size:>5}x{size:<5} {frame_ms:>9.3f} {repaint_ms:>11.3f} {draw_ms:>8.3f} '
+              f'{renderer.background.drawn:>7} {renderer.state.snake.length:>7} {whole:>19.0f}')
+
+
+if __name__ == '__main__':
+    main()
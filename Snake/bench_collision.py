@@ -0,0 +1,81 @@
+"""
+Per-tick collision cost versus snake length.
+
+Lays a snake of the given lengths on a wide board and times SnakeEngine.step(), whose collision
+queries go through the occupancy grid, next to the list scans the game used before the grid:
+the self-collision scan of body[1:] and the body-times-obstacles loop of check_collision().
+
+    python bench_collision.py --lengths 10 100 1000 10000 100000
+"""
+import argparse
+import time
+
+from engine import SnakeEngine, RIGHT
+
+WIDTH = 1000
+
+
+def lay_snake(length):
+    """
+    Returns an engine whose snake has the given length, coiled row by row under a free row that the
+    head can run along for the given number of ticks. The snake is kept invincible so that randomly
+    placed obstacles and booms cannot end the run.
+    """
+    height = length // WIDTH + 4
+    engine = SnakeEngine(WIDTH, height, seed=0)
+    state = engine.state
+    cells = []
+    for index in range(length):
+        row, col = divmod(index, WIDTH)
+        cells.append((col if row % 2 == 0 else WIDTH - 1 - col, height - 1 - row))
+    cells.reverse()
+    head_row = cells[0][1] - 1
+    state.snake.set_body([(0, head_row)] + cells[:-1])
+    state.snake.direction = RIGHT
+    state.grid.remove_item(state.power_up)
+    state.power_up_active = True
+    state.power_up_timer = float('inf')
+    return engine
+
+
+def legacy_scan(body, obstacles):
+    """
+    Repeats the per-tick list scans of the original MAIN.check_collision() and check_fail().
+    """
+    head = body[0]
+    hits = 0
+    for block in body[1:]:
+        for obstacle in obstacles:
+            if block == obstacle:
+                hits += 1
+    for block in body[1:]:
+        if block == head:
+            hits += 1
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time collision checks per tick against snake length.')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument('--ticks', type=int, default=500)
+    args = parser.parse_args()
+    print(f"{'length':>8} {'grid step us/tick':>18} {'list scan us/tick':>18}")
+    for length in args.lengths:
+        engine = lay_snake(length)
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            state, reward, done = engine.step()
+        grid_us = (time.perf_counter() - start) / args.ticks * 1e6
+        assert not done
+        body = list(state.snake.body)
+        obstacles = [obstacle.pos for obstacle in state.obstacles]
+        repeats = max(1, 200000 // length)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            legacy_scan(body, obstacles)
+        scan_us = (time.perf_counter() - start) / repeats * 1e6
+        print(f'{length:>8} {grid_us:>18.2f} {scan_us:>18.2f}')
+
+
+if __name__ == '__main__':
+    main()
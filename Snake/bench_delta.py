@@ -0,0 +1,116 @@
+"""
+Bytes per tick and throughput of the delta stream versus full JSON snapshots.
+
+Plays games with the greedy tournament policy on boards of several sizes, starting a new game after
+each game over, and serializes the state after every tick two ways:
+  json   the whole state as a JSON object, as save_game() used to write it, plus the obstacles,
+         level and flags a spectator also needs;
+  delta  a DeltaEncoder record, with a keyframe every --keyframe-every ticks.
+For each it reports the mean bytes per tick and how many ticks per second encode and decode, and
+checks every decoded delta view against the game.
+
+    python bench_delta.py --boards 20 50 100 --ticks 20000
+"""
+import argparse
+import json
+import time
+
+from delta import DeltaDecoder, DeltaEncoder, KEYFRAME_EVERY, on_board, flags_of
+from engine import SnakeEngine
+from tournament import greedy_policy
+
+
+def json_state(state):
+    """
+    Returns the full state of a game as a JSON string.
+    """
+    def pos(item):
+        return list(item.pos) if item.pos is not None and state.grid.item_at(*item.pos) is item else None
+    return json.dumps({
+        'tick': state.tick,
+        'snake_body': [list(block) for block in state.snake.blocks()],
+        'snake_direction': list(state.snake.direction),
+        'fruit_position': pos(state.fruit),
+        'big_fruit_position': pos(state.big_fruit),
+        'boom_position': pos(state.boom),
+        'power_position': pos(state.power_up),
+        'obstacles': [pos(obstacle) for obstacle in state.obstacles],
+        'score': state.score,
+        'level': state.level,
+        'flags': flags_of(state),
+    })
+
+
+def check(decoder, state):
+    """
+    Raises AssertionError if the decoded view differs from the game.
+    """
+    width = state.width
+    assert decoder.tick == state.tick
+    assert list(decoder.cells) == [y * width + x for x, y in state.snake.blocks()]
+    assert decoder.items == [on_board(state.grid, item, width)
+                             for item in (state.fruit, state.big_fruit, state.boom, state.power_up)]
+    assert decoder.obstacles == [on_board(state.grid, item, width) for item in state.obstacles]
+    assert (decoder.score, decoder.level, decoder.flags) == (state.score, state.level, flags_of(state))
+
+
+def record(size, ticks, seed, keyframe_every):
+    """
+    Plays the given number of ticks and returns the JSON snapshots, the delta records, the seconds
+    spent encoding each, and the number of keyframes.
+    """
+    engine = SnakeEngine(size, size, seed)
+    choose = greedy_policy(engine, seed)
+    encoder = DeltaEncoder(size, size, keyframe_every)
+    decoder = DeltaDecoder(size, size)
+    snapshots = []
+    records = []
+    json_seconds = delta_seconds = 0.0
+    keyframes = 0
+    for tick in range(ticks):
+        state, reward, done = engine.step(choose())
+        start = time.perf_counter()
+        snapshots.append(json_state(state))
+        middle = time.perf_counter()
+        records.append(encoder.encode(state))
+        delta_seconds += time.perf_counter() - middle
+        json_seconds += middle - start
+        keyframes += encoder.keyframe
+        decoder.apply(records[-1])
+        check(decoder, state)
+        if done:
+            engine.reset(seed + tick + 1)
+            choose = greedy_policy(engine, seed + tick + 1)
+    return snapshots, records, json_seconds, delta_seconds, keyframes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the delta stream with full JSON snapshots.')
+    parser.add_argument('--boards', type=int, nargs='+', default=[20, 50, 100], help='cells along each side')
+    parser.add_argument('--ticks', type=int, default=20000)
+    parser.add_argument('--keyframe-every', type=int, default=KEYFRAME_EVERY)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(f"{'board':>9} {'json B/tick':>12} {'delta B/tick':>13} {'ratio':>6} {'keyframes':>10} "
+          f"{'json enc/s':>11} {'delta enc/s':>12} {'json dec/s':>11} {'delta dec/s':>12}")
+    for size in args.boards:
+        snapshots, records, json_seconds, delta_seconds, keyframes = record(size, args.ticks, args.seed,
+                                                                           args.keyframe_every)
+        start = time.perf_counter()
+        for snapshot in snapshots:
+            json.loads(snapshot)
+        json_decode = time.perf_counter() - start
+        decoder = DeltaDecoder(size, size)
+        start = time.perf_counter()
+        for data in records:
+            decoder.apply(data)
+        delta_decode = time.perf_counter() - start
+        json_bytes = sum(len(snapshot) for snapshot in snapshots) / args.ticks
+        delta_bytes = sum(len(data) for data in records) / args.ticks
+        print(f'{size:>4}x{size:<4} {json_bytes:>12.1f} {delta_bytes:>13.2f} {json_bytes / delta_bytes:>5.0f}x '
+              f'{keyframes:>10} {args.ticks / json_seconds:>11,.0f} {args.ticks / delta_seconds:>12,.0f} '
+              f'{args.ticks / json_decode:>11,.0f} {args.ticks / delta_decode:>12,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Per-frame cost of drawing the whole snake.
+
+Lays a snake of the given length in a serpentine on a large board and times a full draw of it
+on an off-screen display (SDL dummy driver):
+  before: the old SNAKE.draw_snake(), which built Vector2 objects for every block and chose
+          its sprite through a chain of comparisons, blitting one block at a time;
+  after:  render.snake_blits(), which looks the sprites up from the connection codes stored
+          in the engine's snake, drawn with a single Surface.blits() call.
+The last two columns split 'after' into building the blit sequence and the blits themselves;
+the pixel work of the blits is the same both ways and bounds the speedup of a full draw.
+
+    python bench_draw_snake.py --lengths 100 1000 5000
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from pygame.math import Vector2
+
+from engine import SnakeEngine
+from render import snake_blits
+
+SNAKE_IMAGES = ('head_up', 'head_down', 'head_right', 'head_left', 'tail_up', 'tail_down', 'tail_right',
+                'tail_left', 'body_vertical', 'body_horizontal', 'body_tr', 'body_tl', 'body_br', 'body_bl')
+
+
+def serpentine(length, width):
+    """
+    Returns the cells of a snake winding row by row across a board, head first.
+    """
+    cells = []
+    for index in range(length):
+        y, x = divmod(index, width)
+        cells.append((x if y % 2 == 0 else width - 1 - x, y))
+    return cells[::-1]
+
+
+def vector_draw(screen, snake, images, cell_size):
+    """
+    Draws the snake the way SNAKE.draw_snake() used to.
+    """
+    body = [Vector2(block) for block in snake.blocks()]
+    head_relation = body[1] - body[0]
+    head = images[{(1, 0): 'head_left', (-1, 0): 'head_right', (0, 1): 'head_up', (0, -1): 'head_down'}[
+        (int(head_relation.x), int(head_relation.y))]]
+    tail_relation = body[-2] - body[-1]
+    tail = images[{(1, 0): 'tail_left', (-1, 0): 'tail_right', (0, 1): 'tail_up', (0, -1): 'tail_down'}[
+        (int(tail_relation.x), int(tail_relation.y))]]
+    for index, block in enumerate(body):
+        block_rect = pygame.Rect(int(block.x * cell_size), int(block.y * cell_size), cell_size, cell_size)
+        if index == 0:
+            screen.blit(head, block_rect)
+        elif index == len(body) - 1:
+            screen.blit(tail, block_rect)
+        else:
+            previous_block = body[index + 1] - block
+            next_block = body[index - 1] - block
+            if previous_block.x == next_block.x:
+                screen.blit(images['body_vertical'], block_rect)
+            elif previous_block.y == next_block.y:
+                screen.blit(images['body_horizontal'], block_rect)
+            elif previous_block.x == -1 and next_block.y == -1 or previous_block.y == -1 and next_block.x == -1:
+                screen.blit(images['body_tl'], block_rect)
+            elif previous_block.x == -1 and next_block.y == 1 or previous_block.y == 1 and next_block.x == -1:
+                screen.blit(images['body_bl'], block_rect)
+            elif previous_block.x == 1 and next_block.y == -1 or previous_block.y == -1 and next_block.x == 1:
+                screen.blit(images['body_tr'], block_rect)
+            elif previous_block.x == 1 and next_block.y == 1 or previous_block.y == 1 and next_block.x == 1:
+                screen.blit(images['body_br'], block_rect)
+
+
+def time_frames(draw, frames):
+    """
+    Returns the mean time of a draw in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time drawing the whole snake with and without the sprite table.')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--size', type=int, default=100, help='board width and height in cells')
+    parser.add_argument('--cell-size', type=int, default=8)
+    parser.add_argument('--frames', type=int, default=50)
+    args = parser.parse_args()
+    pygame.init()
+    screen = pygame.display.set_mode((args.size * args.cell_size, args.size * args.cell_size))
+    images = {name: pygame.transform.smoothscale(pygame.image.load(f'Graphics/{name}.png').convert_alpha(),
+                                                 (args.cell_size, args.cell_size)) for name in SNAKE_IMAGES}
+    print(f"{'length':>7} {'before ms':>10} {'after ms':>9} {'speedup':>8} {'build ms':>9} {'blit ms':>8}")
+    for length in args.lengths:
+        engine = SnakeEngine(args.size, args.size, seed=0)
+        snake = engine.state.snake
+        snake.set_body(serpentine(length, args.size))
+        before = time_frames(lambda: vector_draw(screen, snake, images, args.cell_size), args.frames)
+        after = time_frames(lambda: screen.blits(snake_blits(snake, images, args.cell_size), doreturn=False),
+                            args.frames)
+        build = time_frames(lambda: snake_blits(snake, images, args.cell_size), args.frames)
+        sequence = snake_blits(snake, images, args.cell_size)
+        blit = time_frames(lambda: screen.blits(sequence, doreturn=False), args.frames)
+        print(f'{length:>7} {before:>10.3f} {after:>9.3f} {before / after:>7.1f}x {build:>9.3f} {blit:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Throughput benchmark for the headless engine.
+
+Plays games with a seeded random policy as fast as possible and reports how many ticks per second
+SnakeEngine.step() sustains. Finished games are reset with the next seed.
+
+    python bench_engine.py --ticks 500000 --size 20
+"""
+import argparse
+import random
+import time
+
+from engine import SnakeEngine, DIRECTIONS
+
+
+def run(ticks, size, seed, turn_chance):
+    """
+    Steps a single engine for the given number of ticks.
+    Args:
+        ticks (int): Number of ticks to simulate.
+        size (int): Board width and height in cells.
+        seed (int): Seed of the first game; later games use seed + 1, seed + 2, ...
+        turn_chance (float): Probability of turning on any given tick.
+    Returns:
+        dict: Ticks, games, elapsed seconds and ticks per second.
+    """
+    policy = random.Random(seed)
+    engine = SnakeEngine(size, size, seed)
+    step = engine.step
+    games = 1
+    action = DIRECTIONS[3]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        state, reward, done = step(action)
+        if done:
+            games += 1
+            engine.reset(seed + games)
+        action = policy.choice(DIRECTIONS) if policy.random() < turn_chance else None
+    elapsed = time.perf_counter() - start
+    return {'ticks': ticks, 'games': games, 'seconds': elapsed, 'ticks_per_second': ticks / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure SnakeEngine ticks per second.')
+    parser.add_argument('--ticks', type=int, default=200000)
+    parser.add_argument('--size', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--turn-chance', type=float, default=0.2)
+    args = parser.parse_args()
+    result = run(args.ticks, args.size, args.seed, args.turn_chance)
+    print(f"{result['ticks']} ticks, {result['games']} games in {result['seconds']:.2f}s: "
+          f"{result['ticks_per_second']:,.0f} ticks/s")
+
+
+if __name__ == '__main__':
+    main()
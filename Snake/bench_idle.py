@@ -0,0 +1,57 @@
+"""
+CPU use of the idle screens.
+
+Starts the game with the dummy video driver and leaves each screen that waits for the player (the
+main menu, help, pause and game over) alone for a few seconds, then reports the CPU time each one
+used as a percentage of one core. For comparison it also runs the loop those screens used before
+they blocked on the event queue: pygame.event.get() in a loop with nothing to sleep on.
+
+    python bench_idle.py --seconds 3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+import snake
+from startup import StartupTimer
+
+
+def polling(seconds):
+    """
+    Returns the CPU use, in percent of a core, of polling the event queue for the given time.
+    """
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    while time.perf_counter() - wall < seconds:
+        pygame.event.get()
+    return 100 * (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the CPU use of the screens that wait for the player.')
+    parser.add_argument('--seconds', type=float, default=3.0, help='time to leave each screen idle')
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        snake.SAVE_FILE = os.path.join(directory, 'savegame.dat')
+        snake.LEADERBOARD_FILE = os.path.join(directory, 'leaderboard.db')
+        snake.start(StartupTimer(time.perf_counter()))
+        screens = snake.build_screens()
+        for name in ('menu', 'help', 'pause', 'game_over'):
+            pygame.event.clear()
+            pygame.time.set_timer(pygame.event.Event(pygame.QUIT), int(args.seconds * 1000), 1)
+            screens.visit(name)
+        print(screens.report())
+        print(f"{'polling':<10} {'':>6} {args.seconds:>8.2f} {polling(args.seconds):>6.1f}")
+        snake.main_game.autosaver.close()
+        snake.leaderboard.close()
+        pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Leaderboard insert and query cost at scale.
+
+Fills a fresh leaderboard with random runs in batches and reports rows per second, then times the
+queries the game makes: the top ten, one player's best runs, the rank of a score and the best score.
+Finally several processes insert the same number of runs at once, first committing every run and
+then committing in batches, to show what batching does to contention on the write lock. For
+comparison it also times the old high_scores.json read-sort-rewrite for one finished run.
+
+    python bench_leaderboard.py --rows 1000000 --batch 10000 --writers 4
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from leaderboard import Leaderboard, Run
+
+PLAYERS = 1000
+
+
+def random_runs(count, seed):
+    """
+    Returns count runs by random players with random scores.
+    """
+    rng = random.Random(seed)
+    return [Run(f'player{rng.randrange(PLAYERS)}', rng.randrange(500), rng.randrange(1, 4),
+                rng.randrange(1000, 600000), rng.randrange(10, 5000), rng.getrandbits(62), 0.0)
+            for _ in range(count)]
+
+
+def insert(path, runs, batch):
+    """
+    Stores runs in a leaderboard, committing every batch runs, and returns the seconds it took.
+    """
+    board = Leaderboard(path)
+    start = time.perf_counter()
+    for index in range(0, len(runs), batch):
+        board.add_many(runs[index:index + batch])
+    elapsed = time.perf_counter() - start
+    board.close()
+    return elapsed
+
+
+def timed(function, repeats):
+    """
+    Returns the mean time of a call in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def json_high_scores(path, score):
+    """
+    Adds a score the way save_game() used to.
+    """
+    try:
+        with open(path) as f:
+            scores = json.load(f)
+    except FileNotFoundError:
+        scores = []
+    scores.append(score)
+    scores.sort(reverse=True)
+    with open(path, 'w') as f:
+        json.dump(scores[:5], f)
+
+
+def concurrent_insert(path, writers, runs_per_writer, batch):
+    """
+    Inserts runs from several processes at once and returns the rows per second over all of them.
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(writers) as pool:
+        list(pool.map(insert, [path] * writers,
+                      [random_runs(runs_per_writer, seed) for seed in range(writers)], [batch] * writers))
+    return writers * runs_per_writer / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time leaderboard inserts and queries on a large board.')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--batch', type=int, default=10000, help='runs per transaction for bulk inserts')
+    parser.add_argument('--writers', type=int, default=4, help='processes inserting at once')
+    parser.add_argument('--writer-rows', type=int, default=2000, help='runs each concurrent process inserts')
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'leaderboard.db')
+
+        runs = random_runs(args.rows, 0)
+        elapsed = insert(path, runs, args.batch)
+        print(f'inserted {args.rows} runs in batches of {args.batch}: {args.rows / elapsed:,.0f} rows/s')
+
+        board = Leaderboard(path)
+        print(f'database {os.path.getsize(path) / 2**20:.1f} MiB')
+        single_ms = timed(lambda: board.add(random_runs(1, 1)[0]), 50)
+        print(f"{'query':>22} {'ms':>8}")
+        print(f"{'add one run':>22} {single_ms:>8.3f}")
+        print(f"{'top 10':>22} {timed(lambda: board.top(10), args.repeats):>8.3f}")
+        print(f"{'top 10 of a player':>22} {timed(lambda: board.top(10, 'player7'), args.repeats):>8.3f}")
+        print(f"{'best score':>22} {timed(board.best_score, args.repeats):>8.3f}")
+        print(f"{'rank near the top':>22} {timed(lambda: board.rank(495), args.repeats):>8.3f}")
+        print(f"{'rank at the median':>22} {timed(lambda: board.rank(250), 20):>8.3f}")
+        board.close()
+        json_ms = timed(lambda: json_high_scores(os.path.join(directory, 'high_scores.json'), 42), args.repeats)
+        print(f"{'old json high scores':>22} {json_ms:>8.3f}")
+
+        print(f'{args.writers} processes inserting {args.writer_rows} runs each')
+        for batch in (1, 100, args.writer_rows):
+            rate = concurrent_insert(os.path.join(directory, f'concurrent{batch}.db'), args.writers,
+                                     args.writer_rows, batch)
+            print(f'  commit every {batch:>5} runs: {rate:>10,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
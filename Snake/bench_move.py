@@ -0,0 +1,70 @@
+"""
+Time and memory per move of the ring-buffer snake versus the old list-copying move.
+
+The old SNAKE.move_snake() copied the body list twice per tick and inserted the new head at the
+front. engine.Snake.move() pushes one packed cell at the head and pops one at the tail.
+
+    python bench_move.py --lengths 10 1000 10000 50000
+"""
+import argparse
+import time
+import tracemalloc
+
+from pygame.math import Vector2
+
+from engine import Snake, RIGHT
+from grid import OccupancyGrid
+
+
+def list_move(body, direction):
+    """
+    Repeats the old SNAKE.move_snake() for a snake that is not growing.
+    """
+    body_copy = body[:-1]
+    body_copy.insert(0, body_copy[0] + direction)
+    return body_copy[:]
+
+
+def measure(move, moves):
+    """
+    Runs move() the given number of times, once untraced for timing and once under tracemalloc.
+    Returns:
+        tuple: (microseconds per move, peak bytes allocated during the traced run).
+    """
+    start = time.perf_counter()
+    for _ in range(moves):
+        move()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(moves):
+        move()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed / moves * 1e6, peak - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the ring-buffer snake with the old list-copying move.')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[10, 1000, 10000, 50000])
+    parser.add_argument('--moves', type=int, default=500)
+    args = parser.parse_args()
+    print(f"{'length':>8} {'ring us':>9} {'ring peak B':>12} {'list us':>10} {'list peak B':>12}")
+    for length in args.lengths:
+        grid = OccupancyGrid(length + 2 * args.moves + 1, 1)
+        snake = Snake(grid)
+        snake.set_body([(x, 0) for x in range(length - 1, -1, -1)])
+        snake.direction = RIGHT
+        ring_us, ring_peak = measure(snake.move, args.moves)
+
+        state = {'body': [Vector2(x, 0) for x in range(length - 1, -1, -1)]}
+        step = Vector2(1, 0)
+
+        def move():
+            state['body'] = list_move(state['body'], step)
+        list_us, list_peak = measure(move, args.moves)
+        print(f'{length:>8} {ring_us:>9.2f} {ring_peak:>12,} {list_us:>10.2f} {list_peak:>12,}')
+
+
+if __name__ == '__main__':
+    main()
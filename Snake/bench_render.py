@@ -0,0 +1,163 @@
+"""
+Frame time of the dirty-rectangle renderer versus the old full repaint.
+
+Runs a game with a simple fruit-chasing policy on an off-screen display (SDL dummy driver) and
+times each frame both ways:
+  before: fill the window, draw every grass square with pygame.draw.rect, blit every entity and
+          re-render the HUD text, then update the whole display, as the main loop used to;
+  after:  DirtyRenderer.render() plus pygame.display.update() of the returned rectangles.
+The game ticks once every few frames, as it does at 60 FPS with a 150 ms tick. CPU usage is the
+share of one core the frame work would take at 60 FPS.
+
+    python bench_render.py --boards 20:40 200:4
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from engine import SnakeEngine, DIRECTIONS
+from render import DirtyRenderer, segment_image_name, GRASS_COLOR, BACKGROUND_COLOR
+
+IMAGE_FILES = {name: name for name in (
+    'head_up', 'head_down', 'head_right', 'head_left', 'tail_up', 'tail_down', 'tail_right', 'tail_left',
+    'body_vertical', 'body_horizontal', 'body_tr', 'body_tl', 'body_br', 'body_bl',
+    'apple', 'boom', 'obstacle', 'power_up')}
+IMAGE_FILES['banana'] = 'banana'
+
+
+def load_images(cell_size):
+    """
+    Loads the game sprites scaled to the cell size.
+    """
+    images = {}
+    for name, file_name in IMAGE_FILES.items():
+        image = pygame.image.load(f'Graphics/{file_name}.png').convert_alpha()
+        if image.get_width() != cell_size:
+            image = pygame.transform.smoothscale(image, (cell_size, cell_size))
+        images[name] = image
+    return images
+
+
+def choose_action(state, rng):
+    """
+    Heads for the fruit, with a random turn now and then.
+    """
+    x, y = state.snake.head
+    fx, fy = state.fruit.pos or (0, 0)
+    if rng.random() < 0.1:
+        return rng.choice(DIRECTIONS)
+    if fx != x:
+        return (1, 0) if fx > x else (-1, 0)
+    return (0, 1) if fy > y else (0, -1)
+
+
+class Hud:
+    """
+    Draws score, time and level boxes the way MAIN.draw_score() and MAIN.draw_level() do.
+    """
+
+    def __init__(self, screen, font, engine):
+        self.screen = screen
+        self.font = font
+        self.engine = engine
+
+    def draw(self):
+        state = self.engine.state
+        rects = []
+        right = self.screen.get_width()
+        for text, center in ((str(state.score), (60, 40)), (f'{state.elapsed_seconds()}s', (right - 40, 40)),
+                             (f'Level: {state.level}', (right - 120, 40))):
+            surface = self.font.render(text, True, (56, 74, 12))
+            rect = surface.get_rect(center=center)
+            box = pygame.Rect(rect.left, rect.top, rect.width + 6, rect.height)
+            pygame.draw.rect(self.screen, GRASS_COLOR, box)
+            self.screen.blit(surface, rect)
+            pygame.draw.rect(self.screen, (56, 74, 12), box, 2)
+            rects.append(box)
+        return rects
+
+
+def full_repaint(screen, state, images, cell_size, hud):
+    """
+    Repaints the whole frame the way the main loop did before the dirty renderer.
+    """
+    screen.fill(BACKGROUND_COLOR)
+    for row in range(state.height):
+        for col in range(state.width):
+            if (row + col) % 2 == 0:
+                pygame.draw.rect(screen, GRASS_COLOR, pygame.Rect(col * cell_size, row * cell_size, cell_size, cell_size))
+    shown = [(state.fruit, 'apple')] + [(obstacle, 'obstacle') for obstacle in state.obstacles]
+    if state.boom_active:
+        shown.append((state.boom, 'boom'))
+    if state.big_fruit_active:
+        shown.append((state.big_fruit, 'banana'))
+    if not state.power_up_active:
+        shown.append((state.power_up, 'power_up'))
+    for item, name in shown:
+        if item.pos is not None:
+            screen.blit(images[name], (item.pos[0] * cell_size, item.pos[1] * cell_size))
+    body = state.snake.body
+    for index, block in enumerate(body):
+        before = body[index - 1] if index > 0 else None
+        after = body[index + 1] if index < len(body) - 1 else None
+        name = segment_image_name(before, block, after)
+        if name:
+            screen.blit(images[name], (block[0] * cell_size, block[1] * cell_size))
+    hud.draw()
+    pygame.display.update()
+
+
+def run(size, cell_size, frames, frames_per_tick, dirty, seed):
+    """
+    Plays frames and returns the mean frame time in milliseconds.
+    """
+    screen = pygame.display.set_mode((size * cell_size, size * cell_size))
+    images = load_images(cell_size)
+    font = pygame.font.Font('Font/PoetsenOne-Regular.ttf', 25)
+    engine = SnakeEngine(size, size, seed)
+    hud = Hud(screen, font, engine)
+    renderer = DirtyRenderer(screen, cell_size, hud.draw)
+    renderer.images = images
+    rng = random.Random(seed)
+    elapsed = 0.0
+    for frame in range(frames):
+        if frame % frames_per_tick == 0:
+            state, reward, done = engine.step(choose_action(engine.state, rng))
+            if done:
+                engine.reset(seed + frame)
+        state = engine.state
+        start = time.perf_counter()
+        if dirty:
+            rects = renderer.render(state, (state.score, state.elapsed_seconds(), state.level))
+            if rects:
+                pygame.display.update(rects)
+        else:
+            full_repaint(screen, state, images, cell_size, hud)
+        elapsed += time.perf_counter() - start
+    return elapsed / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare full repaints with the dirty-rectangle renderer.')
+    parser.add_argument('--boards', nargs='+', default=['20:40', '200:4'],
+                        help='board sizes as CELLS:CELL_SIZE')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--frames-per-tick', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    pygame.init()
+    print(f"{'board':>9} {'before ms':>10} {'before CPU':>11} {'after ms':>9} {'after CPU':>10}")
+    for board in args.boards:
+        size, cell_size = (int(value) for value in board.split(':'))
+        before = run(size, cell_size, args.frames, args.frames_per_tick, False, args.seed)
+        after = run(size, cell_size, args.frames, args.frames_per_tick, True, args.seed)
+        print(f'{size:>4}x{size:<4} {before:>10.3f} {before * 6:>10.1f}% {after:>9.3f} {after * 6:>9.1f}%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Replay verification throughput.
+
+Records sessions played by a random bot (turning now and then, continuing after a game over a
+few times) into input logs, then replays and verifies every log, in one process and in a pool of
+worker processes. Prints the log size and how many sessions and ticks per second are verified.
+
+    python bench_replay.py --sessions 2000 --ticks 300 --workers 1 4
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import SnakeEngine, DIRECTIONS
+from replay import InputLog, replay
+
+
+def record_session(seed, ticks, turn_chance=0.2, continues=3):
+    """
+    Plays one session with a random bot and returns its encoded input log.
+    """
+    engine = SnakeEngine(seed=seed)
+    log = InputLog(seed, engine.width, engine.height)
+    rng = random.Random(seed)
+    state = engine.state
+    while state.tick < ticks:
+        action = rng.choice(DIRECTIONS) if rng.random() < turn_chance else None
+        if action is not None:
+            log.turn(state.tick, action)
+        engine.step(action)
+        if state.done:
+            if not continues:
+                break
+            continues -= 1
+            log.continue_game(state.tick)
+            engine.continue_game()
+    return log.encode(state)
+
+
+def verify_batch(logs):
+    """
+    Replays a batch of logs and returns how many verified and how many ticks were simulated.
+    """
+    verified = ticks = 0
+    for data in logs:
+        result = replay(data)
+        verified += result.ok
+        ticks += result.state.tick
+    return verified, ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how fast recorded sessions are replayed and verified.')
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--ticks', type=int, default=300, help='ticks per session')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+    logs = [record_session(seed, args.ticks) for seed in range(args.sessions)]
+    size = sum(map(len, logs))
+    print(f'{len(logs)} sessions, {size / len(logs):.0f} bytes per log on average')
+    print(f"{'workers':>7} {'sessions/s':>11} {'ticks/s':>10} {'verified':>9}")
+    for workers in args.workers:
+        start = time.perf_counter()
+        if workers == 1:
+            verified, ticks = verify_batch(logs)
+        else:
+            batches = [logs[index::workers * 8] for index in range(workers * 8)]
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(verify_batch, batches))
+            verified = sum(result[0] for result in results)
+            ticks = sum(result[1] for result in results)
+        elapsed = time.perf_counter() - start
+        print(f'{workers:>7} {len(logs) / elapsed:>11.0f} {ticks / elapsed:>10.0f} {verified:>5}/{len(logs)}')
+
+
+if __name__ == '__main__':
+    main()
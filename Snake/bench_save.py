@@ -0,0 +1,87 @@
+"""
+Save and load latency of the binary save format.
+
+Lays snakes of several lengths on boards big enough to hold them and times each part of a save:
+  snapshot  copying the game out of the engine, the only part that runs on the game thread;
+  encode    building the save file contents, on the autosave worker;
+  write     writing a temporary file, syncing it and renaming it over the save, on the worker;
+  load      reading, decoding and restoring the game;
+  json      the old save_game() json dump of the snake, fruits and score, for comparison; it ran on
+            the game thread and wrote the file in place.
+
+    python bench_save.py --boards 20:3 200:10000 400:100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from engine import SnakeEngine
+from savestate import snapshot, encode, write_atomic, load
+
+
+def serpentine(length, width):
+    """
+    Returns the cells of a snake winding row by row across a board, head first.
+    """
+    cells = []
+    for index in range(length):
+        y, x = divmod(index, width)
+        cells.append((x if y % 2 == 0 else width - 1 - x, y))
+    return cells[::-1]
+
+
+def json_save(state, path):
+    """
+    Writes the game the way save_game() used to.
+    """
+    game_state = {
+        'snake_body': [list(segment) for segment in state.snake.blocks()],
+        'snake_direction': list(state.snake.direction),
+        'fruit_position': list(state.fruit.pos) if state.fruit.pos else None,
+        'big_fruit_position': list(state.big_fruit.pos) if state.big_fruit.pos else None,
+        'boom_position': list(state.boom.pos) if state.boom.pos else None,
+        'power_position': list(state.power_up.pos) if state.power_up.pos else None,
+        'score': state.score,
+    }
+    with open(path, 'w') as f:
+        json.dump(game_state, f)
+
+
+def timed(function, repeats):
+    """
+    Returns the mean time of a call in milliseconds and the result of the last call.
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = function()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time saving and loading games of several sizes.')
+    parser.add_argument('--boards', nargs='+', default=['20:3', '200:10000', '400:100000'],
+                        help='boards as SIZE:SNAKE_LENGTH')
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'savegame.dat')
+        print(f"{'board':>9} {'length':>7} {'bytes':>8} {'snapshot ms':>12} {'encode ms':>10} {'write ms':>9} "
+              f"{'load ms':>8} {'json ms':>8}")
+        for board in args.boards:
+            size, length = (int(value) for value in board.split(':'))
+            engine = SnakeEngine(size, size, seed=0)
+            engine.state.snake.set_body(serpentine(length, size))
+            snapshot_ms, snap = timed(lambda: snapshot(engine), args.repeats)
+            encode_ms, data = timed(lambda: encode(snap), args.repeats)
+            write_ms, _ = timed(lambda: write_atomic(path, data), args.repeats)
+            target = SnakeEngine(size, size, seed=1)
+            load_ms, _ = timed(lambda: load(target, path), args.repeats)
+            json_ms, _ = timed(lambda: json_save(engine.state, os.path.join(directory, 'savegame.json')), args.repeats)
+            print(f'{size:>4}x{size:<4} {length:>7} {len(data):>8} {snapshot_ms:>12.3f} {encode_ms:>10.3f} '
+                  f'{write_ms:>9.3f} {load_ms:>8.3f} {json_ms:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Load test of the multiplayer server.
+
+Starts server.py in a child process (or uses a running one with --connect), opens the given number
+of rooms with the given number of players in each, and lets every player turn at random while it
+reads the broadcasts. Reports:
+  latency   time from the server stamping a tick's broadcast to a client reading it, percentiles
+            over every broadcast read by every client;
+  late      how late the server's ticks started against their schedule, and how many started more
+            than a whole tick late (overruns), as reported by the server;
+  work      how long the server's ticks took to step the arena and write the broadcast.
+
+The clients all run on one event loop in this process, so with many of them the latency includes
+the time this process takes to get round to reading a broadcast.
+
+    python bench_server.py --rooms 100 --players 4 --seconds 10
+    python bench_server.py --rooms 300 --players 2 --connect 127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from autopilot import percentile
+
+TURNS = ('up', 'down', 'left', 'right')
+CONNECT_ATTEMPTS = 50
+
+
+def free_port():
+    """
+    Returns a TCP port on localhost that nothing listens on.
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def connect(host, port):
+    """
+    Opens a connection, retrying while the server starts up.
+    """
+    for attempt in range(CONNECT_ATTEMPTS):
+        try:
+            return await asyncio.open_connection(host, port)
+        except OSError:
+            if attempt == CONNECT_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def player(host, port, room, name, until, turn_chance, latencies, rng):
+    """
+    Plays in a room until the given time, turning at random, and appends the latency of every
+    broadcast read, in milliseconds, to latencies.
+    """
+    reader, writer = await connect(host, port)
+    writer.write((json.dumps({'room': room, 'name': name}) + '\n').encode())
+    welcome = json.loads(await reader.readline())
+    if 'error' in welcome:
+        writer.close()
+        return
+    while time.time() < until:
+        line = await reader.readline()
+        if not line:
+            break
+        latencies.append((time.time() - json.loads(line)['sent']) * 1000)
+        if rng.random() < turn_chance:
+            writer.write((json.dumps({'turn': rng.choice(TURNS)}) + '\n').encode())
+    writer.close()
+
+
+async def server_stats(host, port):
+    """
+    Asks the server for its tick statistics.
+    """
+    reader, writer = await connect(host, port)
+    writer.write(b'{"stats": true}\n')
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats
+
+
+async def load_test(host, port, rooms, players, seconds, turn_chance, seed):
+    """
+    Runs the clients and returns the latencies they measured, sorted, and the server's statistics.
+    """
+    rng = random.Random(seed)
+    latencies = []
+    until = time.time() + seconds
+    tasks = [asyncio.create_task(player(host, port, f'room-{room}', f'bot-{index}', until, turn_chance, latencies,
+                                        random.Random(rng.random())))
+             for room in range(rooms) for index in range(players)]
+    await asyncio.gather(*tasks)
+    stats = await server_stats(host, port)
+    return sorted(latencies), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the multiplayer server.')
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--players', type=int, default=4, help='players in each room')
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--turn-chance', type=float, default=0.2, help='chance a player turns after a broadcast')
+    parser.add_argument('--board', type=int, default=20, help='cells along each side of the boards')
+    parser.add_argument('--connect', metavar='HOST:PORT', help='use a running server instead of starting one')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    process = None
+    if args.connect:
+        host, port = args.connect.rsplit(':', 1)
+        port = int(port)
+    else:
+        host, port = '127.0.0.1', free_port()
+        process = subprocess.Popen([sys.executable, 'server.py', '--host', host, '--port', str(port),
+                                    '--board', str(args.board), '--seed', str(args.seed)],
+                                   stdout=subprocess.DEVNULL)
+    try:
+        latencies, stats = asyncio.run(load_test(host, port, args.rooms, args.players, args.seconds,
+                                                 args.turn_chance, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print(f'{args.rooms} rooms x {args.players} players for {args.seconds:.0f} s: {len(latencies)} broadcasts read, '
+          f'{len(latencies) / args.seconds:.0f}/s')
+    if latencies:
+        print(f'latency  p50 {percentile(latencies, 0.5):7.2f}  p95 {percentile(latencies, 0.95):7.2f}  '
+              f'p99 {percentile(latencies, 0.99):7.2f}  max {latencies[-1]:7.2f} ms')
+    late = stats['late_ms']
+    work = stats['work_ms']
+    print(f"late     p50 {late['p50']:7.2f}  p95 {late['p95']:7.2f}  p99 {late['p99']:7.2f}  max {late['max']:7.2f} ms, "
+          f"{stats['overruns']} overruns in {stats['ticks']} ticks")
+    print(f"work     p50 {work['p50']:7.3f}  p95 {work['p95']:7.3f}  p99 {work['p99']:7.3f}  max {work['max']:7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Spawn latency at different board occupancies.
+
+Fills a board with obstacles up to the given occupancy and times SnakeEngine.spawn(), which samples
+the grid's free-cell index, against the rejection sampling the randomize() methods used before:
+draw random cells until one is free. Rejection sampling is given the occupancy grid for its checks,
+so the comparison only shows the cost of the retries, not of the old list scans.
+
+    python bench_spawn.py --size 100 --occupancies 0.1 0.9 0.99
+"""
+import argparse
+import time
+
+from engine import SnakeEngine, Item
+
+
+def fill(engine, occupancy):
+    """
+    Adds obstacles until the given fraction of the board is occupied.
+    """
+    grid = engine.state.grid
+    cells = engine.width * engine.height
+    while cells - len(grid.free) < occupancy * cells:
+        engine.spawn(Item('obstacle'))
+
+
+def rejection_spawn(engine, item):
+    """
+    Moves an item the old way: random cells until a free one comes up.
+    Returns:
+        int: Number of cells drawn.
+    """
+    grid = engine.state.grid
+    rand = engine.rng.random
+    grid.remove_item(item)
+    attempts = 0
+    while True:
+        attempts += 1
+        cell = (int(rand() * engine.width), int(rand() * engine.height))
+        if grid.is_free(*cell):
+            grid.place_item(item, cell)
+            return attempts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time spawning an item at several board occupancies.')
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--occupancies', type=float, nargs='+', default=[0.1, 0.9, 0.99])
+    parser.add_argument('--spawns', type=int, default=20000)
+    args = parser.parse_args()
+    print(f"{'occupancy':>9} {'index us':>9} {'rejection us':>13} {'draws/spawn':>12}")
+    for occupancy in args.occupancies:
+        engine = SnakeEngine(args.size, args.size, seed=0)
+        fill(engine, occupancy)
+        item = Item('fruit')
+        engine.spawn(item)
+        start = time.perf_counter()
+        for _ in range(args.spawns):
+            engine.spawn(item)
+        index_us = (time.perf_counter() - start) / args.spawns * 1e6
+        draws = 0
+        start = time.perf_counter()
+        for _ in range(args.spawns):
+            draws += rejection_spawn(engine, item)
+        rejection_us = (time.perf_counter() - start) / args.spawns * 1e6
+        print(f'{occupancy:>9.0%} {index_us:>9.2f} {rejection_us:>13.2f} {draws / args.spawns:>12.1f}')
+
+    engine = SnakeEngine(args.size, args.size, seed=0)
+    fill(engine, 1.0)
+    print(f'board full: spawn() returned {engine.spawn(Item("fruit"))!r}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+Benchmark suite for the game's hot paths.
+
+Runs every case headless (SDL dummy drivers) through the same objects the game uses and reports
+the best time of one call in microseconds over several rounds, along with the median. The number
+of calls per round is calibrated so that a round takes at least --min-round-ms. The rounds are
+interleaved (the first round of every case, then the second of every case, ...), so that a slow
+stretch of the machine, as from another process waking up, costs each case at most a round or two.
+Noise from other processes only makes a round slower, so the best round follows the code rather
+than the machine's load.
+
+  move_snake        SNAKE.move_snake() on snakes of 3 to 100,000 blocks
+  self_collision    SNAKE.check_self_collision() on the same snakes
+  check_collision   the per-tick collision check of the game's engine, with 5, 10 and 1,000 obstacles
+  randomize         each object's randomize() on a board filled up to several occupancies
+  draw_snake        SNAKE.draw_snake() on the off-screen window, short and long snakes
+  draw_grass        MAIN.draw_grass()
+  draw_elements     MAIN.draw_elements()
+  save_game         save_game(), which snapshots the game and waits for the autosaver to write it
+  load_game         load_game(), which reads the save back and rebuilds the objects that draw it
+
+A fixed pure-Python loop, the reference case, runs in every round alongside the others. The results
+are written as JSON with --json. With a baseline file (bench_baseline.json by default, if it exists)
+each case is compared with it, and a case is flagged when both its best and its median time grew
+by more than --threshold and its best time by more than --noise-floor-us; the exit status is then 1.
+A real slowdown moves both figures, while a burst of noise or a lucky round moves only one. The
+floor keeps the cases that take a microsecond or two, where a few hundred nanoseconds of jitter is
+already a large fraction, from being flagged on no change. The comparison divides every time by
+the reference's time from the same run, so that a machine running slower as a whole, as a busy or
+throttled one does, does not flag every case. --save-baseline stores the results as the new
+baseline. Timings still only compare on the same kind of machine, so refresh the baseline after
+moving to another one.
+
+    python bench_suite.py
+    python bench_suite.py --filter randomize --json results.json
+    python bench_suite.py --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+import snake
+from engine import SnakeEngine, Snake, RIGHT
+from grid import OccupancyGrid
+from startup import StartupTimer
+
+BASELINE_FILE = 'bench_baseline.json'
+REFERENCE = 'reference'
+LENGTHS = (3, 10, 100, 1000, 10000, 100000)
+OBSTACLE_COUNTS = (5, 10, 1000)
+OCCUPANCIES = (0.1, 0.5, 0.9, 0.99)
+RANDOMIZED = ('fruit', 'big_fruit', 'boom', 'power_up', 'obstacle')
+COLLISION_BOARD = 50
+SPAWN_BOARD = 100
+LONG_SNAKE = 300
+MAX_NUMBER = 1 << 20
+NOISE_FLOOR_US = 0.5
+
+
+def serpentine(length, width):
+    """
+    Returns the cells of a snake winding row by row across a board, head first.
+    """
+    cells = []
+    for index in range(length):
+        y, x = divmod(index, width)
+        cells.append((x if y % 2 == 0 else width - 1 - x, y))
+    return cells[::-1]
+
+
+def calls(function):
+    """
+    Returns a case that times the given number of calls of function.
+    """
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        return time.perf_counter() - start
+    return run
+
+
+def reference():
+    """
+    A fixed amount of interpreter work that the game's code does not affect.
+    """
+    total = 0
+    for value in range(100):
+        total += value * value
+    return total
+
+
+def move_case(length):
+    """
+    SNAKE.move_snake() on a snake of the given length, heading right along a one-row board with
+    room for every move of the round. Each round lays the snake again, untimed.
+    """
+    def run(number):
+        grid = OccupancyGrid(length + number + 1, 1)
+        body = Snake(grid, body=())
+        body.set_body([(x, 0) for x in range(length - 1, -1, -1)])
+        body.direction = RIGHT
+        view = snake.SNAKE(body)
+        move = view.move_snake
+        start = time.perf_counter()
+        for _ in range(number):
+            move()
+        return time.perf_counter() - start
+    return run
+
+
+def self_collision_case(length):
+    """
+    SNAKE.check_self_collision() on a snake of the given length coiled on a square board.
+    """
+    side = int(length ** 0.5) + 2
+    body = Snake(OccupancyGrid(side, side), body=())
+    body.set_body(serpentine(length, side))
+    return calls(snake.SNAKE(body).check_self_collision)
+
+
+def collision_case(obstacles):
+    """
+    The engine's per-tick collision check with the given number of obstacles on the board and the
+    snake's head on a free cell.
+    """
+    engine = SnakeEngine(COLLISION_BOARD, COLLISION_BOARD, seed=0)
+    for _ in range(obstacles):
+        engine.add_obstacle()
+    return calls(engine.check_collision)
+
+
+def randomize_case(name, occupancy):
+    """
+    randomize() of the named game object on a board filled with obstacles up to the given occupancy.
+    """
+    engine = SnakeEngine(SPAWN_BOARD, SPAWN_BOARD, seed=0)
+    state = engine.state
+    cells = engine.width * engine.height
+    while cells - len(state.grid.free) < occupancy * cells:
+        engine.add_obstacle()
+    objects = {'fruit': snake.FRUIT(engine, state.fruit), 'big_fruit': snake.BigFruit(engine, state.big_fruit),
+               'boom': snake.Boom(engine, state.boom), 'power_up': snake.PowerUp(engine, state.power_up),
+               'obstacle': snake.Obstacle(engine, state.obstacles[0])}
+    return calls(objects[name].randomize)
+
+
+def with_length(length, case):
+    """
+    Returns a case that lays the game's snake at the given length before running the given case.
+    """
+    def run(number):
+        snake.main_game.reset_game(seed=0)
+        snake.main_game.state.snake.set_body(serpentine(length, snake.cell_number))
+        return case(number)
+    return run
+
+
+def load_game(number):
+    """
+    Times load_game() of a game saved beforehand, untimed, as the game runs it on Continue.
+    """
+    snake.save_game()
+    start = time.perf_counter()
+    for _ in range(number):
+        snake.load_game()
+    return time.perf_counter() - start
+
+
+def cases():
+    """
+    Returns every case as a list of (name, case) pairs. A case takes a number of calls and returns
+    the seconds they took.
+    """
+    suite = [(REFERENCE, calls(reference))]
+    for length in LENGTHS:
+        suite.append((f'move_snake/length={length}', move_case(length)))
+    for length in LENGTHS:
+        suite.append((f'self_collision/length={length}', self_collision_case(length)))
+    for count in OBSTACLE_COUNTS:
+        suite.append((f'check_collision/obstacles={count}', collision_case(count)))
+    for occupancy in OCCUPANCIES:
+        for name in RANDOMIZED:
+            suite.append((f'randomize/{name}/occupancy={occupancy:.0%}', randomize_case(name, occupancy)))
+    game = snake.main_game
+    for length in (3, LONG_SNAKE):
+        suite.append((f'draw_snake/length={length}', with_length(length, calls(lambda: game.snake.draw_snake()))))
+    suite.append(('draw_grass', calls(game.draw_grass)))
+    suite.append(('draw_elements', with_length(3, calls(game.draw_elements))))
+    for length in (3, LONG_SNAKE):
+        suite.append((f'save_game/length={length}', with_length(length, calls(snake.save_game))))
+    for length in (3, LONG_SNAKE):
+        suite.append((f'load_game/length={length}', with_length(length, load_game)))
+    return suite
+
+
+def calibrate(case, min_round):
+    """
+    Returns how many calls make a round of the case last at least min_round seconds.
+    """
+    number = 1
+    while number < MAX_NUMBER and case(number) < min_round:
+        number *= 2
+    return number
+
+
+def measure(suite, repeats, min_round):
+    """
+    Runs every case of the suite for repeats interleaved rounds.
+    Args:
+        suite (list): (name, case) pairs, as returned by cases().
+    Returns:
+        dict: For each case, the calls per round and the best, median and worst time of one call in microseconds.
+    """
+    numbers = [calibrate(case, min_round) for name, case in suite]
+    times = [[] for _ in suite]
+    for _ in range(repeats):
+        for (name, case), number, per_call in zip(suite, numbers, times):
+            per_call.append(case(number) / number * 1e6)
+    results = {}
+    for (name, case), number, per_call in zip(suite, numbers, times):
+        per_call.sort()
+        results[name] = {'number': number, 'median_us': statistics.median(per_call), 'min_us': per_call[0],
+                         'max_us': per_call[-1]}
+    return results
+
+
+def compare(results, baseline):
+    """
+    Compares the best and median times of each case with the baseline's, each relative to the
+    reference case's time of its run.
+    Returns:
+        dict: For each case in both but the reference, the ratio of the new relative best time to
+        the baseline's, the same ratio for the median, and the difference of the best times in
+        microseconds, as a (ratio, median_ratio, delta_us) tuple.
+    """
+    changes = {}
+    if REFERENCE not in results or REFERENCE not in baseline:
+        return changes
+    scale = baseline[REFERENCE]['min_us'] / results[REFERENCE]['min_us']
+    median_scale = baseline[REFERENCE]['median_us'] / results[REFERENCE]['median_us']
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and name != REFERENCE:
+            scaled = result['min_us'] * scale
+            changes[name] = (scaled / before['min_us'], result['median_us'] * median_scale / before['median_us'],
+                             scaled - before['min_us'])
+    return changes
+
+
+def regressed(change, threshold, noise_floor_us):
+    """
+    Checks whether a change from compare() is a regression: the best time and the median both grew by
+    more than the threshold, and the best time by more than the noise floor.
+    """
+    ratio, median_ratio, delta_us = change
+    return ratio > 1 + threshold and median_ratio > 1 + threshold and delta_us > noise_floor_us
+
+
+def setup(directory):
+    """
+    Starts the game headless, saving and storing runs under directory rather than next to the game.
+    """
+    snake.SAVE_FILE = os.path.join(directory, 'savegame.dat')
+    snake.LEADERBOARD_FILE = os.path.join(directory, 'leaderboard.db')
+    snake.start(StartupTimer(time.perf_counter()))
+    snake.assets.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the game's hot paths and compare them with a baseline.")
+    parser.add_argument('--filter', default='', help='only run the cases whose name contains this text')
+    parser.add_argument('--repeats', type=int, default=7, help='timed rounds per case')
+    parser.add_argument('--min-round-ms', type=float, default=20.0, help='shortest round the calls are calibrated to')
+    parser.add_argument('--json', metavar='FILE', help='write the results to FILE')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help=f'baseline to compare with (default: {BASELINE_FILE})')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="flag cases whose best and median times, relative to the reference's, grew by more than this fraction")
+    parser.add_argument('--noise-floor-us', type=float, default=NOISE_FLOOR_US,
+                        help=f'and by more than this many microseconds (default: {NOISE_FLOOR_US})')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the baseline')
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['cases']
+    with tempfile.TemporaryDirectory() as directory:
+        setup(directory)
+        suite = [(name, case) for name, case in cases() if name == REFERENCE or args.filter in name]
+        results = measure(suite, args.repeats, args.min_round_ms / 1000)
+        snake.main_game.autosaver.close()
+        snake.leaderboard.close()
+        pygame.quit()
+
+    changes = compare(results, baseline)
+    regressions = sorted(name for name, change in changes.items()
+                         if regressed(change, args.threshold, args.noise_floor_us))
+    print(f"{'case':<40} {'calls':>8} {'min us':>10} {'median us':>11} {'baseline':>10} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        change = ''
+        if name in changes:
+            change = f'{changes[name][0] - 1:+.0%}' + (' !' if name in regressions else '')
+        print(f"{name:<40} {result['number']:>8} {result['min_us']:>10.3f} {result['median_us']:>11.3f} "
+              f"{before['min_us'] if before else float('nan'):>10.3f} {change:>8}")
+
+    report = {'python': platform.python_version(), 'pygame': pygame.version.ver, 'machine': platform.machine(),
+              'repeats': args.repeats, 'threshold': args.threshold, 'noise_floor_us': args.noise_floor_us,
+              'cases': results, 'ratios': {name: change[0] for name, change in changes.items()},
+              'regressions': regressions}
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=1)
+        print(f'baseline saved to {args.baseline}')
+    elif baseline:
+        print(f'{len(regressions)} of {len(changes)} cases slower than the baseline by more than {args.threshold:.0%} '
+              f'and {args.noise_floor_us} us' + (': ' + ', '.join(regressions) if regressions else ''))
+    sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Cost of drawing the HUD and menu text with and without the text cache.
+
+Replays the text the game draws over a session: every frame the score, time and level boxes, and
+now and then a mouse movement over the main menu, which redraws the three options. Each frame is
+timed both ways:
+  before: Font.render() on every call, as draw_score(), draw_level() and main_menu() used to;
+  after:  TextCache.render(), which only renders strings it has not seen yet.
+The cache's hit rate and the rendering time it saved are printed at the end.
+
+    python bench_text.py --frames 3600
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from text_cache import TextCache
+
+FONT_FILE = 'Font/PoetsenOne-Regular.ttf'
+HUD_COLOR = (56, 74, 12)
+MENU_OPTIONS = ['New Game', 'Continue', 'Help']
+
+
+def frame_text(frame, frames_per_tick, frames_per_second):
+    """
+    Returns the (text, color, size) strings the game draws on a frame.
+    """
+    tick = frame // frames_per_tick
+    text = [(str(tick // 20), HUD_COLOR, 25), (f'{frame // frames_per_second}s', HUD_COLOR, 25),
+            (f'Level: {1 + tick // 400}', HUD_COLOR, 25)]
+    if frame % 30 == 0:
+        hovered = frame // 30 % len(MENU_OPTIONS)
+        text.extend((option, (255, 255, 255) if i == hovered else (0, 0, 0), 60)
+                    for i, option in enumerate(MENU_OPTIONS))
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time HUD and menu text rendering with and without the cache.')
+    parser.add_argument('--frames', type=int, default=3600)
+    parser.add_argument('--frames-per-tick', type=int, default=9)
+    parser.add_argument('--fps', type=int, default=60)
+    args = parser.parse_args()
+    pygame.init()
+    screen = pygame.display.set_mode((800, 800))
+    fonts = {size: pygame.font.Font(FONT_FILE, size) for size in (25, 60)}
+    cache = TextCache()
+    before = after = 0.0
+    for frame in range(args.frames):
+        text = frame_text(frame, args.frames_per_tick, args.fps)
+        start = time.perf_counter()
+        for line, color, size in text:
+            screen.blit(fonts[size].render(line, True, color), (0, 0))
+        before += time.perf_counter() - start
+        start = time.perf_counter()
+        for line, color, size in text:
+            screen.blit(cache.render(line, color, FONT_FILE, size), (0, 0))
+        after += time.perf_counter() - start
+    print(f'{args.frames} frames: before {before / args.frames * 1e6:.1f} us/frame, '
+          f'after {after / args.frames * 1e6:.1f} us/frame')
+    print(cache.report())
+
+
+if __name__ == '__main__':
+    main()
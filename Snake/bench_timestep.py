@@ -0,0 +1,76 @@
+"""
+Tick cadence of the fixed-timestep clock at different frame rates and frame loads.
+
+Runs a real-time frame loop, sleeping to the target frame rate and optionally stalling some
+frames to mimic a busy event queue or slow draws, and drives a SnakeEngine through a
+FixedTimestep until it has run the given number of ticks. The actions come from a seeded
+generator indexed by tick, so every configuration should end in the same game state: the
+printed state hash checks that the simulation does not depend on the frame rate. The latency
+columns are how late ticks ran after they fell due; 'rate' is ticks per second against the
+nominal 1000 / tick_ms.
+
+    python bench_timestep.py --fps 30 60 144 --ticks 60
+"""
+import argparse
+import hashlib
+import random
+import time
+
+from engine import SnakeEngine, DIRECTIONS
+from timestep import FixedTimestep
+
+
+def state_hash(state):
+    """
+    Returns a short hash of the snake, the items and the score.
+    """
+    items = [item.pos for item in (state.fruit, state.big_fruit, state.boom, state.power_up)]
+    items += [obstacle.pos for obstacle in state.obstacles]
+    return hashlib.sha1(repr((state.snake.body, items, state.score, state.tick)).encode()).hexdigest()[:12]
+
+
+def run(fps, ticks, stall_ms, stall_chance, seed):
+    """
+    Plays ticks at the given frame rate and returns (state hash, ticks per second, jitter summary).
+    """
+    engine = SnakeEngine(seed=seed)
+    actions = random.Random(seed)
+    stalls = random.Random(seed + 1)
+    timestep = FixedTimestep(engine.tick_ms)
+    frame = 1 / fps
+    start = time.perf_counter()
+    while engine.state.tick < ticks:
+        frame_start = time.perf_counter()
+        timestep.advance()
+        while engine.state.tick < ticks and timestep.step():
+            engine.step(actions.choice(DIRECTIONS) if actions.random() < 0.2 else None)
+            if engine.state.done:
+                engine.continue_game()
+            timestep.period_ms = engine.tick_ms
+        if stalls.random() < stall_chance:
+            time.sleep(stall_ms / 1000)
+        time.sleep(max(0.0, frame - (time.perf_counter() - frame_start)))
+    elapsed = time.perf_counter() - start
+    return state_hash(engine.state), ticks / elapsed, timestep.jitter()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure tick cadence and jitter of the fixed-timestep clock.')
+    parser.add_argument('--fps', type=int, nargs='+', default=[30, 60, 144])
+    parser.add_argument('--ticks', type=int, default=60)
+    parser.add_argument('--stall-ms', type=float, default=40.0, help='length of a stalled frame')
+    parser.add_argument('--stall-chance', type=float, default=0.05, help='share of frames that stall')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    nominal = 1000 / SnakeEngine().tick_ms
+    print(f'nominal rate at level 1: {nominal:.2f} ticks/s')
+    print(f"{'fps':>5} {'stalls':>6} {'rate':>6} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'dropped':>7}  state")
+    for fps in args.fps:
+        for stall_chance in (0.0, args.stall_chance):
+            digest, rate, jitter = run(fps, args.ticks, args.stall_ms, stall_chance, args.seed)
+            print(f"{fps:>5} {stall_chance:>6.0%} {rate:>6.2f} {jitter['p50']:>7.2f} {jitter['p99']:>7.2f} "
+                  f"{jitter['max']:>7.2f} {jitter['dropped']:>7}  {digest}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+"""
+Frame capture and video export.
+
+FrameCapture grabs a surface, normally the game window right after pygame.display.update(), and
+hands the frames to a worker thread that writes them to disk, so the frame loop only pays for one
+copy of the pixels. The copy goes straight from the surface's pixel buffer, through a buffer view,
+into one of a fixed pool of frame buffers; nothing is converted on the game thread. The pool and the
+queue to the worker hold queue_frames frames: when the worker falls that far behind, grab() drops the
+frame rather than wait, and counts it. The worker writes:
+  raw   the frames one after the other as 32-bit pixels in the surface's byte order (BGRX for the
+        usual window), e.g. for ffmpeg -f rawvideo -pixel_format bgr0 -video_size WxH -framerate 60;
+  png   a numbered PNG file per frame in a folder;
+  y4m   a YUV4MPEG2 stream (4:4:4, BT.601), which most video tools read directly. Needs numpy.
+
+Run as a script, this renders a recorded game (an input log saved with snake.py --record) headless
+and as fast as it can, with the game's own renderer and HUD, into any of these formats. Each tick is
+written as many times as the frame rate needs to keep the video at the game's speed.
+
+    python capture.py replays/123.snkr --out game.y4m --format y4m
+    python capture.py replays/123.snkr --out frames --format png --fps 30
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+
+import pygame
+
+FORMATS = ('raw', 'png', 'y4m')
+QUEUE_FRAMES = 32
+FPS = 60
+
+
+def channel_offsets(surface):
+    """
+    Returns the byte offsets of red, green and blue within a 32-bit pixel of the surface.
+    """
+    return tuple(shift // 8 for shift in surface.get_shifts()[:3])
+
+
+class RawWriter:
+    """
+    Writes frames one after the other, without the padding at the end of each row.
+    """
+
+    def __init__(self, path, size, pitch, offsets, fps):
+        """
+        Creates the output file.
+        Args:
+            path (str): File to write to.
+            size (tuple): Width and height of a frame in pixels.
+            pitch (int): Bytes per row of a frame buffer, padding included.
+            offsets (tuple): Byte offsets of red, green and blue within a pixel.
+            fps (int): Frame rate of the video.
+        """
+        self.file = open(path, 'wb')
+        self.size = size
+        self.pitch = pitch
+
+    def pixels(self, buffer):
+        """
+        Returns the pixels of a frame buffer without row padding.
+        """
+        width, height = self.size
+        if self.pitch == width * 4:
+            return buffer
+        view = memoryview(buffer)
+        return b''.join(view[row * self.pitch:row * self.pitch + width * 4] for row in range(height))
+
+    def write(self, buffer, repeat):
+        """
+        Appends a frame.
+        Args:
+            buffer (bytearray): The frame's pixels, as copied from the surface.
+            repeat (int): Times to write the frame.
+        """
+        pixels = self.pixels(buffer)
+        for _ in range(repeat):
+            self.file.write(pixels)
+
+    def close(self):
+        """
+        Closes the output file.
+        """
+        self.file.close()
+
+
+class PngWriter(RawWriter):
+    """
+    Writes each frame to a numbered PNG file in a folder.
+    """
+
+    def __init__(self, path, size, pitch, offsets, fps):
+        """
+        Creates the folder if needed. Frames are numbered from 0.
+        Args:
+            path (str): Folder to write the files to.
+            size (tuple): Width and height of a frame in pixels.
+            pitch (int): Bytes per row of a frame buffer, padding included.
+            offsets (tuple): Byte offsets of red, green and blue within a pixel.
+            fps (int): Frame rate of the video; PNG files have none, so it is unused.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.size = size
+        self.pitch = pitch
+        self.offsets = offsets
+        self.count = 0
+        self.rgb = bytearray(size[0] * size[1] * 3)
+
+    def write(self, buffer, repeat):
+        """
+        Converts a frame to RGB and saves it to the next numbered files.
+        Args:
+            buffer (bytearray): The frame's pixels, as copied from the surface.
+            repeat (int): Number of files to save the frame to.
+        """
+        pixels = self.pixels(buffer)
+        rgb = self.rgb
+        for channel, offset in enumerate(self.offsets):
+            rgb[channel::3] = pixels[offset::4]
+        image = pygame.image.frombuffer(rgb, self.size, 'RGB')
+        for _ in range(repeat):
+            pygame.image.save(image, os.path.join(self.path, f'frame_{self.count:06d}.png'))
+            self.count += 1
+
+    def close(self):
+        """
+        Does nothing, as each file is closed once written.
+        """
+
+
+class Y4mWriter(RawWriter):
+    """
+    Writes frames as a YUV4MPEG2 stream, converting them with numpy.
+    """
+
+    def __init__(self, path, size, pitch, offsets, fps):
+        """
+        Creates the output file and writes the stream header.
+        Args:
+            path (str): File to write to.
+            size (tuple): Width and height of a frame in pixels.
+            pitch (int): Bytes per row of a frame buffer, padding included.
+            offsets (tuple): Byte offsets of red, green and blue within a pixel.
+            fps (int): Frame rate written into the header.
+        Raises:
+            ImportError: If numpy is not installed.
+        """
+        import numpy
+        self.numpy = numpy
+        super().__init__(path, size, pitch, offsets, fps)
+        self.offsets = offsets
+        self.file.write(f'YUV4MPEG2 W{size[0]} H{size[1]} F{fps}:1 Ip A1:1 C444\n'.encode())
+
+    def write(self, buffer, repeat):
+        """
+        Converts a frame to YUV and appends it.
+        Args:
+            buffer (bytearray): The frame's pixels, as copied from the surface.
+            repeat (int): Times to write the frame.
+        """
+        numpy = self.numpy
+        width, height = self.size
+        pixels = numpy.frombuffer(buffer, numpy.uint8).reshape(height, self.pitch // 4, 4)[:, :width]
+        red, green, blue = (pixels[:, :, offset].astype(numpy.float32) for offset in self.offsets)
+        y = 16 + 0.257 * red + 0.504 * green + 0.098 * blue
+        u = 128 - 0.148 * red - 0.291 * green + 0.439 * blue
+        v = 128 + 0.439 * red - 0.368 * green - 0.071 * blue
+        frame = b'FRAME\n' + numpy.stack((y, u, v)).round().astype(numpy.uint8).tobytes()
+        for _ in range(repeat):
+            self.file.write(frame)
+
+
+WRITERS = {'raw': RawWriter, 'png': PngWriter, 'y4m': Y4mWriter}
+
+
+class FrameCapture:
+    """
+    Grabs frames of a surface and writes them to disk on a worker thread.
+    """
+
+    def __init__(self, surface, path, fmt='raw', queue_frames=QUEUE_FRAMES, fps=FPS):
+        """
+        Starts the worker.
+        Args:
+            surface (pygame.Surface): A 32-bit surface to grab, usually the display surface.
+            path (str): File to write to, or folder for the png format.
+            fmt (str, optional): One of FORMATS. Defaults to 'raw'.
+            queue_frames (int, optional): Frames that may wait for the worker. Defaults to QUEUE_FRAMES.
+            fps (int, optional): Frame rate written into y4m headers. Defaults to FPS.
+        Raises:
+            ValueError: If the surface is not 32-bit or the format is unknown.
+        """
+        if surface.get_bytesize() != 4:
+            raise ValueError('frame capture needs a 32-bit surface')
+        if fmt not in WRITERS:
+            raise ValueError(f'unknown capture format {fmt!r}')
+        self.surface = surface
+        self.size = surface.get_size()
+        frame_bytes = surface.get_pitch() * self.size[1]
+        self.writer = WRITERS[fmt](path, self.size, surface.get_pitch(), channel_offsets(surface), fps)
+        self.free = queue.SimpleQueue()
+        for _ in range(queue_frames):
+            self.free.put(bytearray(frame_bytes))
+        self.pending = queue.SimpleQueue()
+        self.grabs = 0
+        self.done = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.max_backlog = 0
+        self.grab_seconds = 0.0
+        self.write_seconds = 0.0
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='capture', daemon=True)
+        self.thread.start()
+
+    def grab(self, repeat=1, block=False):
+        """
+        Copies the surface's pixels into a free frame buffer and queues it for the worker.
+        Args:
+            repeat (int, optional): Times the worker writes the frame. Defaults to 1.
+            block (bool, optional): Wait for a free buffer rather than drop the frame. Defaults to False.
+        Returns:
+            bool: False if the frame was dropped because every buffer was waiting for the worker.
+        """
+        try:
+            buffer = self.free.get(block)
+        except queue.Empty:
+            self.dropped += repeat
+            return False
+        started = time.perf_counter()
+        view = self.surface.get_buffer()
+        buffer[:] = view
+        del view
+        self.pending.put((buffer, repeat))
+        self.grabs += 1
+        self.max_backlog = max(self.max_backlog, self.backlog())
+        self.captured += repeat
+        self.grab_seconds += time.perf_counter() - started
+        return True
+
+    def run(self):
+        """
+        Writes queued frames until close() queues None.
+        """
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            buffer, repeat = item
+            started = time.perf_counter()
+            if self.error is None:
+                try:
+                    self.writer.write(buffer, repeat)
+                except OSError as error:
+                    self.error = error
+            self.write_seconds += time.perf_counter() - started
+            self.written += repeat
+            self.done += 1
+            self.free.put(buffer)
+
+    def backlog(self):
+        """
+        Returns the number of grabbed frames the worker has not written yet.
+        """
+        return self.grabs - self.done
+
+    def close(self):
+        """
+        Waits for the worker to write every queued frame and closes the output.
+        Raises:
+            OSError: If writing a frame failed.
+        """
+        self.pending.put(None)
+        self.thread.join()
+        self.writer.close()
+        if self.error is not None:
+            raise self.error
+
+    def report(self):
+        """
+        Returns the frame counts, the largest backlog and the time spent grabbing and writing as text.
+        """
+        return (f'capture: {self.captured + self.dropped} frames, {self.written} written, {self.dropped} dropped, '
+                f'backlog {self.backlog()} (max {self.max_backlog}), '
+                f'grab {self.grab_seconds / max(self.grabs, 1) * 1000:.2f} ms, '
+                f'write {self.write_seconds / max(self.done, 1) * 1000:.2f} ms per grabbed frame')
+
+
+def render_log(path, out, fmt='raw', fps=FPS, cell_size=None):
+    """
+    Renders a recorded game headless into a video, as fast as the worker can write it.
+    Args:
+        path (str): The input log.
+        out (str): Output file, or folder for the png format.
+        fmt (str, optional): One of FORMATS. Defaults to 'raw'.
+        fps (int, optional): Frame rate of the video. Defaults to FPS.
+        cell_size (int, optional): Pixels per cell. Defaults to the game's.
+    Returns:
+        tuple: The FrameCapture, the game time rendered in seconds and the wall time it took.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import snake
+    import replay
+    from startup import StartupTimer
+    with open(path, 'rb') as file:
+        data = file.read()
+    seed, width, height = replay.decode(data)[:3]
+    snake.cell_number = width
+    if cell_size:
+        snake.cell_size = cell_size
+    snake.SAVE_FILE = None
+    snake.LEADERBOARD_FILE = ':memory:'
+    snake.start(StartupTimer(time.perf_counter()))
+    game = snake.main_game
+    capture = FrameCapture(snake.screen, out, fmt, fps=fps)
+    started = time.perf_counter()
+    owed = 0.0
+    shown_ms = None
+
+    def draw(state):
+        nonlocal owed, shown_ms
+        if game.snake.snake is not state.snake:
+            game.build_entities()
+        game.render()
+        if shown_ms is not None:
+            owed += (state.time_ms - shown_ms) * fps / 1000
+        shown_ms = state.time_ms
+        repeat = int(owed)
+        if repeat:
+            owed -= repeat
+            capture.grab(repeat, block=True)
+
+    replay.replay(data, game.engine, draw)
+    capture.close()
+    seconds = time.perf_counter() - started
+    state = game.state
+    game_seconds = (state.time_ms - state.start_ms) / 1000
+    game.autosaver.close()
+    pygame.quit()
+    return capture, game_seconds, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render a recorded game into a video, headless.')
+    parser.add_argument('log', help='input log saved with snake.py --record')
+    parser.add_argument('--out', required=True, help='output file, or folder for --format png')
+    parser.add_argument('--format', choices=FORMATS, default='y4m')
+    parser.add_argument('--fps', type=int, default=FPS)
+    parser.add_argument('--cell-size', type=int, default=None, help='pixels per cell (default: as in the game)')
+    args = parser.parse_args()
+    capture, game_seconds, seconds = render_log(args.log, args.out, args.format, args.fps, args.cell_size)
+    print(capture.report())
+    print(f'{game_seconds:.1f} s of play rendered in {seconds:.1f} s ({game_seconds / max(seconds, 1e-9):.1f}x real time)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+"""
+Binary per-tick delta stream of a game, for spectators and replays.
+
+A full snapshot of the game is mostly the snake, yet from one tick to the next only its head and
+tail change, and now and then an item moves or the score goes up. DeltaEncoder turns the state
+after each tick into a record of just those changes, usually two bytes; DeltaDecoder applies the
+records to its own copy of what a spectator sees: the snake's cells, the items, score, level and
+flags. Every keyframe_every ticks, and whenever the game did not just advance by one tick (a new
+game, a loaded save), the record is a keyframe holding the whole view instead, so a reader can
+start or seek there.
+
+DeltaWriter writes the stream of one game to a file with an index of the keyframes at the end, and
+DeltaReader reads one back: every tick in order, or the view at any tick by starting from the
+keyframe before it. Ticks only go up within a file, so the index is in tick order; a new game, whose
+ticks start again from 0, goes in a file of its own.
+
+Stream format, little-endian, version 1:
+    header    b'SNKD', version (1 byte), width and height (2 bytes each)
+    records   one per tick: opcodes and their arguments, ended by END
+    index     (tick, offset) of every keyframe record (4 bytes each), their count (4 bytes), b'SNKI'
+
+Cells are packed as y * width + x, in 2 bytes on boards of at most 65,535 cells and 4 bytes on
+bigger ones. The opcodes:
+    MOVE + d        the head moved one cell in DIRECTIONS[d] and the tail let go of its last cell
+    PUSH + d        the head moved in DIRECTIONS[d] and the snake grew
+    POP             the tail let go of its last cell
+    SPAWN + k       item k (fruit, big fruit, boom, power-up) is now on the cell that follows
+    DESPAWN + k     item k left the board
+    OBSTACLE        obstacle index (2 bytes) is now on the cell that follows
+    NO_OBSTACLE     obstacle index (2 bytes) left the board
+    SCORE           the score (4 bytes)
+    LEVEL           the level (1 byte)
+    FLAGS           FLAG_* bits (1 byte)
+    KEYFRAME        tick (4 bytes), score (4 bytes), level and flags (1 byte each), snake length
+                    (4 bytes) and cells head first, the four items' cells (NONE for off the board),
+                    obstacle count (2 bytes) and their cells
+"""
+import struct
+from array import array
+from bisect import bisect_right
+from collections import deque
+
+from engine import DIRECTIONS
+
+MAGIC = b'SNKD'
+INDEX_MAGIC = b'SNKI'
+VERSION = 1
+HEADER = struct.Struct('<4sBHH')
+INDEX_ENTRY = struct.Struct('<II')
+INDEX_FOOTER = struct.Struct('<I4s')
+KEYFRAME_HEAD = struct.Struct('<IiBBI')
+KEYFRAME_EVERY = 100
+
+END = 0x00
+MOVE = 0x10
+PUSH = 0x14
+POP = 0x18
+SPAWN = 0x20
+DESPAWN = 0x24
+OBSTACLE = 0x28
+NO_OBSTACLE = 0x29
+SCORE = 0x30
+LEVEL = 0x31
+FLAGS = 0x32
+KEYFRAME = 0x40
+
+FLAG_BOOM = 1
+FLAG_BIG_FRUIT = 2
+FLAG_POWER_UP = 4
+FLAG_DONE = 8
+
+ITEMS = ('fruit', 'big_fruit', 'boom', 'power_up')
+
+
+def cell_format(width, height):
+    """
+    Returns the struct format character of a packed cell on a board of the given size.
+    """
+    return 'H' if width * height <= 0xFFFF else 'I'
+
+
+def on_board(grid, item, width):
+    """
+    Returns the packed cell of an item that is on the grid, or None.
+    """
+    pos = item.pos
+    if pos is None or grid.item_at(*pos) is not item:
+        return None
+    return pos[1] * width + pos[0]
+
+
+def flags_of(state):
+    """
+    Returns the FLAG_* bits of a game state.
+    """
+    return ((FLAG_BOOM if state.boom_active else 0) | (FLAG_BIG_FRUIT if state.big_fruit_active else 0)
+            | (FLAG_POWER_UP if state.power_up_active else 0) | (FLAG_DONE if state.done else 0))
+
+
+class DeltaEncoder:
+    """
+    Encodes the state of a game after each tick as a delta record, or a keyframe when one is due.
+    """
+
+    def __init__(self, width, height, keyframe_every=KEYFRAME_EVERY):
+        """
+        Initializes an encoder; its first record is a keyframe.
+        Args:
+            width (int): Board width in cells.
+            height (int): Board height in cells.
+            keyframe_every (int, optional): Ticks between keyframes. Defaults to KEYFRAME_EVERY.
+        """
+        self.width = width
+        self.height = height
+        self.keyframe_every = keyframe_every
+        self.cell = struct.Struct('<' + cell_format(width, height))
+        self.none = (1 << 8 * self.cell.size) - 1
+        self.obstacle = struct.Struct('<H' + cell_format(width, height))
+        self.snake = None
+        self.generation = None
+        self.tick = -2
+        self.pushes = 0
+        self.pops = 0
+        self.items = [None] * len(ITEMS)
+        self.obstacles = []
+        self.score = 0
+        self.level = 0
+        self.flags = 0
+        self.since_keyframe = 0
+        self.keyframe = False
+
+    def encode(self, state):
+        """
+        Returns the record of a tick: the changes since the state passed last time.
+        The keyframe attribute tells whether the record is a keyframe.
+        Args:
+            state (engine.GameState): The state after the tick.
+        Returns:
+            bytes: The record.
+        """
+        snake = state.snake
+        pushed = snake.pushes - self.pushes
+        popped = snake.pops - self.pops
+        if (self.since_keyframe >= self.keyframe_every or state.tick != self.tick + 1 or snake is not self.snake
+                or snake.generation != self.generation or pushed > 1 or popped > 1):
+            return self.encode_keyframe(state)
+        self.keyframe = False
+        self.since_keyframe += 1
+        self.tick = state.tick
+        self.pushes = snake.pushes
+        self.pops = snake.pops
+        out = bytearray()
+        if pushed:
+            out.append((MOVE if popped else PUSH) + snake.links[snake.head_index])
+        elif popped:
+            out.append(POP)
+        grid = state.grid
+        width = self.width
+        cell = self.cell
+        items = self.items
+        for kind, item in enumerate((state.fruit, state.big_fruit, state.boom, state.power_up)):
+            now = on_board(grid, item, width)
+            if now != items[kind]:
+                items[kind] = now
+                if now is None:
+                    out.append(DESPAWN + kind)
+                else:
+                    out.append(SPAWN + kind)
+                    out += cell.pack(now)
+        obstacles = self.obstacles
+        for index, item in enumerate(state.obstacles):
+            now = on_board(grid, item, width)
+            if index == len(obstacles):
+                obstacles.append(None)
+            if now != obstacles[index]:
+                obstacles[index] = now
+                if now is None:
+                    out.append(NO_OBSTACLE)
+                    out += struct.pack('<H', index)
+                else:
+                    out.append(OBSTACLE)
+                    out += self.obstacle.pack(index, now)
+        if state.score != self.score:
+            self.score = state.score
+            out.append(SCORE)
+            out += struct.pack('<i', state.score)
+        if state.level != self.level:
+            self.level = state.level
+            out += bytes((LEVEL, state.level))
+        flags = flags_of(state)
+        if flags != self.flags:
+            self.flags = flags
+            out += bytes((FLAGS, flags))
+        out.append(END)
+        return bytes(out)
+
+    def encode_keyframe(self, state):
+        """
+        Returns a keyframe record holding the whole view of the state, and starts the deltas over from it.
+        """
+        snake = state.snake
+        grid = state.grid
+        width = self.width
+        self.keyframe = True
+        self.since_keyframe = 1
+        self.snake = snake
+        self.generation = snake.generation
+        self.tick = state.tick
+        self.pushes = snake.pushes
+        self.pops = snake.pops
+        self.items = [on_board(grid, item, width) for item in (state.fruit, state.big_fruit, state.boom,
+                                                                state.power_up)]
+        self.obstacles = [on_board(grid, item, width) for item in state.obstacles]
+        self.score = state.score
+        self.level = state.level
+        self.flags = flags_of(state)
+        head = snake.head_index
+        cells = (snake.cells[head::-1] + snake.cells[:head:-1])[:snake.length]
+        code = cell_format(self.width, self.height)
+        none = self.none
+        return b''.join((
+            bytes((KEYFRAME,)),
+            KEYFRAME_HEAD.pack(state.tick, state.score, state.level, self.flags, len(cells)),
+            array(code, cells).tobytes(),
+            array(code, [none if cell is None else cell for cell in self.items]).tobytes(),
+            struct.pack('<H', len(self.obstacles)),
+            array(code, [none if cell is None else cell for cell in self.obstacles]).tobytes(),
+            bytes((END,))))
+
+
+class DeltaDecoder:
+    """
+    What a spectator sees of a game, kept up to date by applying records.
+
+    Attributes
+    ----------
+    tick : int
+        Tick of the last record applied.
+    cells : collections.deque
+        The snake's packed cells, head first.
+    items : list
+        Packed cell of the fruit, big fruit, boom and power-up, or None when off the board.
+    obstacles : list
+        Packed cell of each obstacle, or None when off the board.
+    score, level, flags : int
+        Score, level and FLAG_* bits.
+    """
+
+    def __init__(self, width, height):
+        """
+        Initializes an empty view; the first record applied must be a keyframe.
+        """
+        self.width = width
+        self.height = height
+        self.code = cell_format(width, height)
+        self.cell = struct.Struct('<' + self.code)
+        self.none = (1 << 8 * self.cell.size) - 1
+        self.obstacle = struct.Struct('<H' + self.code)
+        self.steps = [dx + dy * width for dx, dy in DIRECTIONS]
+        self.tick = -1
+        self.cells = deque()
+        self.items = [None] * len(ITEMS)
+        self.obstacles = []
+        self.score = 0
+        self.level = 1
+        self.flags = 0
+
+    def apply(self, data, offset=0):
+        """
+        Applies the record that starts at offset.
+        Args:
+            data (bytes): Records.
+            offset (int, optional): Where the record starts. Defaults to 0.
+        Returns:
+            int: Where the next record starts.
+        Raises:
+            ValueError: If the record holds an unknown opcode.
+        """
+        cells = self.cells
+        cell = self.cell
+        keyframe = False
+        while True:
+            op = data[offset]
+            offset += 1
+            if op == END:
+                break
+            if MOVE <= op < MOVE + 4:
+                cells.appendleft(cells[0] + self.steps[op - MOVE])
+                cells.pop()
+            elif PUSH <= op < PUSH + 4:
+                cells.appendleft(cells[0] + self.steps[op - PUSH])
+            elif op == POP:
+                cells.pop()
+            elif SPAWN <= op < SPAWN + 4:
+                self.items[op - SPAWN], = cell.unpack_from(data, offset)
+                offset += cell.size
+            elif DESPAWN <= op < DESPAWN + 4:
+                self.items[op - DESPAWN] = None
+            elif op == OBSTACLE:
+                index, now = self.obstacle.unpack_from(data, offset)
+                offset += self.obstacle.size
+                self.obstacles.extend([None] * (index + 1 - len(self.obstacles)))
+                self.obstacles[index] = now
+            elif op == NO_OBSTACLE:
+                index, = struct.unpack_from('<H', data, offset)
+                offset += 2
+                self.obstacles[index] = None
+            elif op == SCORE:
+                self.score, = struct.unpack_from('<i', data, offset)
+                offset += 4
+            elif op == LEVEL:
+                self.level = data[offset]
+                offset += 1
+            elif op == FLAGS:
+                self.flags = data[offset]
+                offset += 1
+            elif op == KEYFRAME:
+                offset = self.apply_keyframe(data, offset)
+                keyframe = True
+            else:
+                raise ValueError('unknown delta opcode 0x%02x' % op)
+        if not keyframe:
+            self.tick += 1
+        return offset
+
+    def apply_keyframe(self, data, offset):
+        """
+        Replaces the view with the keyframe that starts at offset, after its opcode.
+        Returns:
+            int: Where the keyframe ends.
+        """
+        self.tick, self.score, self.level, self.flags, length = KEYFRAME_HEAD.unpack_from(data, offset)
+        offset += KEYFRAME_HEAD.size
+        size = self.cell.size
+
+        def cells(count):
+            nonlocal offset
+            values = array(self.code)
+            values.frombytes(data[offset:offset + count * size])
+            offset += count * size
+            return values
+
+        self.cells = deque(cells(length))
+        self.items = [None if cell == self.none else cell for cell in cells(len(ITEMS))]
+        count, = struct.unpack_from('<H', data, offset)
+        offset += 2
+        self.obstacles = [None if cell == self.none else cell for cell in cells(count)]
+        return offset
+
+
+class DeltaWriter:
+    """
+    Writes the delta stream of a game to a file, one record per tick, and the keyframe index on close.
+    """
+
+    def __init__(self, path, width, height, keyframe_every=KEYFRAME_EVERY):
+        """
+        Creates the file and writes the header.
+        """
+        self.file = open(path, 'wb')
+        self.encoder = DeltaEncoder(width, height, keyframe_every)
+        self.index = []
+        self.tick = -1
+        self.file.write(HEADER.pack(MAGIC, VERSION, width, height))
+
+    def write(self, state):
+        """
+        Appends the record of the tick just played.
+        Raises:
+            ValueError: If the tick is not after the last one written, as in a new game.
+        """
+        if state.tick <= self.tick:
+            raise ValueError('tick %d after tick %d; write each game to its own stream' % (state.tick, self.tick))
+        self.tick = state.tick
+        record = self.encoder.encode(state)
+        if self.encoder.keyframe:
+            self.index.append((state.tick, self.file.tell()))
+        self.file.write(record)
+
+    def close(self):
+        """
+        Writes the keyframe index and closes the file.
+        """
+        self.file.write(b''.join(INDEX_ENTRY.pack(*entry) for entry in self.index))
+        self.file.write(INDEX_FOOTER.pack(len(self.index), INDEX_MAGIC))
+        self.file.close()
+
+
+class DeltaReader:
+    """
+    Reads a delta stream written by DeltaWriter.
+    """
+
+    def __init__(self, data):
+        """
+        Parses the header and the keyframe index.
+        Args:
+            data (bytes): The whole stream.
+        Raises:
+            ValueError: If the data is not a delta stream of this version.
+        """
+        magic, version, self.width, self.height = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a version %d snake delta stream' % VERSION)
+        count, magic = INDEX_FOOTER.unpack_from(data, len(data) - INDEX_FOOTER.size)
+        if magic != INDEX_MAGIC:
+            raise ValueError('snake delta stream without an index')
+        self.end = len(data) - INDEX_FOOTER.size - count * INDEX_ENTRY.size
+        self.index = [INDEX_ENTRY.unpack_from(data, self.end + i * INDEX_ENTRY.size) for i in range(count)]
+        self.ticks = [tick for tick, offset in self.index]
+        self.data = data
+
+    def __iter__(self):
+        """
+        Yields a DeltaDecoder after each record, in order. It is the same object each time.
+        """
+        decoder = DeltaDecoder(self.width, self.height)
+        offset = HEADER.size
+        while offset < self.end:
+            offset = decoder.apply(self.data, offset)
+            yield decoder
+
+    def seek(self, tick):
+        """
+        Returns the view at the given tick, decoded from the last keyframe at or before it.
+        Raises:
+            ValueError: If the stream does not reach the tick.
+        """
+        position = bisect_right(self.ticks, tick)
+        if not position:
+            raise ValueError('no keyframe at or before tick %d' % tick)
+        decoder = DeltaDecoder(self.width, self.height)
+        offset = decoder.apply(self.data, self.index[position - 1][1])
+        while decoder.tick < tick and offset < self.end:
+            offset = decoder.apply(self.data, offset)
+        if decoder.tick != tick:
+            raise ValueError('the stream ends before tick %d' % tick)
+        return decoder
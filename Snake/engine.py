@@ -0,0 +1,620 @@
+"""
+Headless rules engine for the snake game.
+
+Everything that decides what happens on a game tick lives here: moving the snake, eating fruit,
+spawning obstacles, booms, big fruits and power-ups, levels and game over. The engine has no display,
+no mixer and no wall clock, so it can be driven by the pygame front-end in snake.py, by bots and by
+benchmarks alike through the reset(seed) / step(action) API.
+"""
+import copy
+import random
+from array import array
+
+from grid import OccupancyGrid
+from timers import EXPIRE, SPAWN, TimerQueue
+
+CELL_NUMBER = 20
+
+STOP = (0, 0)
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+NO_LINK = len(DIRECTIONS)
+
+START_BODY = ((5, 10), (4, 10), (3, 10))
+START_OBSTACLES = 5
+MAX_OBSTACLES = 10
+
+LEVEL_TICK_MS = {1: 150, 2: 100, 3: 70}
+POWER_UP_DURATION = 10000
+BIG_FRUIT_DURATION = 5000
+BIG_FRUIT_EVERY = 5
+BOOM_INTERVAL = 10
+BOOM_DURATION = 3
+
+EVENT_CRUNCH = 'crunch'
+EVENT_CRASH = 'crash'
+EVENT_GAME_OVER = 'game_over'
+
+
+def level_for_length(length):
+    """
+    Returns the level reached by a snake of the given length.
+    Args:
+        length (int): Number of blocks in the snake, including blocks still to grow.
+    Returns:
+        int: 1, 2 or 3.
+    """
+    score = length - len(START_BODY)
+    if score > 10:
+        return 3
+    if score > 5:
+        return 2
+    return 1
+
+
+class Snake:
+    """
+    The snake's body and heading. The blocks live in a ring buffer of packed cell indices
+    (y * width + x) with the head at head_index, mirrored on the occupancy grid as it moves.
+    Moving pushes one cell at the head and pops one at the tail, so a tick costs the same at any length.
+    The pushes and pops counters and the generation (bumped whenever the body is replaced) let
+    renderers find out which cells changed since they last looked.
+
+    A parallel ring, links, holds each block's connection code: the index in DIRECTIONS of the
+    step from the block behind it, or NO_LINK if the blocks are not adjacent. It is written once
+    when the block is laid, and with the link of the block in front it fixes the block's sprite.
+    """
+
+    def __init__(self, grid, capacity=64, body=START_BODY):
+        """
+        Initializes the snake at its starting position.
+        Args:
+            grid (OccupancyGrid): The grid the snake's blocks are marked on.
+            capacity (int, optional): Initial size of the ring buffer. It doubles when the snake outgrows it.
+            body (iterable, optional): The (x, y) cells of its blocks, head first. Defaults to START_BODY;
+                an empty body leaves the snake off the board until set_body() is called.
+        """
+        self.grid = grid
+        self.width = grid.width
+        self.cells = array('l', bytes(array('l').itemsize * capacity))
+        self.links = bytearray(capacity)
+        self.head_index = 0
+        self.length = 0
+        self.head = None
+        self.pushes = 0
+        self.pops = 0
+        self.generation = 0
+        self.direction = STOP
+        self.growth = 0
+        self.set_body(body)
+
+    def __len__(self):
+        """
+        Returns the length of the snake, counting blocks that were eaten but have not grown yet.
+        """
+        return self.length + self.growth
+
+    @property
+    def body(self):
+        """
+        list of tuple: The (x, y) cells of the snake's blocks, head first.
+        """
+        return list(self.blocks())
+
+    def blocks(self):
+        """
+        Yields the (x, y) cells of the snake's blocks, head first.
+        """
+        cells = self.cells
+        capacity = len(cells)
+        head_index = self.head_index
+        width = self.width
+        for offset in range(self.length):
+            y, x = divmod(cells[(head_index - offset) % capacity], width)
+            yield x, y
+
+    def cell(self, offset):
+        """
+        Returns the packed cell index of one block.
+        Args:
+            offset (int): Position of the block counted from the head; negative values count from the tail.
+        Returns:
+            int: The cell index, y * width + x.
+        """
+        if offset < 0:
+            offset += self.length
+        return self.cells[(self.head_index - offset) % len(self.cells)]
+
+    def link(self, offset):
+        """
+        Returns the connection code of one block.
+        Args:
+            offset (int): Position of the block counted from the head; negative values count from the tail.
+        Returns:
+            int: The index in DIRECTIONS of the step from the block behind it, or NO_LINK.
+        """
+        if offset < 0:
+            offset += self.length
+        return self.links[(self.head_index - offset) % len(self.links)]
+
+    def block(self, offset):
+        """
+        Returns the (x, y) cell of one block.
+        Args:
+            offset (int): Position of the block counted from the head; negative values count from the tail.
+        Returns:
+            tuple: The (x, y) cell.
+        """
+        if offset < 0:
+            offset += self.length
+        y, x = divmod(self.cells[(self.head_index - offset) % len(self.cells)], self.width)
+        return x, y
+
+    def reset(self):
+        """
+        Resets the snake to its initial state.
+        """
+        self.set_body(START_BODY)
+        self.direction = STOP
+        self.growth = 0
+
+    def set_body(self, cells):
+        """
+        Replaces the snake's blocks and updates the grid.
+        Args:
+            cells (iterable): The (x, y) cells of the new body, head first. An empty body takes the snake off the board.
+        """
+        grid = self.grid
+        for x, y in self.blocks():
+            grid.remove_snake(x, y)
+        blocks = list(cells)
+        capacity = len(self.cells)
+        while capacity < len(blocks):
+            capacity *= 2
+        if capacity != len(self.cells):
+            self.cells = array('l', bytes(self.cells.itemsize * capacity))
+            self.links = bytearray(capacity)
+        behind = None
+        for offset, (x, y) in enumerate(reversed(blocks)):
+            self.cells[offset] = y * self.width + x
+            self.links[offset] = NO_LINK if behind is None else DIRECTION_CODES.get(
+                (x - behind[0], y - behind[1]), NO_LINK)
+            behind = (x, y)
+            grid.add_snake(x, y)
+        self.length = len(blocks)
+        self.head_index = self.length - 1
+        self.head = tuple(blocks[0]) if blocks else None
+        self.generation += 1
+
+    def move(self):
+        """
+        Moves the snake one cell in its current direction. If it's about to grow, it doesn't lose its tail.
+        A head that leaves the board is recorded in head but not pushed onto the body.
+        Returns:
+            tuple: The new head cell.
+        """
+        x, y = self.head
+        dx, dy = self.direction
+        x += dx
+        y += dy
+        self.head = head = (x, y)
+        grid = self.grid
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
+            return head
+        cells = self.cells
+        if self.growth:
+            self.growth -= 1
+            if self.length == len(cells):
+                self.grow_buffer()
+                cells = self.cells
+        else:
+            grid.remove_snake_cell(cells[(self.head_index - self.length + 1) % len(cells)])
+            self.length -= 1
+            self.pops += 1
+        cell = y * self.width + x
+        self.head_index = head_index = (self.head_index + 1) % len(cells)
+        cells[head_index] = cell
+        self.links[head_index] = DIRECTION_CODES[self.direction]
+        grid.add_snake_cell(cell)
+        self.length += 1
+        self.pushes += 1
+        return head
+
+    def grow_buffer(self):
+        """
+        Doubles the ring buffer, laying the blocks out from tail to head.
+        """
+        cells = self.cells
+        capacity = len(cells)
+        tail_index = (self.head_index - self.length + 1) % capacity
+        ordered = cells[tail_index:] + cells[:tail_index] if self.length else array('l')
+        self.cells = ordered + array('l', bytes(cells.itemsize * capacity))
+        links = self.links[tail_index:] + self.links[:tail_index] if self.length else bytearray()
+        self.links = links + bytearray(capacity)
+        self.head_index = self.length - 1
+
+    def add_block(self, num_blocks=1):
+        """
+        Schedules new blocks to be added to the snake's tail on the next moves.
+        Args:
+            num_blocks (int, optional): Number of blocks to add. Defaults to 1.
+        """
+        self.growth += num_blocks
+
+    def check_self_collision(self):
+        """
+        Checks if the snake's head collides with its body.
+        Returns:
+            bool: True if the snake's head is in its body, False otherwise.
+        """
+        return self.grid.snake_count(*self.head) > 1
+
+
+class Item:
+    """
+    A single-cell entity on the board: a fruit, big fruit, obstacle, boom or power-up.
+    """
+    __slots__ = ('kind', 'pos')
+
+    def __init__(self, kind, pos=None):
+        """
+        Initializes an item.
+        Args:
+            kind (str): What the item is, e.g. 'fruit' or 'obstacle'.
+            pos (tuple, optional): The (x, y) cell of the item. Defaults to None.
+        """
+        self.kind = kind
+        self.pos = pos
+
+    def check_collision(self, pos):
+        """
+        Checks if the item is at the given cell.
+        Args:
+            pos (tuple): The (x, y) cell to check.
+        Returns:
+            bool: True if the item is at that cell, False otherwise.
+        """
+        return self.pos == pos
+
+
+class GameState:
+    """
+    Everything the rules need to know about one game. The engine mutates it in place on every step.
+    Times are simulated milliseconds: every tick advances the clock by the tick period of the current level.
+    The *_timer fields record when each timed item last started; timers holds the events that follow
+    from them, and schedule_timers() rebuilds it after the fields are set by hand.
+    """
+
+    def __init__(self, width=CELL_NUMBER, height=CELL_NUMBER):
+        """
+        Initializes an empty game state.
+        Args:
+            width (int, optional): Board width in cells. Defaults to CELL_NUMBER.
+            height (int, optional): Board height in cells. Defaults to CELL_NUMBER.
+        """
+        self.width = width
+        self.height = height
+        self.grid = OccupancyGrid(width, height)
+        self.snake = Snake(self.grid)
+        self.fruit = Item('fruit')
+        self.big_fruit = Item('big_fruit')
+        self.boom = Item('boom')
+        self.power_up = Item('power_up')
+        self.obstacles = []
+        self.score = 0
+        self.big_score = 0
+        self.high_score = 0
+        self.level = 1
+        self.tick = 0
+        self.time_ms = 0
+        self.start_ms = 0
+        self.boom_active = False
+        self.boom_timer = 0
+        self.big_fruit_active = False
+        self.big_fruit_timer = 0
+        self.big_fruit_milestone = 0
+        self.power_up_active = False
+        self.power_up_timer = 0
+        self.done = False
+        self.schedule_timers()
+
+    def schedule_timers(self):
+        """
+        Replaces the timer queue with the events due from the timer fields: the next boom, and the
+        end of the boom, big fruit and power-up that are active.
+        """
+        self.timers = timers = TimerQueue()
+        timers.schedule((SPAWN, self.boom), self.start_ms + (self.boom_timer + BOOM_INTERVAL) * 1000)
+        if self.boom_active:
+            timers.schedule((EXPIRE, self.boom), self.start_ms + (self.boom_timer + BOOM_DURATION) * 1000)
+        if self.big_fruit_active:
+            timers.schedule((EXPIRE, self.big_fruit), self.big_fruit_timer + BIG_FRUIT_DURATION)
+        if self.power_up_active:
+            timers.schedule((EXPIRE, self.power_up), self.power_up_timer + POWER_UP_DURATION + 1)
+
+    def elapsed_seconds(self):
+        """
+        Returns the elapsed time since the game start in seconds.
+        """
+        return (self.time_ms - self.start_ms) // 1000
+
+    def copy(self):
+        """
+        Returns an independent copy of the state.
+        """
+        return copy.deepcopy(self)
+
+
+class SnakeEngine:
+    """
+    Runs the game rules on a GameState without touching pygame.
+
+    Each call to step() advances the game by one tick and returns (state, reward, done), where reward is
+    the score gained during the tick. Things the front-end may want to play or show (crunch, crash,
+    game over) are collected in the events list of the last step.
+    """
+
+    def __init__(self, width=CELL_NUMBER, height=CELL_NUMBER, seed=None):
+        """
+        Initializes the engine and starts a new game.
+        Args:
+            width (int, optional): Board width in cells. Defaults to CELL_NUMBER.
+            height (int, optional): Board height in cells. Defaults to CELL_NUMBER.
+            seed (int, optional): Seed for the game's random number generator. Defaults to None.
+        """
+        self.width = width
+        self.height = height
+        self.rng = random.Random()
+        self.state = None
+        self.events = []
+        self.reset(seed)
+
+    @property
+    def tick_ms(self):
+        """
+        int: The tick period of the current level in milliseconds.
+        """
+        return LEVEL_TICK_MS[self.state.level]
+
+    def reset(self, seed=None):
+        """
+        Starts a new game. The high score carries over from the previous game.
+        Args:
+            seed (int, optional): Seed for the game's random number generator. Defaults to None, which
+                picks a fresh seed; the seed used is kept in self.seed so the game can be replayed.
+        Returns:
+            GameState: The state of the new game.
+        """
+        high_score = self.state.high_score if self.state is not None else 0
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.rng.seed(seed)
+        self.state = state = GameState(self.width, self.height)
+        state.high_score = high_score
+        self.events = []
+        self.spawn(state.fruit)
+        for _ in range(START_OBSTACLES):
+            self.add_obstacle()
+        self.spawn(state.power_up)
+        return state
+
+    def step(self, action=None):
+        """
+        Advances the game by one tick.
+        Args:
+            action (tuple, optional): The direction to turn to before moving, or None to keep going.
+        Returns:
+            tuple: (state, reward, done).
+        """
+        state = self.state
+        self.events = []
+        if state.done:
+            return state, 0, True
+        if action is not None:
+            self.turn(action)
+        score = state.score
+        state.tick += 1
+        state.time_ms += LEVEL_TICK_MS[state.level]
+        self.update()
+        return state, state.score - score, state.done
+
+    def turn(self, direction):
+        """
+        Changes the snake's direction, unless that would move its head back into its neck.
+        Args:
+            direction (tuple): One of UP, DOWN, LEFT or RIGHT.
+        Returns:
+            bool: True if the direction was accepted, False otherwise.
+        """
+        snake = self.state.snake
+        if direction == STOP:
+            return False
+        x, y = snake.head
+        if (x + direction[0], y + direction[1]) == snake.block(1):
+            return False
+        snake.direction = direction
+        return True
+
+    def update(self):
+        """
+        Applies the rules for one tick: movement, collisions, timers and game progression.
+        Timed events that fell due by this tick's clock fire spawns first and expiries last, so an item
+        that expires on the same tick as another spawns does not free its cell for it.
+        """
+        state = self.state
+        snake = state.snake
+        if snake.direction != STOP:
+            snake.move()
+        self.check_collision()
+        if state.done:
+            return
+        self.check_fail()
+        if state.done:
+            return
+
+        now = state.time_ms
+        timers = state.timers
+        if state.grid.item_at(*snake.head) is state.power_up:
+            self.spawn(state.power_up)
+            state.power_up_active = True
+            state.power_up_timer = now
+            timers.schedule((EXPIRE, state.power_up), now + POWER_UP_DURATION + 1)
+
+        due = timers.pop_due(now)
+        for kind, item in due:
+            if kind == SPAWN:
+                self.spawn_boom()
+        if (state.big_score % BIG_FRUIT_EVERY == 0 and state.big_score != state.big_fruit_milestone
+                and not state.big_fruit_active):
+            state.big_fruit_active = True
+            self.spawn(state.big_fruit)
+            state.big_fruit_timer = now
+            state.big_fruit_milestone = state.big_score
+            timers.schedule((EXPIRE, state.big_fruit), now + BIG_FRUIT_DURATION)
+        for kind, item in due:
+            if kind == EXPIRE:
+                self.expire(item)
+
+        if state.level == 3 and len(state.obstacles) < MAX_OBSTACLES:
+            self.add_obstacle()
+
+    def spawn_boom(self):
+        """
+        Puts the boom on the board and schedules its end and the next boom.
+        """
+        state = self.state
+        elapsed = state.elapsed_seconds()
+        state.boom_active = True
+        self.spawn(state.boom)
+        state.boom_timer = elapsed
+        state.timers.schedule((EXPIRE, state.boom), state.start_ms + (elapsed + BOOM_DURATION) * 1000)
+        state.timers.schedule((SPAWN, state.boom), state.start_ms + (elapsed + BOOM_INTERVAL) * 1000)
+
+    def expire(self, item):
+        """
+        Ends a timed item: the boom and the big fruit leave the board, the power-up's effect wears off.
+        """
+        state = self.state
+        if item is state.power_up:
+            state.power_up_active = False
+            return
+        if item is state.boom:
+            state.boom_active = False
+        else:
+            state.big_fruit_active = False
+        state.grid.remove_item(item)
+
+    def check_collision(self):
+        """
+        Checks for collisions between the snake's head and the fruit, power-up, boom, obstacles and
+        big fruit, and updates the score and level accordingly.
+        """
+        state = self.state
+        snake = state.snake
+        item = state.grid.item_at(*snake.head)
+        events = self.events
+
+        if item is state.fruit:
+            self.spawn(state.fruit)
+            snake.add_block()
+            events.append(EVENT_CRUNCH)
+            state.score += 1
+            state.big_score += 1
+        elif item is state.power_up:
+            events.append(EVENT_CRUNCH)
+        elif item is state.big_fruit:
+            state.big_fruit_active = False
+            state.grid.remove_item(item)
+            state.timers.cancel((EXPIRE, item))
+            events.append(EVENT_CRUNCH)
+            state.score += 3
+        elif item is not None:
+            if not state.power_up_active:
+                events.append(EVENT_CRASH)
+                self.game_over()
+                return
+            self.spawn(item)
+        state.level = level_for_length(len(snake))
+
+    def check_fail(self):
+        """
+        Checks if the game has ended (either the snake has hit a wall or collided with itself).
+        """
+        state = self.state
+        x, y = state.snake.head
+        if not 0 <= x < state.width or not 0 <= y < state.height:
+            self.events.append(EVENT_CRASH)
+            self.game_over()
+        elif state.snake.check_self_collision():
+            self.game_over()
+
+    def game_over(self):
+        """
+        Ends the current game and updates the high score.
+        """
+        state = self.state
+        state.done = True
+        if state.score > state.high_score:
+            state.high_score = state.score
+        self.events.append(EVENT_GAME_OVER)
+
+    def continue_game(self):
+        """
+        Puts a fresh snake on the current board after a game over. The score and the clock start over,
+        while obstacles and level progression stay where they were.
+        """
+        state = self.state
+        state.snake.reset()
+        state.start_ms = state.time_ms
+        state.boom_active = False
+        state.grid.remove_item(state.boom)
+        state.timers.cancel((EXPIRE, state.boom))
+        state.timers.schedule((SPAWN, state.boom), state.start_ms + (state.boom_timer + BOOM_INTERVAL) * 1000)
+        state.score = 0
+        state.done = False
+
+    def add_obstacle(self):
+        """
+        Places a new obstacle on a free cell.
+        Returns:
+            Item: The new obstacle.
+        """
+        obstacle = Item('obstacle')
+        self.state.obstacles.append(obstacle)
+        self.spawn(obstacle)
+        return obstacle
+
+    def is_free(self, cell):
+        """
+        Checks whether nothing occupies the given cell.
+        Args:
+            cell (tuple): The (x, y) cell to check.
+        Returns:
+            bool: True if the snake and every active item are elsewhere, False otherwise.
+        """
+        return self.state.grid.is_free(*cell)
+
+    def spawn(self, item):
+        """
+        Moves an item to a random free cell, drawn from the grid's free-cell index.
+        Args:
+            item (Item): The item to place.
+        Returns:
+            tuple: The new (x, y) cell of the item, or None if the board is full. In that case the
+            item is taken off the board and its position is None.
+        """
+        grid = self.state.grid
+        grid.remove_item(item)
+        index = grid.free.sample(self.rng.random)
+        if index is None:
+            item.pos = None
+            return None
+        y, x = divmod(index, self.width)
+        cell = (x, y)
+        grid.place_item(item, cell)
+        return cell
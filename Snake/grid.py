@@ -0,0 +1,212 @@
+"""
+Occupancy grid shared by the engine's snake and items.
+
+Cells are packed as index = y * width + x. The snake layer counts snake blocks per cell in a
+bytearray, and the item layer holds the item lying on each cell, so every collision query is a
+single lookup whatever the snake's length or the number of obstacles. A FreeCells index follows
+the two layers so that spawning picks a free cell in constant time however full the board is.
+"""
+from array import array
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4)
+def identity(size):
+    """
+    Returns array('i', range(size)) for copying, cached for the last few board sizes.
+    """
+    return array('i', range(size))
+
+
+class FreeCells:
+    """
+    The set of free cells, kept as a swap-remove array plus a position map.
+
+    cells[:count] are the free cells and cells[count:] the occupied ones; where[index] is the
+    position of a cell in cells. Occupying or releasing a cell swaps it across the count boundary,
+    and sampling picks a random position below count.
+    """
+
+    def __init__(self, size):
+        """
+        Initializes the index with every cell free.
+        Args:
+            size (int): Number of cells on the board.
+        """
+        cells = identity(size)
+        self.cells = cells[:]
+        self.where = cells[:]
+        self.count = size
+
+    def __len__(self):
+        """
+        Returns the number of free cells.
+        """
+        return self.count
+
+    def __contains__(self, index):
+        """
+        Checks whether the cell is free.
+        """
+        return self.where[index] < self.count
+
+    def occupy(self, index):
+        """
+        Removes a cell from the free set. Cells that are already occupied are left alone.
+        """
+        where = self.where
+        position = where[index]
+        last = self.count - 1
+        if position > last:
+            return
+        cells = self.cells
+        moved = cells[last]
+        cells[position] = moved
+        where[moved] = position
+        cells[last] = index
+        where[index] = last
+        self.count = last
+
+    def release(self, index):
+        """
+        Returns a cell to the free set. Cells that are already free are left alone.
+        """
+        where = self.where
+        position = where[index]
+        first = self.count
+        if position < first:
+            return
+        cells = self.cells
+        moved = cells[first]
+        cells[position] = moved
+        where[moved] = position
+        cells[first] = index
+        where[index] = first
+        self.count = first + 1
+
+    def sample(self, rand):
+        """
+        Picks a free cell uniformly at random.
+        Args:
+            rand (callable): Returns a float in [0, 1), e.g. random.Random.random.
+        Returns:
+            int: The packed index of the cell, or None if the board is full.
+        """
+        if not self.count:
+            return None
+        return self.cells[int(rand() * self.count)]
+
+
+class OccupancyGrid:
+    """
+    Tracks which cells the snake and the items on the board occupy. The engine keeps it in sync
+    incrementally: a head push and a tail pop each touch one cell, placing or removing an item touches one.
+    """
+
+    def __init__(self, width, height):
+        """
+        Initializes an empty grid.
+        Args:
+            width (int): Board width in cells.
+            height (int): Board height in cells.
+        """
+        self.width = width
+        self.height = height
+        self.snake = bytearray(width * height)
+        self.items = [None] * (width * height)
+        self.free = FreeCells(width * height)
+
+    def contains(self, x, y):
+        """
+        Checks whether the cell is on the board.
+        """
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def index(self, x, y):
+        """
+        Returns the packed index of an (x, y) cell.
+        """
+        return y * self.width + x
+
+    def add_snake(self, x, y):
+        """
+        Marks a snake block on the cell. Cells off the board are ignored.
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.add_snake_cell(y * self.width + x)
+
+    def remove_snake(self, x, y):
+        """
+        Removes a snake block from the cell. Cells off the board are ignored.
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.remove_snake_cell(y * self.width + x)
+
+    def add_snake_cell(self, index):
+        """
+        Marks a snake block on the cell with the given packed index.
+        """
+        count = self.snake[index]
+        if not count and self.items[index] is None:
+            self.free.occupy(index)
+        self.snake[index] = count + 1
+
+    def remove_snake_cell(self, index):
+        """
+        Removes a snake block from the cell with the given packed index.
+        """
+        count = self.snake[index] - 1
+        self.snake[index] = count
+        if not count and self.items[index] is None:
+            self.free.release(index)
+
+    def snake_count(self, x, y):
+        """
+        Returns the number of snake blocks on the cell, 0 for cells off the board.
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.snake[y * self.width + x]
+        return 0
+
+    def place_item(self, item, pos):
+        """
+        Puts an item on the cell and records the cell as the item's position.
+        Args:
+            item (engine.Item): The item to place.
+            pos (tuple): The (x, y) cell.
+        """
+        x, y = pos
+        index = y * self.width + x
+        if self.items[index] is None and not self.snake[index]:
+            self.free.occupy(index)
+        self.items[index] = item
+        item.pos = pos
+
+    def remove_item(self, item):
+        """
+        Takes an item off the grid. The item keeps its last position.
+        Args:
+            item (engine.Item): The item to remove.
+        """
+        if item.pos is not None:
+            x, y = item.pos
+            index = y * self.width + x
+            if 0 <= x < self.width and 0 <= y < self.height and self.items[index] is item:
+                self.items[index] = None
+                if not self.snake[index]:
+                    self.free.release(index)
+
+    def item_at(self, x, y):
+        """
+        Returns the item on the cell, or None if there is none or the cell is off the board.
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.items[y * self.width + x]
+        return None
+
+    def is_free(self, x, y):
+        """
+        Checks whether neither the snake nor an item occupies the cell.
+        """
+        index = y * self.width + x
+        return not self.snake[index] and self.items[index] is None
@@ -0,0 +1,149 @@
+"""
+Persistent leaderboard of finished runs, kept in SQLite.
+
+Every run is stored as a row with its player, score, level, duration, ticks, seed and finish time.
+Indexes on (score) and (player, score) make an insertion and a top-K or per-player query cost a
+B-tree descent instead of the read-sort-rewrite the old high_scores.json needed. A trigger keeps a
+count of runs per distinct score, so a rank sums one row per higher score rather than counting
+every run above it. The database runs
+in write-ahead-log mode, so readers never block the writer, and add_many() commits a whole batch in
+one transaction; several processes can write to the same file, each waiting its turn for the write
+lock for up to busy_timeout seconds.
+"""
+import json
+import sqlite3
+import time
+from collections import namedtuple
+
+Run = namedtuple('Run', 'player score level duration_ms ticks seed finished_at', defaults=(0, 0, None, None))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    seed INTEGER,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC);
+CREATE INDEX IF NOT EXISTS runs_by_player ON runs (player, score DESC);
+CREATE TABLE IF NOT EXISTS score_counts (
+    score INTEGER PRIMARY KEY,
+    runs INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS count_score AFTER INSERT ON runs BEGIN
+    INSERT INTO score_counts (score, runs) VALUES (new.score, 1)
+    ON CONFLICT (score) DO UPDATE SET runs = runs + 1;
+END;
+"""
+
+
+class Leaderboard:
+    """
+    A leaderboard stored in an SQLite database file.
+    """
+
+    def __init__(self, path='leaderboard.db', busy_timeout=30.0):
+        """
+        Opens the database, creating it if needed.
+        Args:
+            path (str, optional): The database file. Defaults to 'leaderboard.db'.
+            busy_timeout (float, optional): Seconds to wait for another writer. Defaults to 30.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=busy_timeout)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self.connection.close()
+
+    def add(self, run):
+        """
+        Stores one finished run.
+        Args:
+            run (Run): The run. A missing finished_at is set to now.
+        """
+        self.add_many([run])
+
+    def add_many(self, runs):
+        """
+        Stores a batch of finished runs in a single transaction.
+        Args:
+            runs (iterable of Run): The runs. A missing finished_at is set to now.
+        Returns:
+            int: Number of runs stored.
+        """
+        now = time.time()
+        rows = [run._replace(finished_at=now) if run.finished_at is None else run for run in runs]
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO runs (player, score, level, duration_ms, ticks, seed, finished_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def top(self, k=5, player=None):
+        """
+        Returns the best runs, highest score first; ties go to the earlier run.
+        Args:
+            k (int, optional): Number of runs. Defaults to 5.
+            player (str, optional): Only this player's runs. Defaults to None, for everyone's.
+        Returns:
+            list of Run: The runs.
+        """
+        columns = 'player, score, level, duration_ms, ticks, seed, finished_at'
+        if player is None:
+            rows = self.connection.execute(
+                f'SELECT {columns} FROM runs ORDER BY score DESC, id LIMIT ?', (k,))
+        else:
+            rows = self.connection.execute(
+                f'SELECT {columns} FROM runs WHERE player = ? ORDER BY score DESC, id LIMIT ?', (player, k))
+        return [Run(*row) for row in rows]
+
+    def best_score(self, player=None):
+        """
+        Returns the highest score, or 0 if there are no runs.
+        Args:
+            player (str, optional): Only this player's runs. Defaults to None, for everyone's.
+        """
+        best = self.top(1, player)
+        return best[0].score if best else 0
+
+    def rank(self, score):
+        """
+        Returns the place a score would take on the leaderboard: 1 plus the number of runs that beat it.
+        """
+        beaten_by = self.connection.execute('SELECT SUM(runs) FROM score_counts WHERE score > ?', (score,)).fetchone()[0]
+        return (beaten_by or 0) + 1
+
+    def is_empty(self):
+        """
+        Checks whether no runs are stored, without counting them.
+        """
+        return not self.connection.execute('SELECT EXISTS(SELECT 1 FROM runs)').fetchone()[0]
+
+    def count(self):
+        """
+        Returns the number of runs stored.
+        """
+        return self.connection.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    def import_scores(self, path, player='unknown'):
+        """
+        Stores the bare scores of an old high_scores.json file as runs without metadata.
+        Args:
+            path (str): The json file, a list of integers.
+            player (str, optional): Player name to store them under. Defaults to 'unknown'.
+        Returns:
+            int: Number of scores imported.
+        """
+        with open(path) as f:
+            scores = json.load(f)
+        return self.add_many(Run(player, int(score), 0, 0, 0, None, 0.0) for score in scores)
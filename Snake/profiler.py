@@ -0,0 +1,192 @@
+"""
+Per-frame profiling for the game loop.
+
+FrameProfiler keeps the duration of each phase of recent frames in fixed-size ring buffers, so a
+long session costs the same memory as a short one. The game loop marks the end of each phase with
+lap(): the time since the previous mark is recorded under the phase's name. Work nested inside a
+phase, such as the engine ticks run during 'update' or the HUD drawn during 'render', is timed
+with start() and stop().
+
+When the profiler is disabled every hook returns before reading the clock, so the instrumented
+loop runs as it would without it. Summaries give the frame rate and the 50th, 95th and 99th
+percentile of each phase; export() writes the samples to CSV or JSON for offline analysis.
+"""
+import csv
+import json
+import time
+from array import array
+
+PHASES = ('events', 'update', 'tick', 'render', 'hud', 'overlay', 'display', 'capture', 'wait', 'frame')
+CAPACITY = 600
+FPS_FRAMES = 60
+
+
+class RingBuffer:
+    """
+    The last capacity float samples, overwriting the oldest.
+    """
+    __slots__ = ('values', 'count')
+
+    def __init__(self, capacity=CAPACITY):
+        """
+        Initializes an empty buffer.
+        """
+        self.values = array('d', bytes(8 * capacity))
+        self.count = 0
+
+    def add(self, value):
+        """
+        Stores a sample in place of the oldest one.
+        """
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def samples(self):
+        """
+        Returns the samples held, oldest first.
+        """
+        capacity = len(self.values)
+        if self.count <= capacity:
+            return self.values[:self.count].tolist()
+        start = self.count % capacity
+        return (self.values[start:] + self.values[:start]).tolist()
+
+    def clear(self):
+        """
+        Forgets every sample.
+        """
+        self.count = 0
+
+
+class FrameProfiler:
+    """
+    Records how long each phase of a frame took.
+
+    A frame starts with begin_frame(); each lap(name) then records the time since the previous
+    lap (or the start of the frame) under name. The time between two begin_frame() calls is
+    recorded as 'frame'.
+    """
+
+    def __init__(self, phases=PHASES, capacity=CAPACITY, enabled=False):
+        """
+        Initializes the profiler with empty buffers.
+        Args:
+            phases (tuple, optional): Names of the phases, in the order reports list them. Defaults to PHASES.
+            capacity (int, optional): Samples kept per phase. Defaults to CAPACITY.
+            enabled (bool, optional): Whether to record from the start. Defaults to False.
+        """
+        self.phases = phases
+        self.buffers = {name: RingBuffer(capacity) for name in phases}
+        self.enabled = False
+        self.frame_start = None
+        self.last = 0.0
+        self.set_enabled(enabled)
+
+    def set_enabled(self, enabled):
+        """
+        Starts or stops recording. Recording starts over at the next frame.
+        """
+        self.enabled = enabled
+        self.frame_start = None
+        self.last = time.perf_counter()
+
+    def begin_frame(self):
+        """
+        Marks the start of a frame.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.buffers['frame'].add(now - self.frame_start)
+        self.frame_start = self.last = now
+
+    def lap(self, name):
+        """
+        Records the time since the previous mark as the given phase.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.buffers[name].add(now - self.last)
+        self.last = now
+
+    def start(self):
+        """
+        Returns the time a nested span starts at, or 0.0 when disabled.
+        """
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, name, started):
+        """
+        Records the time since started, a value returned by start(), as the given phase.
+        """
+        if started:
+            self.buffers[name].add(time.perf_counter() - started)
+
+    def clear(self):
+        """
+        Forgets every sample.
+        """
+        for buffer in self.buffers.values():
+            buffer.clear()
+        self.frame_start = None
+
+    def fps(self):
+        """
+        Returns the frame rate over the last FPS_FRAMES frames, or 0.0 before two frames were seen.
+        """
+        frames = self.buffers['frame'].samples()[-FPS_FRAMES:]
+        return len(frames) / sum(frames) if frames and sum(frames) > 0 else 0.0
+
+    def percentiles(self, name):
+        """
+        Returns the 50th, 95th and 99th percentile of a phase in milliseconds, or None without samples.
+        """
+        samples = sorted(self.buffers[name].samples())
+        if not samples:
+            return None
+        last = len(samples) - 1
+        return tuple(samples[min(last, int(fraction * len(samples)))] * 1000 for fraction in (0.5, 0.95, 0.99))
+
+    def summary_lines(self):
+        """
+        Returns the frame rate, mean tick time and the percentiles of every phase with samples, one line each,
+        under a heading for the percentile columns.
+        """
+        ticks = self.buffers['tick'].samples()
+        tick_ms = sum(ticks) / len(ticks) * 1000 if ticks else 0.0
+        lines = [f'FPS {self.fps():5.1f}   tick {tick_ms:6.3f} ms',
+                 f'{"phase":<8} {"p50 ms":>7} {"p95 ms":>7} {"p99 ms":>7}']
+        for name in self.phases:
+            stats = self.percentiles(name)
+            if stats is not None:
+                lines.append(f'{name:<8} {stats[0]:7.3f} {stats[1]:7.3f} {stats[2]:7.3f}')
+        return lines
+
+    def report(self):
+        """
+        Returns the summary as text.
+        """
+        return '\n'.join(['profile:'] + self.summary_lines())
+
+    def export(self, path):
+        """
+        Writes the samples held to a file: JSON if the path ends in .json, CSV otherwise.
+        The CSV has one row per sample (phase, index, ms); the JSON holds the samples in
+        milliseconds for each phase and the percentiles.
+        """
+        if path.endswith('.json'):
+            data = {'fps': self.fps(),
+                    'phases': {name: {'ms': [value * 1000 for value in self.buffers[name].samples()],
+                                      'p50_p95_p99_ms': self.percentiles(name)}
+                               for name in self.phases}}
+            with open(path, 'w') as file:
+                json.dump(data, file)
+            return
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('phase', 'index', 'ms'))
+            for name in self.phases:
+                for index, value in enumerate(self.buffers[name].samples()):
+                    writer.writerow((name, index, f'{value * 1000:.6f}'))
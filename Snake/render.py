@@ -0,0 +1,554 @@
+"""
+Cached background and dirty-rectangle rendering for the game board.
+
+The window shows the part of the board a Camera looks at, in whole cells; on boards bigger than
+the window the camera follows the snake's head. The checkerboard grass never changes, so it is
+drawn one square chunk of cells at a time into Surfaces that ChunkedBackground caches; only chunks
+under the camera are ever drawn or blitted, so the cost of a frame follows the size of the window,
+not of the board.
+
+DirtyRenderer keeps track of what it last drew on every cell and, each frame, only repaints the
+cells that changed since then: the new head, the old head that became a body block, the old and
+new tail, and items that moved, appeared or disappeared. The HUD is redrawn when its values change
+or when a repainted cell lies under it. When the camera moves, the whole window is repainted from
+the background chunks and the cells under it. render() returns the rectangles to pass to
+pygame.display.update().
+
+Snake sprites are looked up rather than worked out: every block carries the connection code the
+engine stored when it was laid, and the sprite of a block follows from its own code and the code
+of the block in front, through tables built once from segment_image_name().
+"""
+from collections import OrderedDict, deque
+from functools import lru_cache
+
+import pygame
+
+from engine import DIRECTIONS, NO_LINK
+
+BACKGROUND_COLOR = (175, 215, 70)
+GRASS_COLOR = (167, 209, 61)
+CHUNK_CELLS = 8
+
+HEAD_IMAGES = {(1, 0): 'head_left', (-1, 0): 'head_right', (0, 1): 'head_up', (0, -1): 'head_down'}
+TAIL_IMAGES = {(1, 0): 'tail_left', (-1, 0): 'tail_right', (0, 1): 'tail_up', (0, -1): 'tail_down'}
+CORNER_IMAGES = {
+    frozenset(((-1, 0), (0, -1))): 'body_tl',
+    frozenset(((-1, 0), (0, 1))): 'body_bl',
+    frozenset(((1, 0), (0, -1))): 'body_tr',
+    frozenset(((1, 0), (0, 1))): 'body_br',
+}
+
+
+class Camera:
+    """
+    The part of the board shown in the window, a rectangle of whole cells.
+
+    Attributes
+    ----------
+    x, y : int
+        The board cell shown at the top-left corner of the window.
+    columns, rows : int
+        Number of cells the window shows across and down; never more than the board has.
+    margin : int
+        Fewest cells follow() keeps between the followed cell and the edge of the window.
+    """
+
+    def __init__(self, board_width, board_height, columns, rows, margin=None):
+        """
+        Initializes a camera at the top-left corner of the board.
+        Args:
+            board_width (int): Board width in cells.
+            board_height (int): Board height in cells.
+            columns (int): Cells the window shows across.
+            rows (int): Cells the window shows down.
+            margin (int, optional): See the margin attribute. Defaults to a quarter of the window.
+        """
+        self.board_width = board_width
+        self.board_height = board_height
+        self.columns = min(columns, board_width)
+        self.rows = min(rows, board_height)
+        self.margin = min(self.columns, self.rows) // 4 if margin is None else margin
+        self.x = 0
+        self.y = 0
+        self.position_cache = None
+
+    def follow(self, cell):
+        """
+        Scrolls the least it can to keep a cell at least margin cells inside the window, without
+        showing anything past the edge of the board.
+        Args:
+            cell (tuple): The (x, y) cell to follow.
+        Returns:
+            bool: True if the camera moved.
+        """
+        x = min(max(self.x, cell[0] + self.margin + 1 - self.columns), cell[0] - self.margin)
+        y = min(max(self.y, cell[1] + self.margin + 1 - self.rows), cell[1] - self.margin)
+        x = max(0, min(x, self.board_width - self.columns))
+        y = max(0, min(y, self.board_height - self.rows))
+        if (x, y) == (self.x, self.y):
+            return False
+        self.x = x
+        self.y = y
+        return True
+
+    def covers_board(self):
+        """
+        Returns True if the window shows the whole board.
+        """
+        return self.columns == self.board_width and self.rows == self.board_height
+
+    def visible(self, x, y):
+        """
+        Returns True if the cell (x, y) is in the window.
+        """
+        return 0 <= x - self.x < self.columns and 0 <= y - self.y < self.rows
+
+    def cell_rect(self, x, y, cell_size):
+        """
+        Returns the window rectangle of the cell (x, y), or None if it is out of the window.
+        """
+        if not self.visible(x, y):
+            return None
+        return pygame.Rect((x - self.x) * cell_size, (y - self.y) * cell_size, cell_size, cell_size)
+
+    def positions(self, cell_size):
+        """
+        Returns a dict from the packed index of every cell in the window to its top-left pixel.
+        It is rebuilt only when the camera has moved.
+        """
+        key = (self.x, self.y, cell_size)
+        if self.position_cache is None or self.position_cache[0] != key:
+            width = self.board_width
+            positions = {}
+            for row in range(self.rows):
+                base = (self.y + row) * width + self.x
+                top = row * cell_size
+                for column in range(self.columns):
+                    positions[base + column] = (column * cell_size, top)
+            self.position_cache = (key, positions)
+        return self.position_cache[1]
+
+    def chunks(self, chunk_cells):
+        """
+        Returns the (column, row) of every background chunk that overlaps the window.
+        """
+        return [(cx, cy)
+                for cy in range(self.y // chunk_cells, (self.y + self.rows - 1) // chunk_cells + 1)
+                for cx in range(self.x // chunk_cells, (self.x + self.columns - 1) // chunk_cells + 1)]
+
+
+class ChunkedBackground:
+    """
+    The checkerboard grass, drawn one square chunk of cells at a time and cached.
+
+    Chunks are drawn the first time the camera shows them. The cache keeps the most recently used
+    max_chunks of them, so memory stays bounded however big the board is.
+    """
+
+    def __init__(self, cell_size, chunk_cells=CHUNK_CELLS, max_chunks=32):
+        """
+        Initializes an empty cache.
+        Args:
+            cell_size (int): Size of a cell in pixels.
+            chunk_cells (int, optional): Cells along each side of a chunk. Defaults to CHUNK_CELLS.
+            max_chunks (int, optional): Most chunks kept. Defaults to 32.
+        """
+        self.cell_size = cell_size
+        self.chunk_cells = chunk_cells
+        self.max_chunks = max_chunks
+        self.cache = OrderedDict()
+        self.drawn = 0
+
+    def chunk(self, cx, cy):
+        """
+        Returns the Surface of a chunk, drawing it if it is not cached.
+        Args:
+            cx (int): Chunk column.
+            cy (int): Chunk row.
+        """
+        key = (cx, cy)
+        surface = self.cache.get(key)
+        if surface is None:
+            surface = self.draw_chunk(cx, cy)
+            self.cache[key] = surface
+            if len(self.cache) > self.max_chunks:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return surface
+
+    def draw_chunk(self, cx, cy):
+        """
+        Draws the grass of one chunk: the cells whose x + y is even are the lighter squares.
+        """
+        cell_size = self.cell_size
+        cells = self.chunk_cells
+        surface = pygame.Surface((cells * cell_size, cells * cell_size))
+        surface.fill(BACKGROUND_COLOR)
+        for row in range(cells):
+            for col in range((cx * cells + cy * cells + row) % 2, cells, 2):
+                surface.fill(GRASS_COLOR, (col * cell_size, row * cell_size, cell_size, cell_size))
+        self.drawn += 1
+        return surface
+
+    def blit(self, screen, camera):
+        """
+        Draws the background of the whole window.
+        Returns:
+            pygame.Rect: The window rectangle.
+        """
+        cells = self.chunk_cells
+        screen.blits([(self.chunk(cx, cy), ((cx * cells - camera.x) * self.cell_size,
+                                             (cy * cells - camera.y) * self.cell_size))
+                      for cx, cy in camera.chunks(cells)], doreturn=False)
+        return pygame.Rect(0, 0, camera.columns * self.cell_size, camera.rows * self.cell_size)
+
+    def blit_cell(self, screen, x, y, rect):
+        """
+        Draws the background of the cell (x, y) into rect on the screen.
+        """
+        cells = self.chunk_cells
+        cell_size = self.cell_size
+        screen.blit(self.chunk(x // cells, y // cells), rect,
+                    ((x % cells) * cell_size, (y % cells) * cell_size, cell_size, cell_size))
+
+
+def segment_image_name(before, block, after):
+    """
+    Chooses the sprite of a snake block from its neighbours.
+    Args:
+        before (tuple): The (x, y) cell of the block towards the head, or None for the head.
+        block (tuple): The (x, y) cell of the block.
+        after (tuple): The (x, y) cell of the block towards the tail, or None for the tail.
+    Returns:
+        str: The image name, or None if the neighbours are not adjacent to the block.
+    """
+    if before is None:
+        if after is None:
+            return None
+        return HEAD_IMAGES.get((after[0] - block[0], after[1] - block[1]))
+    if after is None:
+        return TAIL_IMAGES.get((before[0] - block[0], before[1] - block[1]))
+    previous_block = (after[0] - block[0], after[1] - block[1])
+    next_block = (before[0] - block[0], before[1] - block[1])
+    if previous_block[0] == next_block[0]:
+        return 'body_vertical'
+    if previous_block[1] == next_block[1]:
+        return 'body_horizontal'
+    return CORNER_IMAGES.get(frozenset((previous_block, next_block)))
+
+
+def _link_tables():
+    """
+    Builds the sprite names of a head, body block and tail for every combination of connection codes.
+    Returns:
+        tuple: HEAD_BY_LINK and TAIL_BY_LINK, indexed by one code, and BODY_BY_LINKS, indexed by
+        front * (NO_LINK + 1) + link for a block with code link behind a block with code front.
+    """
+    steps = DIRECTIONS + (None,)
+    block = (2, 2)
+
+    def behind(code):
+        return None if steps[code] is None else (block[0] - steps[code][0], block[1] - steps[code][1])
+
+    def ahead(code):
+        return None if steps[code] is None else (block[0] + steps[code][0], block[1] + steps[code][1])
+
+    codes = range(NO_LINK + 1)
+    heads = tuple(behind(code) and segment_image_name(None, block, behind(code)) for code in codes)
+    tails = tuple(ahead(front) and segment_image_name(ahead(front), block, None) for front in codes)
+    bodies = tuple(ahead(front) and behind(link) and segment_image_name(ahead(front), block, behind(link))
+                   for front in codes for link in codes)
+    return heads, tails, bodies
+
+
+HEAD_BY_LINK, TAIL_BY_LINK, BODY_BY_LINKS = _link_tables()
+
+
+def snake_image_name(snake, offset):
+    """
+    Returns the sprite name of one block of an engine snake from the stored connection codes.
+    Args:
+        snake (engine.Snake): The snake.
+        offset (int): Position of the block counted from the head.
+    Returns:
+        str: The image name, or None if the block has no sprite.
+    """
+    last = snake.length - 1
+    if offset == 0:
+        return HEAD_BY_LINK[snake.link(0)] if last > 0 else None
+    if offset == last:
+        return TAIL_BY_LINK[snake.link(offset - 1)]
+    return BODY_BY_LINKS[snake.link(offset - 1) * (NO_LINK + 1) + snake.link(offset)]
+
+
+@lru_cache(maxsize=4)
+def cell_positions(width, height, cell_size):
+    """
+    Returns the top-left pixel of every packed cell index of a board.
+    """
+    return [(x * cell_size, y * cell_size) for y in range(height) for x in range(width)]
+
+
+def snake_sprites(snake):
+    """
+    Returns the cells of an engine snake's blocks and their sprite names, head first.
+    Args:
+        snake (engine.Snake): The snake.
+    Returns:
+        tuple: The array of packed cell indices and the list of image names, None for blocks without a sprite.
+    """
+    length = snake.length
+    head = snake.head_index
+    cells = (snake.cells[head::-1] + snake.cells[:head:-1])[:length]
+    if length < 2:
+        return cells, [None] * length
+    links = (snake.links[head::-1] + snake.links[:head:-1])[:length]
+    stride = NO_LINK + 1
+    names = [HEAD_BY_LINK[links[0]]]
+    names += [BODY_BY_LINKS[front * stride + link] for front, link in zip(links, links[1:-1])]
+    names.append(TAIL_BY_LINK[links[-2]])
+    return cells, names
+
+
+def snake_blits(snake, images, cell_size, camera=None):
+    """
+    Builds the blit sequence that draws a whole engine snake, for Surface.blits().
+    Args:
+        snake (engine.Snake): The snake to draw.
+        images (dict): The snake sprites by name.
+        cell_size (int): Size of a cell in pixels.
+        camera (Camera, optional): Only blocks in its window are drawn, relative to it. Defaults to None,
+            for a window showing the whole board.
+    Returns:
+        list of tuple: (image, position) pairs, head first; blocks without a sprite are left out.
+    """
+    if camera is not None and not camera.covers_board():
+        positions = camera.positions(cell_size)
+        cells, names = snake_sprites(snake)
+        return [(images[name], positions[cell]) for cell, name in zip(cells, names)
+                if name and cell in positions]
+    length = snake.length
+    if length < 2:
+        return []
+    head = snake.head_index
+    cells = (snake.cells[head::-1] + snake.cells[:head:-1])[:length]
+    links = (snake.links[head::-1] + snake.links[:head:-1])[:length]
+    positions = cell_positions(snake.grid.width, snake.grid.height, cell_size)
+    stride = NO_LINK + 1
+    bodies = [images[name] if name else None for name in BODY_BY_LINKS]
+    sequence = [(images[HEAD_BY_LINK[links[0]]] if HEAD_BY_LINK[links[0]] else None, positions[cells[0]])]
+    sequence += [(bodies[front * stride + link], positions[cell])
+                 for front, link, cell in zip(links, links[1:-1], cells[1:-1])]
+    sequence.append((images[TAIL_BY_LINK[links[-2]]] if TAIL_BY_LINK[links[-2]] else None, positions[cells[-1]]))
+    if links.find(NO_LINK, 0, length - 1) != -1:
+        sequence = [blit for blit in sequence if blit[0] is not None]
+    return sequence
+
+
+class DirtyRenderer:
+    """
+    Draws a GameState onto a surface, repainting only the cells that changed since the last frame.
+    """
+
+    def __init__(self, screen, cell_size, draw_hud, camera=None):
+        """
+        Initializes the renderer.
+        Args:
+            screen (pygame.Surface): The surface to draw on.
+            cell_size (int): Size of a cell in pixels.
+            draw_hud (callable): Draws the HUD on the screen and returns the list of rectangles it covered.
+            camera (Camera, optional): The part of the board to show; it follows the snake's head.
+                Defaults to None, for a camera as big as the screen.
+        """
+        self.screen = screen
+        self.cell_size = cell_size
+        self.draw_hud = draw_hud
+        self.camera = camera
+        self.images = {}
+        self.state = None
+        self.background = ChunkedBackground(cell_size)
+        self.snake_cells = deque()
+        self.pushes = 0
+        self.pops = 0
+        self.generation = None
+        self.items = {}
+        self.drawn = {}
+        self.hud_key = None
+        self.hud_rects = []
+        self.full = True
+
+    def invalidate(self):
+        """
+        Makes the next frame repaint the whole board, e.g. after a menu or message covered it.
+        """
+        self.full = True
+
+    def cell_rect(self, cell):
+        """
+        Returns the screen rectangle of a packed cell index, or None if the camera does not show it.
+        """
+        y, x = divmod(cell, self.state.width)
+        return self.camera.cell_rect(x, y, self.cell_size)
+
+    def visible_items(self, state):
+        """
+        Returns a dict from every item currently shown to its (cell, image).
+        """
+        width = state.width
+        shown = [(state.fruit, 'apple')]
+        if state.big_fruit_active:
+            shown.append((state.big_fruit, 'banana'))
+        if state.boom_active:
+            shown.append((state.boom, 'boom'))
+        if not state.power_up_active:
+            shown.append((state.power_up, 'power_up'))
+        shown.extend((obstacle, 'obstacle') for obstacle in state.obstacles)
+        return {item: (item.pos[1] * width + item.pos[0], self.images[name])
+                for item, name in shown if item.pos is not None}
+
+    def snake_image(self, offset):
+        """
+        Returns the sprite of the snake block at the given offset from the head.
+        """
+        name = snake_image_name(self.state.snake, offset)
+        return self.images[name] if name else None
+
+    def paint(self, cell, image):
+        """
+        Repaints one cell with the background and the given image, and remembers what it shows.
+        A cell out of the camera's view is only remembered.
+        Returns:
+            pygame.Rect: The repainted rectangle, or None if the cell is out of view.
+        """
+        if image is None:
+            self.drawn.pop(cell, None)
+        else:
+            self.drawn[cell] = image
+        y, x = divmod(cell, self.state.width)
+        rect = self.camera.cell_rect(x, y, self.cell_size)
+        if rect is not None:
+            self.background.blit_cell(self.screen, x, y, rect)
+            if image is not None:
+                self.screen.blit(image, rect)
+        return rect
+
+    def render(self, state, hud_key):
+        """
+        Brings the screen up to date with the state.
+        Args:
+            state (engine.GameState): The game to draw.
+            hud_key (tuple): The values shown by the HUD; it is redrawn when they change.
+        Returns:
+            list of pygame.Rect: The rectangles that changed on the screen.
+        """
+        snake = state.snake
+        new_blocks = snake.pushes - self.pushes
+        popped = snake.pops - self.pops
+        if (self.full or state is not self.state or snake.generation != self.generation
+                or new_blocks >= snake.length or popped > len(self.snake_cells)):
+            return self.redraw(state, hud_key)
+
+        updates = {}
+        cells = self.snake_cells
+        for _ in range(popped):
+            updates[cells.pop()] = None
+        for offset in range(new_blocks - 1, -1, -1):
+            cells.appendleft(snake.cell(offset))
+        self.pushes = snake.pushes
+        self.pops = snake.pops
+        if len(cells) != snake.length:
+            return self.redraw(state, hud_key)
+
+        items = self.visible_items(state)
+        for item, (cell, image) in self.items.items():
+            if items.get(item) != (cell, image):
+                updates.setdefault(cell, None)
+        for item, (cell, image) in items.items():
+            if self.items.get(item) != (cell, image) or cell in updates:
+                updates[cell] = image
+        self.items = items
+        if new_blocks or popped:
+            offsets = set(range(min(new_blocks + 1, len(cells))))
+            offsets.add(len(cells) - 1)
+            for offset in offsets:
+                updates[cells[offset]] = self.snake_image(offset)
+
+        if self.camera.follow(snake.head):
+            for cell, image in updates.items():
+                if image is None:
+                    self.drawn.pop(cell, None)
+                else:
+                    self.drawn[cell] = image
+            return self.repaint(hud_key)
+        rects = [rect for rect in (self.paint(cell, image) for cell, image in updates.items()) if rect]
+        if hud_key != self.hud_key or any(rect.collidelist(self.hud_rects) != -1 for rect in rects):
+            rects.extend(self.refresh_hud(hud_key))
+        return rects
+
+    def refresh_hud(self, hud_key):
+        """
+        Repaints the cells under the old HUD and draws the HUD again.
+        Returns:
+            list of pygame.Rect: The repainted cells and the new HUD rectangles.
+        """
+        cell_size = self.cell_size
+        camera = self.camera
+        width = self.state.width
+        rects = []
+        for rect in self.hud_rects:
+            for row in range(max(rect.top // cell_size, 0), min((rect.bottom - 1) // cell_size + 1, camera.rows)):
+                for column in range(max(rect.left // cell_size, 0),
+                                    min((rect.right - 1) // cell_size + 1, camera.columns)):
+                    cell = (camera.y + row) * width + camera.x + column
+                    rects.append(self.paint(cell, self.drawn.get(cell)))
+        self.hud_rects = self.draw_hud()
+        self.hud_key = hud_key
+        return rects + self.hud_rects
+
+    def redraw(self, state, hud_key):
+        """
+        Resynchronizes the renderer with the state and repaints the whole window.
+        Returns:
+            list of pygame.Rect: The rectangle of the whole window.
+        """
+        self.state = state
+        camera = self.camera
+        if camera is None or (camera.board_width, camera.board_height) != (state.width, state.height):
+            self.camera = Camera(state.width, state.height, self.screen.get_width() // self.cell_size,
+                                 self.screen.get_height() // self.cell_size)
+        snake = state.snake
+        cells, names = snake_sprites(snake)
+        self.snake_cells = deque(cells)
+        self.pushes = snake.pushes
+        self.pops = snake.pops
+        self.generation = snake.generation
+        self.items = self.visible_items(state)
+        self.drawn = {}
+        for cell, image in self.items.values():
+            self.drawn[cell] = image
+        for cell, name in zip(cells, names):
+            if name:
+                self.drawn[cell] = self.images[name]
+        self.full = False
+        self.camera.follow(snake.head)
+        return self.repaint(hud_key)
+
+    def repaint(self, hud_key):
+        """
+        Repaints the whole window from the background chunks and the cells the camera shows.
+        Returns:
+            list of pygame.Rect: The rectangle of the whole window.
+        """
+        camera = self.camera
+        positions = camera.positions(self.cell_size)
+        drawn = self.drawn
+        if len(drawn) <= len(positions):
+            blits = [(image, positions[cell]) for cell, image in drawn.items() if cell in positions]
+        else:
+            blits = [(drawn[cell], position) for cell, position in positions.items() if cell in drawn]
+        window = self.background.blit(self.screen, camera)
+        self.screen.blits(blits, doreturn=False)
+        self.hud_rects = self.draw_hud()
+        self.hud_key = hud_key
+        return [window]
@@ -0,0 +1,296 @@
+"""
+Compact input logs and headless replay of recorded games.
+
+The engine is driven by a seeded random number generator and a tick counter, so a game is fully
+determined by its seed and by the inputs the player gave on each tick. An InputLog records just
+that, and replay() re-simulates a log on a SnakeEngine as fast as it can run, checking that it
+ends with the score and state hash the log claims.
+
+Log format, little-endian:
+    header  b'SNKR', version (1 byte), width and height (2 bytes each), seed (8 bytes)
+    inputs  one varint per input: (ticks since the previous input << 3) | code, where codes 0-3
+            turn to DIRECTIONS[code] on the next tick and CODE_CONTINUE puts a fresh snake on the
+            board after a game over; CODE_END closes the list
+    footer  final tick and final score as varints, then the 16-byte state hash
+
+    python replay.py replays/*.snkr --workers 4
+"""
+import argparse
+import hashlib
+import struct
+import sys
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import SnakeEngine, CELL_NUMBER, DIRECTIONS, DIRECTION_CODES
+
+MAGIC = b'SNKR'
+VERSION = 1
+HEADER = struct.Struct('<4sBHHQ')
+CODE_CONTINUE = 4
+CODE_END = 7
+# A replay costs a few microseconds a tick, so these bound the time one log can take to verify.
+# MAX_TICKS is over 19 hours of play at the fastest level; MAX_IDLE_TICKS is 25 minutes of a
+# snake standing still at the start of a game or after a continue, before any turn. Building the
+# engine for a MAX_BOARD-square board takes under a tenth of a second; the game uses 20 by 20.
+MAX_TICKS = 1_000_000
+MAX_IDLE_TICKS = 10_000
+MAX_BOARD = 1000
+
+ReplayResult = namedtuple('ReplayResult', 'ok state expected_score expected_hash reason')
+
+
+def state_hash(state):
+    """
+    Returns a 16-byte digest of everything that decides how a game goes on.
+    Args:
+        state (engine.GameState): The state to hash.
+    Returns:
+        bytes: The digest.
+    """
+    snake = state.snake
+    head = snake.head_index
+    cells = (snake.cells[head::-1] + snake.cells[:head:-1])[:snake.length]
+    digest = hashlib.blake2b(cells.tobytes(), digest_size=16)
+    items = [state.fruit.pos, state.big_fruit.pos, state.boom.pos, state.power_up.pos]
+    items.extend(obstacle.pos for obstacle in state.obstacles)
+    digest.update(repr((snake.head, snake.direction, snake.growth, items, state.score, state.big_score,
+                        state.level, state.tick, state.time_ms, state.start_ms, state.boom_active,
+                        state.boom_timer, state.big_fruit_active, state.big_fruit_timer,
+                        state.big_fruit_milestone, state.power_up_active, state.power_up_timer,
+                        state.done)).encode())
+    return digest.digest()
+
+
+def write_varint(out, value):
+    """
+    Appends an unsigned LEB128 varint to a bytearray.
+    """
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, offset):
+    """
+    Reads an unsigned LEB128 varint.
+    Returns:
+        tuple: The value and the offset after it.
+    """
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class InputLog:
+    """
+    Records the inputs of one game, from its seed to its end.
+    """
+
+    def __init__(self, seed, width=CELL_NUMBER, height=CELL_NUMBER):
+        """
+        Starts an empty log.
+        Args:
+            seed (int): Seed the game was started with.
+            width (int, optional): Board width in cells. Defaults to CELL_NUMBER.
+            height (int, optional): Board height in cells. Defaults to CELL_NUMBER.
+        """
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.inputs = bytearray()
+        self.last_tick = 0
+        self.count = 0
+
+    def add(self, tick, code):
+        """
+        Appends an input code given when tick ticks had run.
+        """
+        write_varint(self.inputs, (tick - self.last_tick) << 3 | code)
+        self.last_tick = tick
+        self.count += 1
+
+    def turn(self, tick, direction):
+        """
+        Records that the next step after tick ticks turns the snake to the given direction.
+        """
+        self.add(tick, DIRECTION_CODES[direction])
+
+    def continue_game(self, tick):
+        """
+        Records that the game was continued with a fresh snake after tick ticks.
+        """
+        self.add(tick, CODE_CONTINUE)
+
+    def encode(self, state):
+        """
+        Returns the log as bytes, closed with the final tick, score and hash of the given state.
+        Args:
+            state (engine.GameState): The state the game ended in.
+        """
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.width, self.height, self.seed))
+        out += self.inputs
+        write_varint(out, (state.tick - self.last_tick) << 3 | CODE_END)
+        write_varint(out, state.tick)
+        write_varint(out, state.score)
+        out += state_hash(state)
+        return bytes(out)
+
+    def save(self, path, state):
+        """
+        Writes the log to a file.
+        """
+        with open(path, 'wb') as f:
+            f.write(self.encode(state))
+
+
+def decode(data):
+    """
+    Parses a log.
+    Args:
+        data (bytes): The encoded log.
+    Returns:
+        tuple: (seed, width, height, ticks, codes, final_tick, score, state_hash), where ticks and codes
+        are arrays giving the tick and code of every input.
+    Raises:
+        ValueError: If the log is not a snake input log or an input falls after MAX_TICKS.
+    """
+    magic, version, width, height, seed = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a version %d snake input log' % VERSION)
+    offset = HEADER.size
+    ticks = array('l')
+    codes = array('b')
+    tick = 0
+    while True:
+        value, offset = read_varint(data, offset)
+        tick += value >> 3
+        code = value & 7
+        if code == CODE_END:
+            break
+        if tick > MAX_TICKS:
+            raise ValueError(f'input at tick {tick} is over the limit of {MAX_TICKS}')
+        ticks.append(tick)
+        codes.append(code)
+    final_tick, offset = read_varint(data, offset)
+    score, offset = read_varint(data, offset)
+    return seed, width, height, ticks, codes, final_tick, score, bytes(data[offset:offset + 16])
+
+
+def check_lengths(width, height, ticks, codes, final_tick):
+    """
+    Checks that a log's board size and tick counts are within the limits, without simulating it.
+    Returns:
+        str: Why the log is rejected, or None if it is within the limits.
+    """
+    if not (0 < width <= MAX_BOARD and 0 < height <= MAX_BOARD):
+        return f'board of {width} by {height} is outside the limit of {MAX_BOARD} by {MAX_BOARD}'
+    if final_tick > MAX_TICKS:
+        return f'final tick {final_tick} is over the limit of {MAX_TICKS}'
+    if ticks and ticks[-1] > final_tick:
+        return f'input at tick {ticks[-1]} after the final tick {final_tick}'
+    # The snake stands still from the start and after each continue until the next turn.
+    idle_from = 0
+    for tick, code in zip(ticks, codes):
+        if idle_from is not None and tick - idle_from > MAX_IDLE_TICKS:
+            break
+        idle_from = tick if code == CODE_CONTINUE else None
+    else:
+        if idle_from is None or final_tick - idle_from <= MAX_IDLE_TICKS:
+            return None
+    return f'snake standing still for more than {MAX_IDLE_TICKS} ticks'
+
+
+def replay(data, engine=None, on_tick=None):
+    """
+    Re-simulates a log headlessly and checks its claimed result.
+    Args:
+        data (bytes): The encoded log.
+        engine (SnakeEngine, optional): Engine to replay on, of the log's board size; it is reset to
+            the log's seed. Defaults to a new engine.
+        on_tick (callable, optional): Called with the state once the game has started and after every tick. Defaults to None.
+    Returns:
+        ReplayResult: Whether the replay matched, the final state, and the claimed score and hash.
+        Logs for a board wider or taller than MAX_BOARD, longer than MAX_TICKS, or that leave the
+        snake standing for more than MAX_IDLE_TICKS, fail without being simulated.
+    """
+    seed, width, height, ticks, codes, final_tick, score, expected_hash = decode(data)
+    reason = check_lengths(width, height, ticks, codes, final_tick)
+    if reason is not None:
+        return ReplayResult(False, None, score, expected_hash, reason)
+    if engine is None:
+        engine = SnakeEngine(width, height, seed)
+    else:
+        engine.reset(seed)
+    state = engine.state
+    if on_tick is None:
+        step = engine.step
+    else:
+        def step(action):
+            engine.step(action)
+            on_tick(state)
+        on_tick(state)
+    action = None
+    for tick, code in zip(ticks, codes):
+        while state.tick < tick:
+            if state.done:
+                return ReplayResult(False, state, score, expected_hash, f'ticks after game over at {state.tick}')
+            step(action)
+            action = None
+        if code == CODE_CONTINUE:
+            engine.continue_game()
+        else:
+            action = DIRECTIONS[code]
+    while state.tick < final_tick and not state.done:
+        step(action)
+        action = None
+    if state.tick != final_tick:
+        return ReplayResult(False, state, score, expected_hash, f'game ended at tick {state.tick}, not {final_tick}')
+    if state.score != score:
+        return ReplayResult(False, state, score, expected_hash, f'score {state.score}, log claims {score}')
+    if state_hash(state) != expected_hash:
+        return ReplayResult(False, state, score, expected_hash, 'final state differs')
+    return ReplayResult(True, state, score, expected_hash, None)
+
+
+def verify_file(path):
+    """
+    Replays a log file.
+    Returns:
+        tuple: (path, ok, reason).
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        result = replay(data)
+    except (ValueError, IndexError, struct.error) as error:
+        return path, False, f'unreadable log: {error}'
+    return path, result.ok, result.reason
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded games and verify their results.')
+    parser.add_argument('logs', nargs='+', help='input log files')
+    parser.add_argument('--workers', type=int, default=1, help='processes to replay with')
+    args = parser.parse_args()
+    if args.workers > 1:
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(verify_file, args.logs, chunksize=16))
+    else:
+        results = [verify_file(path) for path in args.logs]
+    failed = [(path, reason) for path, ok, reason in results if not ok]
+    for path, reason in failed:
+        print(f'{path}: FAILED ({reason})')
+    print(f'{len(results) - len(failed)} of {len(results)} logs verified')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+"""
+Versioned binary save files and a background autosaver.
+
+snapshot() copies everything needed to resume a game out of a SnakeEngine: the snake, every item,
+scores, level, clock, timers, the random generator's state and the order of the grid's free-cell
+index, which decides where the next item spawns. It only copies values, so it is cheap
+enough to take on the game thread between frames. encode() turns a snapshot into a compact binary
+save; restore() rebuilds the engine's state from a decoded one.
+
+Autosaver encodes and writes snapshots on a worker thread, so the frame loop never waits on the
+disk. It writes to a temporary file and renames it over the save, so a crash mid-write leaves the
+previous save intact.
+
+Save format, little-endian, version 1:
+    header     b'SNKS', version (1 byte), width and height (2 bytes each)
+    counters   FIELDS as signed 8-byte integers
+    snake      length (4 bytes), then the packed cells head first (4 bytes each)
+    items      fruit, big fruit, boom and power-up: x, y (2 bytes each, -1 for none), on-grid flag (1 byte)
+    obstacles  count (2 bytes), then x, y, on-grid flag for each
+    free cells the free-cell index order, one entry per board cell (4 bytes each)
+    rng        the 625 words of the generator state (4 bytes each)
+"""
+import os
+import queue
+import struct
+import threading
+import time
+from array import array
+from collections import deque
+
+from engine import DIRECTIONS, LEVEL_TICK_MS, STOP, GameState, Item
+
+MAGIC = b'SNKS'
+VERSION = 1
+HEADER = struct.Struct('<4sBHH')
+FIELDS = ('seed', 'head_x', 'head_y', 'direction_x', 'direction_y', 'growth', 'score', 'big_score',
+          'high_score', 'level', 'tick', 'time_ms', 'start_ms', 'boom_active', 'boom_timer',
+          'big_fruit_active', 'big_fruit_timer', 'big_fruit_milestone', 'power_up_active',
+          'power_up_timer', 'done')
+COUNTERS = struct.Struct('<%dq' % len(FIELDS))
+ITEM = struct.Struct('<hhB')
+RNG_WORDS = 625
+
+
+def item_record(grid, item):
+    """
+    Returns the (x, y, on_grid) record of an item.
+    """
+    if item.pos is None:
+        return -1, -1, 0
+    return item.pos[0], item.pos[1], int(grid.item_at(*item.pos) is item)
+
+
+def snapshot(engine):
+    """
+    Copies the state of a game out of the engine.
+    Args:
+        engine (SnakeEngine): The engine to copy from.
+    Returns:
+        dict: The snapshot; it shares nothing with the live game.
+    """
+    state = engine.state
+    snake = state.snake
+    grid = state.grid
+    head = snake.head_index
+    counters = {name: int(getattr(state, name)) for name in FIELDS[6:]}
+    counters.update(seed=engine.seed, head_x=snake.head[0], head_y=snake.head[1],
+                    direction_x=snake.direction[0], direction_y=snake.direction[1], growth=snake.growth)
+    return {
+        'width': state.width,
+        'height': state.height,
+        'counters': counters,
+        'cells': (snake.cells[head::-1] + snake.cells[:head:-1])[:snake.length],
+        'items': [item_record(grid, item) for item in (state.fruit, state.big_fruit, state.boom, state.power_up)],
+        'obstacles': [item_record(grid, obstacle) for obstacle in state.obstacles],
+        'free_cells': grid.free.cells[:],
+        'rng': engine.rng.getstate(),
+    }
+
+
+def encode(snap):
+    """
+    Serializes a snapshot.
+    Returns:
+        bytes: The save file contents.
+    """
+    version, words, gauss = snap['rng']
+    counters = snap['counters']
+    cells = array('i', snap['cells'])
+    parts = [HEADER.pack(MAGIC, VERSION, snap['width'], snap['height']),
+             COUNTERS.pack(*(counters[name] for name in FIELDS)),
+             struct.pack('<I', len(cells)), cells.tobytes()]
+    parts.extend(ITEM.pack(*record) for record in snap['items'])
+    parts.append(struct.pack('<H', len(snap['obstacles'])))
+    parts.extend(ITEM.pack(*record) for record in snap['obstacles'])
+    parts.append(snap['free_cells'].tobytes())
+    parts.append(array('I', words).tobytes())
+    return b''.join(parts)
+
+
+def decode(data):
+    """
+    Parses a save file.
+    Args:
+        data (bytes): The save file contents.
+    Returns:
+        dict: The snapshot.
+    Raises:
+        ValueError: If the data is not a save file of this version.
+    """
+    try:
+        return read(data)
+    except struct.error as error:
+        raise ValueError('truncated snake save file') from error
+
+
+def read(data):
+    """
+    Parses a save file for decode(), which turns the struct.error of a truncated one into ValueError.
+    """
+    magic, version, width, height = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a version %d snake save file' % VERSION)
+    offset = HEADER.size
+    counters = dict(zip(FIELDS, COUNTERS.unpack_from(data, offset)))
+    offset += COUNTERS.size
+    length, = struct.unpack_from('<I', data, offset)
+    offset += 4
+    cells = array('i')
+    cells.frombytes(data[offset:offset + 4 * length])
+    if len(cells) != length:
+        raise ValueError('truncated snake save file')
+    offset += 4 * length
+    items = []
+    for _ in range(4):
+        items.append(ITEM.unpack_from(data, offset))
+        offset += ITEM.size
+    count, = struct.unpack_from('<H', data, offset)
+    offset += 2
+    obstacles = []
+    for _ in range(count):
+        obstacles.append(ITEM.unpack_from(data, offset))
+        offset += ITEM.size
+    free_cells = array('i')
+    free_cells.frombytes(data[offset:offset + free_cells.itemsize * width * height])
+    if len(free_cells) != width * height:
+        raise ValueError('truncated snake save file')
+    offset += free_cells.itemsize * width * height
+    words = array('I')
+    words.frombytes(data[offset:offset + 4 * RNG_WORDS])
+    if len(words) != RNG_WORDS:
+        raise ValueError('truncated snake save file')
+    return {'width': width, 'height': height, 'counters': counters, 'cells': cells, 'items': items,
+            'obstacles': obstacles, 'free_cells': free_cells, 'rng': (3, tuple(words), None)}
+
+
+def check(snap):
+    """
+    Checks that every cell a snapshot refers to is on its board and that its counters are in range,
+    so that a damaged save is refused before anything is written to a grid.
+    Raises:
+        ValueError: If a snake cell, item, obstacle, free cell or counter is out of range.
+    """
+    width, height = snap['width'], snap['height']
+    size = width * height
+    cells = snap['cells']
+    if cells and not (0 <= min(cells) and max(cells) < size):
+        raise ValueError('a snake block of the save is off its board')
+    for x, y, on_grid in list(snap['items']) + list(snap['obstacles']):
+        if (x, y) != (-1, -1) and not (0 <= x < width and 0 <= y < height):
+            raise ValueError('an item of the save is off its board')
+    free_cells = snap['free_cells']
+    if len(free_cells) != size or (size and (min(free_cells) < 0 or max(free_cells) >= size)) \
+            or len(set(free_cells)) != size:
+        raise ValueError('the free cells of the save do not match its board')
+    counters = snap['counters']
+    if (counters['direction_x'], counters['direction_y']) not in DIRECTIONS + (STOP,):
+        raise ValueError('the snake of the save has no valid direction')
+    if counters['level'] not in LEVEL_TICK_MS or counters['growth'] < 0:
+        raise ValueError('the counters of the save are out of range')
+
+
+def place(grid, item, record):
+    """
+    Puts an item back where a snapshot recorded it.
+    """
+    x, y, on_grid = record
+    if x < 0:
+        item.pos = None
+    elif on_grid:
+        grid.place_item(item, (x, y))
+    else:
+        item.pos = (x, y)
+
+
+def restore(engine, snap):
+    """
+    Replaces the engine's game with the one in a snapshot.
+    Args:
+        engine (SnakeEngine): The engine to restore into. Its board must have the snapshot's size.
+        snap (dict): A snapshot from snapshot() or decode().
+    Returns:
+        GameState: The restored state.
+    Raises:
+        ValueError: If the snapshot is for another board size or refers to cells off its board.
+    """
+    if (snap['width'], snap['height']) != (engine.width, engine.height):
+        raise ValueError('the save is for a %dx%d board' % (snap['width'], snap['height']))
+    check(snap)
+    counters = snap['counters']
+    state = GameState(engine.width, engine.height)
+    width = state.width
+    snake = state.snake
+    snake.set_body((cell % width, cell // width) for cell in snap['cells'])
+    snake.head = (counters['head_x'], counters['head_y'])
+    snake.direction = (counters['direction_x'], counters['direction_y'])
+    snake.growth = counters['growth']
+    for item, record in zip((state.fruit, state.big_fruit, state.boom, state.power_up), snap['items']):
+        place(state.grid, item, record)
+    for record in snap['obstacles']:
+        obstacle = Item('obstacle')
+        state.obstacles.append(obstacle)
+        place(state.grid, obstacle, record)
+    free = state.grid.free
+    free_cells = snap['free_cells']
+    if not all(cell in free for cell in free_cells[:free.count]):
+        raise ValueError('the free cells of the save do not match its board')
+    free.cells = array('i', free_cells)
+    where = free.where
+    for position, cell in enumerate(free_cells):
+        where[cell] = position
+    for name in FIELDS[6:]:
+        setattr(state, name, counters[name])
+    for name in ('boom_active', 'big_fruit_active', 'power_up_active', 'done'):
+        setattr(state, name, bool(counters[name]))
+    state.schedule_timers()
+    engine.seed = counters['seed']
+    engine.rng.setstate(snap['rng'])
+    engine.state = state
+    engine.events = []
+    return state
+
+
+def write_atomic(path, data):
+    """
+    Writes a file so that readers see either the old contents or the new, never a partial write.
+    """
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def load(engine, path):
+    """
+    Restores a game from a save file.
+    Returns:
+        GameState: The restored state.
+    """
+    with open(path, 'rb') as f:
+        return restore(engine, decode(f.read()))
+
+
+class Autosaver:
+    """
+    Writes snapshots to a save file on a background thread.
+
+    Only the newest snapshot waiting to be written is kept: if the disk falls behind, older ones are
+    skipped rather than queued. The time each snapshot took on the game thread is kept in
+    snapshot_times, and the time each save took on the worker in save_times. An autosaver without
+    a path saves nothing and has no worker.
+    """
+
+    def __init__(self, path, samples=256):
+        """
+        Starts the worker thread.
+        Args:
+            path (str): The save file, or None to save nothing.
+            samples (int, optional): Number of recent save times kept. Defaults to 256.
+        """
+        self.path = path
+        self.queue = queue.Queue(maxsize=1)
+        self.snapshot_times = deque(maxlen=samples)
+        self.save_times = deque(maxlen=samples)
+        self.saves = 0
+        self.skipped = 0
+        self.error = None
+        self.thread = None
+        if path is not None:
+            self.thread = threading.Thread(target=self.run, name='autosave', daemon=True)
+            self.thread.start()
+
+    def save(self, engine):
+        """
+        Takes a snapshot of the engine's game and hands it to the worker.
+        """
+        if self.thread is None:
+            return
+        start = time.perf_counter()
+        snap = snapshot(engine)
+        self.snapshot_times.append(time.perf_counter() - start)
+        self.submit(snap)
+
+    def submit(self, snap):
+        """
+        Hands a snapshot to the worker without waiting for it to be written.
+        """
+        if self.thread is None:
+            return
+        while True:
+            try:
+                self.queue.put_nowait(snap)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.skipped += 1
+                except queue.Empty:
+                    pass
+
+    def run(self):
+        """
+        Encodes and writes snapshots as they arrive, until it gets None.
+        """
+        while True:
+            snap = self.queue.get()
+            try:
+                if snap is None:
+                    return
+                start = time.perf_counter()
+                write_atomic(self.path, encode(snap))
+                self.save_times.append(time.perf_counter() - start)
+                self.saves += 1
+            except OSError as error:
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """
+        Waits until every submitted snapshot has been written.
+        """
+        self.queue.join()
+
+    def close(self):
+        """
+        Writes the pending snapshot, if any, and stops the worker.
+        """
+        if self.thread is None:
+            return
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
@@ -0,0 +1,115 @@
+"""
+Screen state machine for the front-end.
+
+Each screen (menu, help, game, pause, game over) is a function that runs until the player leaves
+it and returns the name of the next screen, or None to quit. ScreenMachine runs them one after
+another, so moving between screens never nests calls or grows the stack, and it keeps the wall
+and CPU time spent in each screen.
+
+Screens with nothing to animate block in wait_event() instead of polling the event queue, so an
+idle menu or pause screen costs next to no CPU.
+"""
+import time
+
+import pygame
+
+# Longest a blocked screen sleeps between events. Python only runs signal handlers between
+# bytecodes, so without a timeout Ctrl+C would wait for the next window event.
+IDLE_WAKE_MS = 500
+
+
+def wait_event(timeout_ms=IDLE_WAKE_MS):
+    """
+    Blocks until an event arrives.
+    Args:
+        timeout_ms (int, optional): Longest to wait. Defaults to IDLE_WAKE_MS.
+    Returns:
+        pygame.event.Event: The event, or a NOEVENT event if the wait timed out.
+    """
+    return pygame.event.wait(timeout_ms)
+
+
+class ScreenUsage:
+    """
+    Time spent in one screen.
+
+    Attributes
+    ----------
+    visits : int
+        Number of times the screen was entered.
+    wall_seconds : float
+        Real time spent in the screen.
+    cpu_seconds : float
+        Process CPU time used while in the screen, by every thread.
+    """
+
+    def __init__(self):
+        self.visits = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    def cpu_percent(self):
+        """
+        Returns the CPU time used as a percentage of the real time spent, 100 being one core.
+        """
+        return 100 * self.cpu_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+
+class ScreenMachine:
+    """
+    Runs named screens until one of them returns None.
+    """
+
+    def __init__(self):
+        """
+        Initializes a machine with no screens.
+        """
+        self.screens = {}
+        self.usage = {}
+        self.current = None
+
+    def add(self, name, screen):
+        """
+        Registers a screen.
+        Args:
+            name (str): Name other screens return to go to it.
+            screen (callable): Runs the screen and returns the name of the next one, or None to quit.
+        """
+        self.screens[name] = screen
+        self.usage[name] = ScreenUsage()
+
+    def visit(self, name):
+        """
+        Runs one screen and records the time spent in it.
+        Returns:
+            str: The name of the next screen, or None to quit.
+        """
+        screen = self.screens[name]
+        usage = self.usage[name]
+        self.current = name
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            return screen()
+        finally:
+            usage.visits += 1
+            usage.wall_seconds += time.perf_counter() - wall
+            usage.cpu_seconds += time.process_time() - cpu
+            self.current = None
+
+    def run(self, name):
+        """
+        Runs screens from the given one until a screen returns None.
+        """
+        while name is not None:
+            name = self.visit(name)
+
+    def report(self):
+        """
+        Returns the time and CPU use of each screen entered so far as text.
+        """
+        lines = [f"{'screen':<10} {'visits':>6} {'seconds':>8} {'cpu %':>6}"]
+        for name, usage in self.usage.items():
+            if usage.visits:
+                lines.append(f'{name:<10} {usage.visits:>6} {usage.wall_seconds:>8.2f} {usage.cpu_percent():>6.1f}')
+        return '\n'.join(lines)
@@ -0,0 +1,390 @@
+"""
+Authoritative multiplayer server.
+
+Hosts matches over TCP without pygame: each room runs an Arena, the multi-snake rules built on
+engine.Snake, with up to ROOM_PLAYERS players on one board. A room ticks at the level speed of the
+game (LEVEL_TICK_MS: 150, 100 or 70 ms), taking the level from its longest snake, and every room
+runs as its own task on one asyncio event loop, so one process hosts hundreds of rooms.
+
+The rules are the game's movement, fruit, walls, obstacles (START_OBSTACLES of them) and level
+speed-up, played by several snakes at once, but not its boom, big fruit and power-up. Those are
+timed from one player's game: the boom comes every BOOM_INTERVAL seconds since that player's start
+or continue, the big fruit after every BIG_FRUIT_EVERY fruits that player ate, and the power-up
+makes that player's snake pass through what it hits. On a shared board they would need rules the
+single-player game does not have, such as whose clock a boom follows and what an invulnerable head
+does to another snake's body, so rooms leave them out rather than guess.
+
+Clients speak newline-delimited JSON. The first line a client sends picks its room:
+
+    {"room": "lobby", "name": "ann"}
+
+and the server answers with the player's slot and the board size:
+
+    {"slot": 0, "width": 20, "height": 20}
+
+After that the client sends turns, {"turn": "up"} (or down, left, right), whenever it likes. Turns
+are buffered per player, up to INPUT_BUFFER of them, and each tick applies the oldest one, so two
+quick key presses between ticks both count, as they would in the game. Every tick the room encodes
+its state once and writes the same line to every player:
+
+    {"tick": 12, "level": 1, "sent": 1700000000.123, "snakes": {"0": {"score": 2, "cells": [...]}},
+     "fruits": [...], "deaths": [[0, "wall"]]}
+
+Cells are packed as y * width + x, head first. "sent" is the server's wall clock when the tick was
+broadcast, for clients to measure latency. A dead snake comes back RESPAWN_TICKS later.
+
+Nothing a room does per tick waits on a client: writes go to the transport's buffer, and a client
+whose buffer has grown past WRITE_BUFFER_LIMIT misses ticks until it catches up. A line of
+{"stats": true} instead of a room gets the server's tick statistics back: how late ticks started
+against their schedule and how long their work took, as percentiles in milliseconds.
+
+    python server.py --port 8765
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+from arena import Arena
+from autopilot import percentile
+from engine import CELL_NUMBER, LEVEL_TICK_MS, START_OBSTACLES, UP, DOWN, LEFT, RIGHT, level_for_length
+
+ROOM_PLAYERS = 8
+INPUT_BUFFER = 3
+RESPAWN_TICKS = 10
+WRITE_BUFFER_LIMIT = 64 * 1024
+SAMPLES = 8192
+TURNS = {'up': UP, 'down': DOWN, 'left': LEFT, 'right': RIGHT}
+
+logger = logging.getLogger(__name__)
+
+
+class RoomFull(Exception):
+    """
+    Raised when a player joins a room whose slots are all taken.
+    """
+
+
+class Player:
+    """
+    A connection playing in a room.
+
+    Attributes
+    ----------
+    slot : int
+        Index of the player's snake in the room's arena.
+    name : str
+        Name the player joined with.
+    writer : asyncio.StreamWriter
+        Where the room's broadcasts go.
+    inputs : collections.deque
+        Turns received and not applied yet, oldest first.
+    skipped : int
+        Broadcasts not sent because the client was not reading them fast enough.
+    """
+    __slots__ = ('slot', 'name', 'writer', 'inputs', 'skipped')
+
+    def __init__(self, name, writer):
+        self.slot = None
+        self.name = name
+        self.writer = writer
+        self.inputs = deque(maxlen=INPUT_BUFFER)
+        self.skipped = 0
+
+
+class Room:
+    """
+    One match: an arena, its players and the task that ticks it.
+    """
+
+    def __init__(self, server, name, size, seed=None):
+        """
+        Initializes an empty room. Its snakes are off the board until players take their slots.
+        Args:
+            server (Server): The server hosting the room, which collects the tick statistics.
+            name (str): Name of the room.
+            size (int): Cells along each side of the board.
+            seed (int, optional): Seed for the arena. Defaults to None.
+        """
+        self.server = server
+        self.name = name
+        self.arena = Arena(size, size, snakes=ROOM_PLAYERS, fruits=ROOM_PLAYERS // 2, obstacles=START_OBSTACLES,
+                           respawn_ticks=None, seed=seed)
+        for contestant in self.arena.contestants:
+            self.arena.clear(contestant.snake)
+            contestant.alive = False
+        self.players = {}
+        self.task = None
+
+    def join(self, player):
+        """
+        Gives a player the first free slot and lays its snake on the board.
+        Raises:
+            RoomFull: If every slot is taken.
+        """
+        slot = next((slot for slot in range(ROOM_PLAYERS) if slot not in self.players), None)
+        if slot is None:
+            raise RoomFull(self.name)
+        player.slot = slot
+        self.players[slot] = player
+        self.arena.spawn_snake(self.arena.contestants[slot])
+
+    def leave(self, player):
+        """
+        Takes a player's snake off the board and frees its slot.
+        """
+        contestant = self.arena.contestants[player.slot]
+        self.arena.clear(contestant.snake)
+        contestant.alive = False
+        del self.players[player.slot]
+
+    def level(self):
+        """
+        Returns the level of the room's longest living snake.
+        """
+        lengths = [len(contestant.snake) for contestant in self.arena.contestants if contestant.alive]
+        return level_for_length(max(lengths)) if lengths else 1
+
+    def step(self):
+        """
+        Applies the oldest buffered turn of every player, advances the arena by one tick and brings
+        back the players' snakes that have been dead for RESPAWN_TICKS.
+        """
+        arena = self.arena
+        actions = {slot: player.inputs.popleft() for slot, player in self.players.items() if player.inputs}
+        arena.step(actions)
+        for slot in self.players:
+            contestant = arena.contestants[slot]
+            if not contestant.alive and arena.tick - contestant.respawn_tick >= RESPAWN_TICKS:
+                arena.spawn_snake(contestant)
+
+    def encode(self, level):
+        """
+        Returns the room's state as one line of JSON.
+        """
+        arena = self.arena
+        width = arena.width
+        snakes = {}
+        for slot in self.players:
+            contestant = arena.contestants[slot]
+            if contestant.alive:
+                snakes[slot] = {'score': contestant.score,
+                                'cells': [y * width + x for x, y in contestant.snake.blocks()]}
+        fruits = [fruit.pos[1] * width + fruit.pos[0] for fruit in arena.fruits if fruit.pos is not None]
+        state = {'tick': arena.tick, 'level': level, 'sent': time.time(), 'snakes': snakes, 'fruits': fruits,
+                 'deaths': arena.deaths}
+        return (json.dumps(state, separators=(',', ':')) + '\n').encode()
+
+    def broadcast(self, data):
+        """
+        Writes data to every player without waiting for it to be sent. A player whose unsent data
+        is over WRITE_BUFFER_LIMIT skips this broadcast.
+        """
+        for player in self.players.values():
+            transport = player.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+                player.skipped += 1
+                continue
+            player.writer.write(data)
+
+    async def run(self):
+        """
+        Ticks the room on schedule until its last player leaves. A tick that starts more than a whole
+        period late counts as an overrun, and the schedule restarts from it rather than running the
+        missed ticks back to back.
+        """
+        loop = asyncio.get_running_loop()
+        server = self.server
+        due = loop.time()
+        while self.players:
+            level = self.level()
+            due += LEVEL_TICK_MS[level] / 1000
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if not self.players:
+                break
+            started = loop.time()
+            late = started - due
+            if late > LEVEL_TICK_MS[level] / 1000:
+                server.overruns += 1
+                due = started
+            self.step()
+            self.broadcast(self.encode(level))
+            server.record(late, loop.time() - started)
+        self.server.close_room(self)
+
+    def run_done(self, task):
+        """
+        Logs the exception that stopped the room's tick task, if any, and closes the room and its
+        players' connections, so the next player to ask for the room gets a new one.
+        """
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.error('room %r stopped', self.name, exc_info=task.exception())
+        self.server.close_room(self)
+        for player in self.players.values():
+            player.writer.close()
+
+
+class Server:
+    """
+    The rooms of one process and the statistics of their ticks.
+    """
+
+    def __init__(self, size=CELL_NUMBER, seed=None):
+        """
+        Initializes a server with no rooms.
+        Args:
+            size (int, optional): Cells along each side of every room's board. Defaults to CELL_NUMBER.
+            seed (int, optional): Seed of the first room; the following rooms use the next seeds. Defaults to None.
+        """
+        self.size = size
+        self.seed = seed
+        self.rooms = {}
+        self.rooms_opened = 0
+        self.ticks = 0
+        self.overruns = 0
+        self.lateness = deque(maxlen=SAMPLES)
+        self.work = deque(maxlen=SAMPLES)
+
+    def room(self, name):
+        """
+        Returns the room with the given name, opening it and starting its tick task if needed.
+        """
+        room = self.rooms.get(name)
+        if room is None:
+            seed = None if self.seed is None else self.seed + self.rooms_opened
+            room = self.rooms[name] = Room(self, name, self.size, seed)
+            self.rooms_opened += 1
+        return room
+
+    def close_room(self, room):
+        """
+        Forgets a room whose players have all left.
+        """
+        if self.rooms.get(room.name) is room:
+            del self.rooms[room.name]
+
+    def record(self, late, work):
+        """
+        Records how late a tick started and how long its step and broadcast took, in seconds.
+        """
+        self.ticks += 1
+        self.lateness.append(late)
+        self.work.append(work)
+
+    def stats(self):
+        """
+        Returns the tick statistics: counts, and the percentiles of the lateness and work of the
+        last SAMPLES ticks in milliseconds.
+        """
+        stats = {'rooms': len(self.rooms), 'players': sum(len(room.players) for room in self.rooms.values()),
+                 'ticks': self.ticks, 'overruns': self.overruns}
+        for name, samples in (('late_ms', self.lateness), ('work_ms', self.work)):
+            values = sorted(value * 1000 for value in samples)
+            stats[name] = {key: percentile(values, fraction) if values else 0.0
+                           for key, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99), ('max', 1.0))}
+        return stats
+
+    async def handle(self, reader, writer):
+        """
+        Serves one connection: a stats request, or a player joining a room and sending turns until
+        it disconnects. Lines that are not a turn are ignored; a line longer than the stream's limit
+        ends the connection.
+        """
+        try:
+            hello = json.loads(await reader.readline())
+        except (ValueError, ConnectionError):
+            writer.close()
+            return
+        if not isinstance(hello, dict) or hello.get('stats'):
+            writer.write((json.dumps(self.stats()) + '\n').encode())
+            await writer.drain()
+            writer.close()
+            return
+        room = self.room(str(hello.get('room', 'lobby')))
+        player = Player(str(hello.get('name', 'player')), writer)
+        try:
+            room.join(player)
+        except RoomFull:
+            writer.write((json.dumps({'error': 'room full'}) + '\n').encode())
+            writer.close()
+            return
+        if room.task is None:
+            room.task = asyncio.create_task(room.run())
+            room.task.add_done_callback(room.run_done)
+        writer.write((json.dumps({'slot': player.slot, 'width': room.arena.width,
+                                  'height': room.arena.height}) + '\n').encode())
+        try:
+            async for line in reader:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                turn = message.get('turn') if isinstance(message, dict) else None
+                if isinstance(turn, str) and turn in TURNS:
+                    player.inputs.append(TURNS[turn])
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            room.leave(player)
+            writer.close()
+
+    def report(self):
+        """
+        Returns the statistics as one line of text.
+        """
+        stats = self.stats()
+        late = stats['late_ms']
+        work = stats['work_ms']
+        return (f"{stats['rooms']} rooms, {stats['players']} players, {stats['ticks']} ticks, "
+                f"{stats['overruns']} overruns, late p50 {late['p50']:.2f} p99 {late['p99']:.2f} ms, "
+                f"work p50 {work['p50']:.3f} p99 {work['p99']:.3f} ms")
+
+
+async def serve(host='127.0.0.1', port=8765, size=CELL_NUMBER, seed=None, report_every=None):
+    """
+    Runs a server until it is cancelled.
+    Args:
+        host (str, optional): Address to listen on. Defaults to '127.0.0.1'.
+        port (int, optional): Port to listen on. Defaults to 8765.
+        size (int, optional): Cells along each side of every board. Defaults to CELL_NUMBER.
+        seed (int, optional): Seed of the first room. Defaults to None.
+        report_every (float, optional): Seconds between statistics lines; None for none. Defaults to None.
+    """
+    server = Server(size, seed)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f'listening on {host}:{port}', flush=True)
+    async with listener:
+        serving = asyncio.create_task(listener.serve_forever())
+        try:
+            while True:
+                done, pending = await asyncio.wait({serving}, timeout=report_every)
+                if done:
+                    return serving.result()
+                print(server.report(), flush=True)
+        finally:
+            serving.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Host multiplayer snake matches over TCP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--board', type=int, default=CELL_NUMBER, help='cells along each side of every board')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the first room')
+    parser.add_argument('--report-every', type=float, default=None, help='seconds between statistics lines')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.board, args.seed, args.report_every))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Start-up timing for the game.
+
+StartupTimer records how long each start-up step takes (imports, each pygame subsystem, asset
+preloading, building the game) and when the first menu frame reached the screen, so cold-start
+latency can be tracked against a target.
+"""
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """
+    Collects the duration of named start-up phases and the time to the first menu frame.
+    """
+
+    def __init__(self, started=None):
+        """
+        Initializes the timer.
+        Args:
+            started (float, optional): time.perf_counter() value start-up is measured from. Defaults to now.
+        """
+        self.started = time.perf_counter() if started is None else started
+        self.phases = []
+        self.first_frame = None
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times the body of a with statement as the named phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def record(self, name, seconds):
+        """
+        Adds a phase that was timed elsewhere.
+        """
+        self.phases.append((name, seconds))
+
+    def mark_first_frame(self):
+        """
+        Records that the first frame is on the screen. Only the first call counts.
+        """
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter() - self.started
+
+    def report(self, target_ms=None):
+        """
+        Returns the phase timings and the time to the first frame as text.
+        Args:
+            target_ms (float, optional): Start-up budget; the report says whether it was met. Defaults to None.
+        """
+        lines = ['startup:']
+        for name, seconds in self.phases:
+            lines.append(f'  {name:<22} {seconds * 1000:8.1f} ms')
+        if self.first_frame is not None:
+            first_ms = self.first_frame * 1000
+            line = f'  {"first menu frame":<22} {first_ms:8.1f} ms'
+            if target_ms is not None:
+                line += f' ({"within" if first_ms <= target_ms else "OVER"} the {target_ms:.0f} ms target)'
+            lines.append(line)
+        return '\n'.join(lines)
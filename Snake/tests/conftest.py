@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The game's modules import each other by name from the Snake folder, as its scripts do.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,97 @@
+"""
+The delta stream: decoding every tick and seeking across keyframes.
+"""
+import pytest
+
+from delta import DeltaReader, DeltaWriter, on_board, flags_of
+from engine import SnakeEngine
+from tournament import greedy_policy
+
+KEYFRAME_EVERY = 25
+
+
+def view(decoder):
+    """
+    Returns what a decoded tick shows.
+    """
+    return (decoder.tick, list(decoder.cells), decoder.items, decoder.obstacles, decoder.score, decoder.level,
+            decoder.flags)
+
+
+def game_view(state):
+    """
+    Returns what the game shows, in the same form as view().
+    """
+    width = state.width
+    return (state.tick, [y * width + x for x, y in state.snake.blocks()],
+            [on_board(state.grid, item, width) for item in (state.fruit, state.big_fruit, state.boom, state.power_up)],
+            [on_board(state.grid, item, width) for item in state.obstacles], state.score, state.level, flags_of(state))
+
+
+@pytest.fixture(scope='module')
+def stream(tmp_path_factory):
+    """
+    A recorded game of 300 ticks, with game overs continued, and what it showed on every tick.
+    """
+    path = tmp_path_factory.mktemp('delta') / 'game.snkd'
+    engine = SnakeEngine(20, 20, seed=11)
+    choose = greedy_policy(engine, 11)
+    writer = DeltaWriter(str(path), 20, 20, KEYFRAME_EVERY)
+    views = {}
+    for _ in range(300):
+        state, reward, done = engine.step(choose())
+        writer.write(state)
+        views[state.tick] = game_view(state)
+        if done:
+            engine.continue_game()
+    writer.close()
+    return DeltaReader(path.read_bytes()), views
+
+
+def test_every_tick_decodes(stream):
+    reader, views = stream
+    ticks = 0
+    for decoder in reader:
+        assert view(decoder) == views[decoder.tick]
+        ticks += 1
+    assert ticks == len(views)
+
+
+def test_index_has_a_keyframe_every_period(stream):
+    reader, views = stream
+    assert [tick for tick, offset in reader.index][:3] == [1, 1 + KEYFRAME_EVERY, 1 + 2 * KEYFRAME_EVERY]
+
+
+@pytest.mark.parametrize('tick', [1, 2, KEYFRAME_EVERY, KEYFRAME_EVERY + 1, KEYFRAME_EVERY + 2, 137, 300])
+def test_seek_lands_on_the_tick(stream, tick):
+    reader, views = stream
+    assert view(reader.seek(tick)) == views[tick]
+
+
+def test_seek_backwards_after_forwards(stream):
+    reader, views = stream
+    reader.seek(250)
+    assert view(reader.seek(30)) == views[30]
+
+
+def test_seek_past_the_end(stream):
+    reader, views = stream
+    with pytest.raises(ValueError):
+        reader.seek(301)
+
+
+def test_seek_before_the_first_keyframe(stream):
+    reader, views = stream
+    with pytest.raises(ValueError):
+        reader.seek(0)
+
+
+def test_writer_refuses_a_new_game(tmp_path):
+    engine = SnakeEngine(20, 20, seed=11)
+    writer = DeltaWriter(str(tmp_path / 'games.snkd'), 20, 20, KEYFRAME_EVERY)
+    for _ in range(30):
+        writer.write(engine.step()[0])
+    engine.reset(12)
+    with pytest.raises(ValueError):
+        writer.write(engine.step()[0])
+    writer.close()
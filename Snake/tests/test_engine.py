@@ -0,0 +1,167 @@
+"""
+The engine's rules, checked against the behaviour of the original pygame game.
+"""
+import pytest
+
+from engine import (BIG_FRUIT_DURATION, BOOM_DURATION, BOOM_INTERVAL, EVENT_CRASH, EVENT_CRUNCH, LEVEL_TICK_MS,
+                    MAX_OBSTACLES, POWER_UP_DURATION, RIGHT, START_BODY, STOP, SnakeEngine, level_for_length)
+
+HEAD = START_BODY[0]
+AHEAD = (HEAD[0] + 1, HEAD[1])
+
+
+@pytest.fixture
+def engine():
+    """
+    A 20x20 game with its obstacles taken off the board, so the snake can move right safely.
+    """
+    engine = SnakeEngine(20, 20, seed=1)
+    for obstacle in engine.state.obstacles:
+        engine.state.grid.remove_item(obstacle)
+    return engine
+
+
+def put(engine, item, cell):
+    """
+    Moves an item onto a cell, moving whatever lay there out of the way.
+    """
+    grid = engine.state.grid
+    other = grid.item_at(*cell)
+    if other is not None and other is not item:
+        grid.remove_item(other)
+    grid.remove_item(item)
+    grid.place_item(item, cell)
+
+
+def wait_until(engine, time_ms):
+    """
+    Steps the game until its clock reaches time_ms.
+    """
+    while engine.state.time_ms < time_ms:
+        engine.step()
+
+
+def wait_before(engine, time_ms):
+    """
+    Steps the game while the next tick would still end before time_ms.
+    """
+    while engine.state.time_ms + engine.tick_ms < time_ms:
+        engine.step()
+
+
+def test_fruit_scores_grows_and_moves(engine):
+    state = engine.state
+    put(engine, state.fruit, AHEAD)
+    state, reward, done = engine.step(RIGHT)
+    assert (reward, state.score, state.big_score) == (1, 1, 1)
+    assert EVENT_CRUNCH in engine.events
+    assert state.fruit.pos != AHEAD
+    assert len(state.snake) == len(START_BODY) + 1
+
+
+def test_wall_ends_the_game(engine):
+    state = engine.state
+    engine.step(RIGHT)
+    while not state.done:
+        engine.step()
+    assert state.snake.head[0] == state.width
+    assert EVENT_CRASH in engine.events
+
+
+def test_obstacle_ends_the_game_without_power_up(engine):
+    put(engine, engine.state.obstacles[0], AHEAD)
+    state, reward, done = engine.step(RIGHT)
+    assert done
+    assert EVENT_CRASH in engine.events
+
+
+def test_power_up_lets_the_snake_through_obstacles_and_wears_off(engine):
+    state = engine.state
+    put(engine, state.power_up, AHEAD)
+    engine.step(RIGHT)
+    assert state.power_up_active
+    picked_ms = state.time_ms
+    obstacle = state.obstacles[0]
+    put(engine, obstacle, (HEAD[0] + 2, HEAD[1]))
+    state, reward, done = engine.step()
+    assert not done
+    assert obstacle.pos != state.snake.head
+    state.snake.direction = STOP
+    wait_before(engine, picked_ms + POWER_UP_DURATION + 1)
+    assert state.power_up_active
+    wait_until(engine, picked_ms + POWER_UP_DURATION + 1)
+    assert not state.power_up_active
+
+
+def test_boom_comes_every_interval_and_lasts_its_duration(engine):
+    state = engine.state
+    wait_before(engine, BOOM_INTERVAL * 1000)
+    assert not state.boom_active
+    wait_until(engine, BOOM_INTERVAL * 1000)
+    assert state.boom_active
+    assert state.grid.item_at(*state.boom.pos) is state.boom
+    wait_before(engine, (BOOM_INTERVAL + BOOM_DURATION) * 1000)
+    assert state.boom_active
+    wait_until(engine, (BOOM_INTERVAL + BOOM_DURATION) * 1000)
+    assert not state.boom_active
+    assert state.grid.item_at(*state.boom.pos) is not state.boom
+    wait_until(engine, 2 * BOOM_INTERVAL * 1000)
+    assert state.boom_active
+
+
+def test_big_fruit_after_five_fruits_scores_three(engine):
+    state = engine.state
+    state.big_score = 4
+    put(engine, state.fruit, AHEAD)
+    engine.step(RIGHT)
+    assert state.big_fruit_active
+    put(engine, state.big_fruit, (HEAD[0] + 2, HEAD[1]))
+    state, reward, done = engine.step()
+    assert reward == 3
+    assert not state.big_fruit_active
+    assert state.grid.item_at(*state.big_fruit.pos) is not state.big_fruit
+
+
+def test_big_fruit_expires(engine):
+    state = engine.state
+    state.big_score = 4
+    put(engine, state.fruit, AHEAD)
+    engine.step(RIGHT)
+    spawned_ms = state.time_ms
+    state.snake.direction = STOP
+    wait_before(engine, spawned_ms + BIG_FRUIT_DURATION)
+    assert state.big_fruit_active
+    wait_until(engine, spawned_ms + BIG_FRUIT_DURATION)
+    assert not state.big_fruit_active
+
+
+@pytest.mark.parametrize('score, level', [(0, 1), (5, 1), (6, 2), (10, 2), (11, 3), (50, 3)])
+def test_level_thresholds(score, level):
+    assert level_for_length(len(START_BODY) + score) == level
+
+
+def test_levels_speed_up_and_level_three_adds_obstacles(engine):
+    state = engine.state
+    state.snake.growth = 11
+    put(engine, state.fruit, (0, 0))
+    engine.step(RIGHT)
+    assert state.level == 3
+    assert engine.tick_ms == LEVEL_TICK_MS[3] < LEVEL_TICK_MS[2] < LEVEL_TICK_MS[1]
+    state.snake.direction = STOP
+    for _ in range(MAX_OBSTACLES):
+        engine.step()
+    assert len(state.obstacles) == MAX_OBSTACLES
+
+
+def test_same_seed_same_game():
+    games = []
+    for _ in range(2):
+        engine = SnakeEngine(20, 20, seed=7)
+        positions = []
+        for tick in range(200):
+            state, reward, done = engine.step(RIGHT if tick == 0 else None)
+            positions.append((state.fruit.pos, state.boom.pos, state.power_up.pos))
+            if done:
+                engine.continue_game()
+        games.append(positions)
+    assert games[0] == games[1]
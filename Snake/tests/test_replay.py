@@ -0,0 +1,121 @@
+"""
+Recording games as input logs and verifying them by replay.
+"""
+import pytest
+
+import replay
+from engine import DIRECTIONS, SnakeEngine
+from replay import CODE_END, HEADER, MAGIC, MAX_BOARD, MAX_IDLE_TICKS, MAX_TICKS, VERSION, InputLog, write_varint
+from tournament import greedy_policy
+
+
+def record(seed=3, ticks=400):
+    """
+    Plays a game with the greedy policy, continuing after each game over, and returns its log.
+    """
+    engine = SnakeEngine(20, 20, seed)
+    log = InputLog(seed, 20, 20)
+    choose = greedy_policy(engine, seed)
+    for _ in range(ticks):
+        action = choose()
+        if action is not None:
+            log.turn(engine.state.tick, action)
+        state, reward, done = engine.step(action)
+        if done:
+            log.continue_game(state.tick)
+            engine.continue_game()
+    return log.encode(engine.state), engine.state
+
+
+def forged(final_tick, inputs=(), score=0, size=20):
+    """
+    Returns a log with the given inputs, as (tick, code) pairs, and claims.
+    """
+    data = bytearray(HEADER.pack(MAGIC, VERSION, size, size, 1))
+    last = 0
+    for tick, code in inputs:
+        write_varint(data, (tick - last) << 3 | code)
+        last = tick
+    write_varint(data, CODE_END)
+    write_varint(data, final_tick)
+    write_varint(data, score)
+    return bytes(data + bytes(16))
+
+
+def test_recorded_game_verifies():
+    data, state = record()
+    result = replay.replay(data)
+    assert result.ok, result.reason
+    assert result.state.score == state.score
+    assert replay.state_hash(result.state) == replay.state_hash(state)
+
+
+def test_claimed_score_is_checked():
+    data, state = record()
+    seed, width, height, ticks, codes, final_tick, score, state_hash = replay.decode(data)
+    log = InputLog(seed, width, height)
+    for tick, code in zip(ticks, codes):
+        log.add(tick, code)
+    state.score += 5
+    result = replay.replay(log.encode(state))
+    assert not result.ok
+    assert 'score' in result.reason
+
+
+def test_tampered_input_fails():
+    data, state = record()
+    seed, width, height, ticks, codes, final_tick, score, state_hash = replay.decode(data)
+    log = InputLog(seed, width, height)
+    for index, (tick, code) in enumerate(zip(ticks, codes)):
+        if index == len(ticks) // 2 and code < len(DIRECTIONS):
+            code = (code + 2) % len(DIRECTIONS)
+        log.add(tick, code)
+    assert not replay.replay(log.encode(state)).ok
+
+
+def test_flipped_hash_byte_fails():
+    data, state = record()
+    tampered = data[:-1] + bytes([data[-1] ^ 1])
+    result = replay.replay(tampered)
+    assert not result.ok
+    assert result.reason == 'final state differs'
+
+
+def test_other_seed_fails():
+    data, state = record()
+    tampered = HEADER.pack(MAGIC, VERSION, 20, 20, 4) + data[HEADER.size:]
+    assert not replay.replay(tampered).ok
+
+
+@pytest.mark.parametrize('data, reason', [
+    (forged(10 ** 15), 'over the limit'),
+    (forged(MAX_TICKS + 1, [(3, 3)]), 'over the limit'),
+    (forged(MAX_IDLE_TICKS + 1), 'standing still'),
+    (forged(MAX_IDLE_TICKS + 500, [(3, 3), (100, 4), (MAX_IDLE_TICKS + 200, 3)]), 'standing still'),
+    (forged(10, [(20, 3)]), 'after the final tick'),
+    (forged(100, [(3, 3)], size=MAX_BOARD + 1), 'outside the limit'),
+    (forged(100, [(3, 3)], size=0), 'outside the limit'),
+], ids=['huge final tick', 'over max ticks', 'idle from the start', 'idle after a continue', 'input after the end',
+        'board too big', 'empty board'])
+def test_unbounded_logs_are_rejected_without_simulating(data, reason):
+    result = replay.replay(data)
+    assert not result.ok
+    assert reason in result.reason
+    assert result.state is None
+
+
+def test_verify_file_reports_unreadable_logs(tmp_path):
+    path = tmp_path / 'broken.snkr'
+    path.write_bytes(b'SNKR')
+    name, ok, reason = replay.verify_file(str(path))
+    assert not ok
+    assert reason.startswith('unreadable log')
+
+
+@pytest.mark.parametrize('tick', [MAX_TICKS + 1, 1 << 70])
+def test_verify_file_reports_inputs_past_the_limit(tmp_path, tick):
+    path = tmp_path / 'far.snkr'
+    path.write_bytes(forged(10, [(tick, 3)]))
+    name, ok, reason = replay.verify_file(str(path))
+    assert not ok
+    assert 'over the limit' in reason
@@ -0,0 +1,120 @@
+"""
+Save snapshots: encode, decode and restore round trips, damaged files and the autosaver.
+"""
+import random
+
+import pytest
+
+import savestate
+from engine import DIRECTIONS, SnakeEngine
+from replay import state_hash
+from tournament import greedy_policy
+
+
+def played(seed=5, ticks=300):
+    """
+    Returns an engine after some ticks of the greedy policy, with a boom and a power-up in play.
+    """
+    engine = SnakeEngine(20, 20, seed)
+    choose = greedy_policy(engine, seed)
+    for _ in range(ticks):
+        state, reward, done = engine.step(choose())
+        if done:
+            engine.continue_game()
+    return engine
+
+
+def test_round_trip_continues_the_same_game():
+    # 500 ticks span several booms, so the restored timers are checked as well.
+    engine = played()
+    data = savestate.encode(savestate.snapshot(engine))
+    copy = SnakeEngine(20, 20, seed=99)
+    state = savestate.restore(copy, savestate.decode(data))
+    assert state_hash(state) == state_hash(engine.state)
+    assert copy.seed == engine.seed
+    for _ in range(500):
+        original, reward, done = engine.step()
+        restored, reward, restored_done = copy.step()
+        assert state_hash(restored) == state_hash(original)
+        if done:
+            engine.continue_game()
+            copy.continue_game()
+
+
+def test_every_truncation_is_a_value_error():
+    data = savestate.encode(savestate.snapshot(played()))
+    for length in range(len(data)):
+        with pytest.raises(ValueError):
+            savestate.decode(data[:length])
+
+
+def test_short_free_cell_array_is_a_value_error():
+    snap = savestate.snapshot(played())
+    snap['free_cells'] = snap['free_cells'][:-1]
+    with pytest.raises(ValueError):
+        savestate.decode(savestate.encode(snap))
+
+
+@pytest.mark.parametrize('damage', [
+    lambda snap: snap['cells'].__setitem__(0, -1),
+    lambda snap: snap['cells'].__setitem__(1, 400),
+    lambda snap: snap['items'].__setitem__(0, (5, -1, 1)),
+    lambda snap: snap['obstacles'].__setitem__(0, (20, 3, 1)),
+    lambda snap: snap['free_cells'].__setitem__(0, snap['free_cells'][1]),
+    lambda snap: snap['free_cells'].__setitem__(0, -3),
+    lambda snap: snap['counters'].__setitem__('level', 9),
+    lambda snap: snap['counters'].__setitem__('direction_x', 2),
+], ids=['negative cell', 'cell past the end', 'item above the board', 'obstacle right of the board',
+        'repeated free cell', 'negative free cell', 'unknown level', 'unknown direction'])
+def test_out_of_range_records_are_refused(damage):
+    snap = savestate.snapshot(played())
+    damage(snap)
+    engine = SnakeEngine(20, 20)
+    with pytest.raises(ValueError):
+        savestate.restore(engine, savestate.decode(savestate.encode(snap)))
+
+
+def test_changed_bytes_restore_or_raise_value_error():
+    data = savestate.encode(savestate.snapshot(played()))
+    rng = random.Random(0)
+    for _ in range(500):
+        damaged = bytearray(data)
+        for _ in range(rng.randint(1, 4)):
+            damaged[rng.randrange(len(damaged))] = rng.randrange(256)
+        engine = SnakeEngine(20, 20)
+        try:
+            savestate.restore(engine, savestate.decode(bytes(damaged)))
+        except ValueError:
+            continue
+        # A save that restores must also play.
+        for _ in range(50):
+            state, reward, done = engine.step(rng.choice(DIRECTIONS))
+            if done:
+                break
+
+
+def test_other_board_size_is_refused():
+    snap = savestate.decode(savestate.encode(savestate.snapshot(played())))
+    with pytest.raises(ValueError):
+        savestate.restore(SnakeEngine(30, 30), snap)
+
+
+def test_autosaver_writes_a_loadable_file(tmp_path):
+    engine = played()
+    path = tmp_path / 'savegame.dat'
+    saver = savestate.Autosaver(str(path))
+    saver.save(engine)
+    saver.close()
+    assert saver.saves == 1
+    assert not (tmp_path / 'savegame.dat.tmp').exists()
+    state = savestate.load(SnakeEngine(20, 20), str(path))
+    assert state_hash(state) == state_hash(engine.state)
+
+
+def test_autosaver_without_a_path_saves_nothing(tmp_path):
+    saver = savestate.Autosaver(None)
+    saver.save(played())
+    saver.flush()
+    saver.close()
+    assert saver.saves == 0
+    assert saver.thread is None
@@ -0,0 +1,109 @@
+"""
+The multiplayer server's handling of client messages, over real localhost connections.
+"""
+import asyncio
+import json
+import logging
+
+from engine import LEFT
+from server import ROOM_PLAYERS, Room, Server
+
+
+def run(scenario):
+    """
+    Runs scenario(server, port) against a server listening on a free localhost port.
+    """
+    async def main():
+        server = Server(size=20, seed=0)
+        listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        try:
+            return await scenario(server, listener.sockets[0].getsockname()[1])
+        finally:
+            listener.close()
+            for room in list(server.rooms.values()):
+                if room.task is not None:
+                    room.task.cancel()
+    return asyncio.run(asyncio.wait_for(main(), 10))
+
+
+async def join(port, room='lobby'):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write((json.dumps({'room': room, 'name': 'test'}) + '\n').encode())
+    return reader, writer, json.loads(await reader.readline())
+
+
+async def read_to_end(reader):
+    try:
+        return await reader.read()
+    except ConnectionError:
+        return b''
+
+
+def test_malformed_turns_are_ignored(caplog):
+    async def scenario(server, port):
+        reader, writer, welcome = await join(port)
+        for line in (b'{"turn":[1]}', b'{"turn":{"a":1}}', b'{"turn":null}', b'{"turn":"sideways"}', b'[1,2]',
+                     b'"up"', b'not json', b'{"turn":"left"}'):
+            writer.write(line + b'\n')
+        await writer.drain()
+        ticks = [json.loads(await reader.readline())['tick'] for _ in range(3)]
+        room = server.rooms['lobby']
+        direction = room.arena.contestants[welcome['slot']].snake.direction
+        writer.close()
+        return ticks, direction
+    ticks, direction = run(scenario)
+    assert ticks == sorted(ticks) and len(set(ticks)) == 3
+    assert direction == LEFT
+    assert 'Unhandled exception' not in caplog.text
+
+
+def test_line_over_the_limit_ends_the_connection(caplog):
+    async def scenario(server, port):
+        reader, writer, welcome = await join(port)
+        writer.write(b'x' * 200_000 + b'\n')
+        await writer.drain()
+        await read_to_end(reader)
+        await asyncio.sleep(0.05)
+        return server.rooms.get('lobby')
+    room = run(scenario)
+    assert room is None or not room.players
+    assert 'Unhandled exception' not in caplog.text
+
+
+def test_bad_hello_gets_the_stats():
+    async def scenario(server, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'[1, 2]\n')
+        stats = json.loads(await reader.readline())
+        writer.close()
+        return stats
+    stats = run(scenario)
+    assert stats['rooms'] == 0 and 'late_ms' in stats
+
+
+def test_full_room_is_refused():
+    async def scenario(server, port):
+        players = [await join(port) for _ in range(ROOM_PLAYERS)]
+        reader, writer, answer = await join(port)
+        for player_reader, player_writer, welcome in players:
+            player_writer.close()
+        writer.close()
+        return [welcome['slot'] for _, _, welcome in players], answer
+    slots, answer = run(scenario)
+    assert slots == list(range(ROOM_PLAYERS))
+    assert answer == {'error': 'room full'}
+
+
+def test_failed_room_is_logged_and_closed(caplog, monkeypatch):
+    def fail(room):
+        raise RuntimeError('broken tick')
+    monkeypatch.setattr(Room, 'step', fail)
+
+    async def scenario(server, port):
+        reader, writer, welcome = await join(port)
+        await read_to_end(reader)
+        return server.rooms.get('lobby')
+    with caplog.at_level(logging.ERROR, logger='server'):
+        room = run(scenario)
+    assert room is None
+    assert "room 'lobby' stopped" in caplog.text and 'broken tick' in caplog.text
@@ -0,0 +1,62 @@
+"""
+The timer queue behind the engine's timed items.
+"""
+from timers import EXPIRE, SPAWN, TimerQueue
+
+
+def test_events_come_out_in_due_order():
+    timers = TimerQueue()
+    timers.schedule('c', 300)
+    timers.schedule('a', 100)
+    timers.schedule('b', 200)
+    timers.schedule('a2', 100)
+    assert timers.pop_due(99) == ()
+    assert timers.pop_due(250) == ['a', 'a2', 'b']
+    assert len(timers) == 1
+    assert timers.pop_due(1000) == ['c']
+    assert len(timers) == 0
+
+
+def test_schedule_replaces_the_event_of_the_same_key():
+    timers = TimerQueue()
+    timers.schedule((EXPIRE, 'power_up'), 100)
+    timers.schedule((EXPIRE, 'power_up'), 500)
+    assert len(timers) == 1
+    assert timers.pop_due(400) == []
+    assert timers.pop_due(500) == [(EXPIRE, 'power_up')]
+
+
+def test_rescheduling_earlier_fires_once():
+    timers = TimerQueue()
+    timers.schedule('boom', 500)
+    timers.schedule('boom', 100)
+    assert timers.pop_due(100) == ['boom']
+    assert timers.pop_due(1000) == []
+
+
+def test_cancel_forgets_the_event():
+    timers = TimerQueue()
+    timers.schedule((SPAWN, 'boom'), 100)
+    timers.schedule((EXPIRE, 'boom'), 100)
+    timers.cancel((EXPIRE, 'boom'))
+    timers.cancel('never scheduled')
+    assert (EXPIRE, 'boom') not in timers
+    assert timers.pop_due(100) == [(SPAWN, 'boom')]
+
+
+def test_cancelled_then_scheduled_again_fires():
+    timers = TimerQueue()
+    timers.schedule('big_fruit', 100)
+    timers.cancel('big_fruit')
+    timers.schedule('big_fruit', 200)
+    assert timers.pop_due(150) == []
+    assert timers.pop_due(200) == ['big_fruit']
+
+
+def test_nothing_due_leaves_many_timers_alone():
+    timers = TimerQueue()
+    for index in range(1000):
+        timers.schedule(index, 10_000 + index)
+    assert timers.pop_due(9_999) == ()
+    assert len(timers) == 1000
+    assert timers.pop_due(10_001) == [0, 1]
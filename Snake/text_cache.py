@@ -0,0 +1,102 @@
+"""
+Cache of rendered text surfaces and loaded fonts.
+
+The HUD, the menus and the messages show the same few strings over and over. TextCache loads each
+font once and keeps the surfaces rendered from it, keyed by (font, size, text, color), evicting the
+least recently used ones past a size limit, so redrawing unchanged text is a dictionary lookup and a blit.
+"""
+import time
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    """
+    Loads fonts once and renders text through an LRU cache of surfaces.
+
+    Attributes
+    ----------
+    hits : int
+        Number of render() calls answered from the cache.
+    misses : int
+        Number of render() calls that had to render the text.
+    render_seconds : float
+        Time spent rendering on misses.
+    saved_seconds : float
+        Rendering time the hits avoided, counting for each hit what its text took to render on the
+        miss. That render may also have rasterized new glyphs, so this is an upper estimate.
+    """
+
+    def __init__(self, max_surfaces=256):
+        """
+        Initializes an empty cache.
+        Args:
+            max_surfaces (int, optional): Number of rendered surfaces to keep. Defaults to 256.
+        """
+        self.max_surfaces = max_surfaces
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.render_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def font(self, path, size):
+        """
+        Returns the font at the given path and size, loading it on first use.
+        Args:
+            path (str): Path of a font file, or None for pygame's default font.
+            size (int): Font size in points.
+        Returns:
+            pygame.font.Font: The loaded font.
+        """
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(path, size)
+        return font
+
+    def render(self, text, color, path=None, size=36, antialias=True):
+        """
+        Returns a surface showing the text, rendering it only if it is not cached yet.
+        Args:
+            text (str): The text to render.
+            color (tuple): The RGB color of the text.
+            path (str, optional): Path of a font file, or None for pygame's default font. Defaults to None.
+            size (int, optional): Font size in points. Defaults to 36.
+            antialias (bool, optional): Whether to smooth the glyph edges. Defaults to True.
+        Returns:
+            pygame.Surface: The rendered text. It is shared, so callers must not draw on it.
+        """
+        key = (path, size, text, color, antialias)
+        entry = self.surfaces.get(key)
+        if entry is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[1]
+            return entry[0]
+        font = self.font(path, size)
+        start = time.perf_counter()
+        surface = font.render(text, antialias, color)
+        seconds = time.perf_counter() - start
+        self.render_seconds += seconds
+        self.misses += 1
+        self.surfaces[key] = (surface, seconds)
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def hit_rate(self):
+        """
+        Returns the share of render() calls answered from the cache.
+        """
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def report(self):
+        """
+        Returns a one-line summary of the cache counters.
+        """
+        return (f'text cache: {self.hits} hits, {self.misses} misses ({self.hit_rate():.1%} hit rate), '
+                f'{self.render_seconds * 1000:.1f} ms rendering, ~{self.saved_seconds * 1000:.1f} ms saved')
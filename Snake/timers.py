@@ -0,0 +1,81 @@
+"""
+Timer queue for the engine's timed events.
+
+Booms, big fruits and power-ups register the moment they spawn or expire as an event keyed by the
+simulated millisecond it falls due, and the engine pops the events that fell due on each tick.
+Events sit in a binary heap ordered by due time, so a tick costs one look at the top of the heap
+when nothing is due, and O(log n) per event that is, however many timers are running. An event
+is named by a key, such as (EXPIRE, item); scheduling a key again replaces its earlier event and
+cancelling forgets it. Replaced and cancelled events stay in the heap and are skipped when they
+reach the top.
+"""
+import heapq
+
+SPAWN = 'spawn'
+EXPIRE = 'expire'
+
+
+class TimerQueue:
+    """
+    Keyed events ordered by due time.
+
+    heap holds (due_ms, sequence, key) entries; live maps each scheduled key to the sequence number
+    of its current entry, so an entry whose sequence no longer matches is stale.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty queue.
+        """
+        self.heap = []
+        self.live = {}
+        self.sequence = 0
+
+    def __len__(self):
+        """
+        Returns the number of scheduled events.
+        """
+        return len(self.live)
+
+    def __contains__(self, key):
+        """
+        Checks whether an event is scheduled under the key.
+        """
+        return key in self.live
+
+    def schedule(self, key, due_ms):
+        """
+        Schedules an event, replacing any event already scheduled under the same key.
+        Args:
+            key (hashable): Names the event, e.g. (EXPIRE, item).
+            due_ms (int): Simulated time at which the event falls due.
+        """
+        self.sequence += 1
+        self.live[key] = self.sequence
+        heapq.heappush(self.heap, (due_ms, self.sequence, key))
+
+    def cancel(self, key):
+        """
+        Forgets the event scheduled under the key, if there is one.
+        """
+        self.live.pop(key, None)
+
+    def pop_due(self, now_ms):
+        """
+        Removes the events due at or before the given time.
+        Args:
+            now_ms (int): The current simulated time.
+        Returns:
+            list or tuple: Their keys, earliest first; events due at the same time in the order they were scheduled.
+        """
+        heap = self.heap
+        if not heap or heap[0][0] > now_ms:
+            return ()
+        live = self.live
+        keys = []
+        while heap and heap[0][0] <= now_ms:
+            due_ms, sequence, key = heapq.heappop(heap)
+            if live.get(key) == sequence:
+                del live[key]
+                keys.append(key)
+        return keys
@@ -0,0 +1,105 @@
+"""
+Fixed-timestep game clock.
+
+The game used to tick on pygame.time.set_timer() events, re-armed whenever the level changed, so
+tick cadence depended on the OS timer and on how busy the event queue was. FixedTimestep instead
+accumulates real elapsed time once per frame and hands out whole ticks of the current period, so
+the simulation advances the same way at any frame rate, and rendering happens once per frame
+whatever the tick period. It records how late each tick ran compared with its due time.
+"""
+import time
+from collections import deque
+
+
+class FixedTimestep:
+    """
+    Accumulator that turns elapsed real time into fixed-length game ticks.
+
+    Call advance() once per frame, then step() in a loop until it returns False, running one game
+    tick per True. Ticks due at the same frame run back to back; past max_steps, the rest of the
+    backlog is dropped rather than replayed, so a long stall does not fast-forward the game.
+    """
+
+    def __init__(self, period_ms, max_steps=5, samples=1024, time_source=time.perf_counter):
+        """
+        Initializes the clock with an empty accumulator.
+        Args:
+            period_ms (int): Length of a tick in milliseconds.
+            max_steps (int, optional): Most ticks to run in one frame. Defaults to 5.
+            samples (int, optional): Number of recent tick latencies kept. Defaults to 1024.
+            time_source (callable, optional): Returns the current time in seconds. Defaults to time.perf_counter.
+        """
+        self.period = period_ms / 1000
+        self.max_steps = max_steps
+        self.time_source = time_source
+        self.latencies = deque(maxlen=samples)
+        self.ticks = 0
+        self.dropped = 0
+        self.reset()
+
+    @property
+    def period_ms(self):
+        """
+        int: Length of a tick in milliseconds. Setting it takes effect from the next tick.
+        """
+        return round(self.period * 1000)
+
+    @period_ms.setter
+    def period_ms(self, period_ms):
+        self.period = period_ms / 1000
+
+    def reset(self):
+        """
+        Empties the accumulator and restarts timing from now, e.g. after a pause or a menu.
+        """
+        self.now = self.last = self.time_source()
+        self.accumulator = 0.0
+        self.pending = 0
+
+    def advance(self):
+        """
+        Adds the real time elapsed since the last call to the accumulator.
+        """
+        self.now = self.time_source()
+        self.accumulator += self.now - self.last
+        self.last = self.now
+        self.pending = 0
+
+    def step(self):
+        """
+        Takes one tick out of the accumulator if a whole tick is due.
+        Returns:
+            bool: Whether the caller should run a game tick now.
+        """
+        if self.accumulator < self.period:
+            return False
+        if self.pending == self.max_steps:
+            self.dropped += int(self.accumulator // self.period)
+            self.accumulator %= self.period
+            return False
+        self.accumulator -= self.period
+        self.pending += 1
+        self.ticks += 1
+        # The tick was due when the accumulator first held it; what is left over is how late it runs.
+        self.latencies.append(self.accumulator)
+        return True
+
+    def alpha(self):
+        """
+        Returns how far the current time is into the next tick, from 0 to 1, for interpolated drawing.
+        """
+        return min(self.accumulator / self.period, 1.0)
+
+    def jitter(self):
+        """
+        Summarizes how late recent ticks ran after their due time.
+        Returns:
+            dict: 'ticks', 'dropped', and the 'p50', 'p99' and 'max' latency in milliseconds.
+        """
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return {'ticks': self.ticks, 'dropped': self.dropped, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+        return {'ticks': self.ticks, 'dropped': self.dropped,
+                'p50': latencies[len(latencies) // 2] * 1000,
+                'p99': latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1000,
+                'max': latencies[-1] * 1000}
@@ -0,0 +1,252 @@
+"""
+Self-play tournament runner.
+
+Plays many headless games on SnakeEngine, the rules MAIN runs in the game, spread over a pool of
+worker processes. Seeds are handed out in batches: a worker plays every seed of its batch and sends
+the results back in one message, so the pool pays for one round trip per batch rather than per game.
+While the games run, the parent prints the running totals: games per second and the mean and
+percentiles of the final score, length and level.
+
+A game ends at game over or after max_ticks. Each result holds the seed, the final score, level and
+length, the ticks played, the game clock duration and the wall time it took to simulate.
+
+With --scaling the same games are played with 1, 2, 4, ... workers up to --workers (by default the
+number of cores), and a table of games per second, speed-up and efficiency against one worker is
+printed.
+
+    python tournament.py --games 2000 --policy greedy --workers 4
+    python tournament.py --games 500 --policy autopilot --scaling
+"""
+import argparse
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from autopilot import Autopilot, percentile
+from engine import SnakeEngine, CELL_NUMBER, DIRECTIONS
+
+GameResult = namedtuple('GameResult', 'seed score level length ticks duration_ms seconds')
+
+TURN_CHANCE = 0.2
+
+
+def random_policy(engine, seed):
+    """
+    Returns a policy that keeps going and turns at random on TURN_CHANCE of the ticks.
+    """
+    rng = random.Random(seed)
+
+    def choose():
+        return rng.choice(DIRECTIONS) if rng.random() < TURN_CHANCE else None
+    return choose
+
+
+def greedy_policy(engine, seed):
+    """
+    Returns a policy that heads for the fruit along whichever axis is further off, and avoids the
+    walls, the items it would crash into and its own body one step ahead.
+    """
+    def choose():
+        state = engine.state
+        snake = state.snake
+        x, y = snake.head
+        fruit = state.fruit.pos
+        if fruit is None:
+            preferred = [snake.direction]
+        else:
+            dx, dy = fruit[0] - x, fruit[1] - y
+            horizontal = (1 if dx > 0 else -1, 0) if dx else None
+            vertical = (0, 1 if dy > 0 else -1) if dy else None
+            preferred = [d for d in ((horizontal, vertical) if abs(dx) >= abs(dy) else (vertical, horizontal)) if d]
+        grid = state.grid
+        tail = snake.block(-1) if not snake.growth else None
+        for direction in preferred + list(DIRECTIONS):
+            cx, cy = x + direction[0], y + direction[1]
+            if (cx, cy) == snake.block(1) or not (0 <= cx < state.width and 0 <= cy < state.height):
+                continue
+            item = grid.item_at(cx, cy)
+            if grid.snake[cy * state.width + cx] and (cx, cy) != tail:
+                continue
+            if item is not None and item.kind in ('obstacle', 'boom') and not state.power_up_active:
+                continue
+            return direction
+        return None
+    return choose
+
+
+def autopilot_policy(engine, seed, budget_ms=1.0):
+    """
+    Returns a policy that asks an Autopilot for every move.
+    """
+    return Autopilot(engine, budget_ms, samples=1).decide
+
+
+POLICIES = {'random': random_policy, 'greedy': greedy_policy, 'autopilot': autopilot_policy}
+
+
+def play(seed, policy='greedy', size=CELL_NUMBER, max_ticks=20000):
+    """
+    Plays one game to game over or max_ticks.
+    Args:
+        seed (int): Seed of the game and of the policy.
+        policy (str, optional): Name of a policy in POLICIES. Defaults to 'greedy'.
+        size (int, optional): Cells along each side of the board. Defaults to CELL_NUMBER.
+        max_ticks (int, optional): Ticks after which an unfinished game is stopped. Defaults to 20000.
+    Returns:
+        GameResult: How the game ended.
+    """
+    start = time.perf_counter()
+    engine = SnakeEngine(size, size, seed)
+    choose = POLICIES[policy](engine, seed)
+    step = engine.step
+    state = engine.state
+    while not state.done and state.tick < max_ticks:
+        step(choose())
+    return GameResult(seed, state.score, state.level, len(state.snake), state.tick,
+                      state.time_ms - state.start_ms, time.perf_counter() - start)
+
+
+def play_batch(seeds, policy, size, max_ticks):
+    """
+    Plays a game for each seed. This is what a worker process runs for one task.
+    Returns:
+        list: A GameResult per seed, in the same order.
+    """
+    return [play(seed, policy, size, max_ticks) for seed in seeds]
+
+
+class Tally:
+    """
+    Running totals of the finished games of a tournament.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty tally.
+        """
+        self.results = []
+        self.started = time.perf_counter()
+
+    def add(self, results):
+        """
+        Adds a batch of GameResults.
+        """
+        self.results.extend(results)
+
+    def games_per_second(self):
+        """
+        Returns the number of games finished per second of wall time since the tally was created.
+        """
+        return len(self.results) / max(time.perf_counter() - self.started, 1e-9)
+
+    def summary(self):
+        """
+        Returns the games per second and the mean and percentiles of the scores, lengths and levels as text.
+        """
+        if not self.results:
+            return '0 games'
+        parts = [f'{len(self.results)} games, {self.games_per_second():.1f} games/s']
+        for name in ('score', 'length', 'level'):
+            values = sorted(getattr(result, name) for result in self.results)
+            parts.append(f'{name} mean {sum(values) / len(values):.1f} p50 {percentile(values, 0.5)} '
+                         f'p90 {percentile(values, 0.9)} p99 {percentile(values, 0.99)} max {values[-1]}')
+        return ', '.join(parts)
+
+
+def run(games, workers=1, policy='greedy', size=CELL_NUMBER, max_ticks=20000, batch=16, first_seed=0,
+        report_every=1.0, out=print):
+    """
+    Plays a tournament and reports its progress.
+    Args:
+        games (int): Number of games; they use seeds first_seed, first_seed + 1, ...
+        workers (int, optional): Worker processes. With 1 the games run in this process. Defaults to 1.
+        policy (str, optional): Name of a policy in POLICIES. Defaults to 'greedy'.
+        size (int, optional): Cells along each side of the board. Defaults to CELL_NUMBER.
+        max_ticks (int, optional): Ticks after which an unfinished game is stopped. Defaults to 20000.
+        batch (int, optional): Seeds per task sent to a worker. Defaults to 16.
+        first_seed (int, optional): Seed of the first game. Defaults to 0.
+        report_every (float, optional): Seconds between progress lines; None for none. Defaults to 1.
+        out (callable, optional): Where progress lines go. Defaults to print.
+    Returns:
+        Tally: Every result, in the order the batches finished.
+    """
+    seeds = range(first_seed, first_seed + games)
+    batches = [seeds[start:start + batch] for start in range(0, games, batch)]
+    tally = Tally()
+    next_report = time.perf_counter() + (report_every or 0)
+
+    def collect(results):
+        nonlocal next_report
+        tally.add(results)
+        if report_every is not None and time.perf_counter() >= next_report:
+            out(tally.summary())
+            next_report = time.perf_counter() + report_every
+
+    if workers <= 1:
+        for seeds_of_batch in batches:
+            collect(play_batch(seeds_of_batch, policy, size, max_ticks))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(play_batch, seeds_of_batch, policy, size, max_ticks)
+                       for seeds_of_batch in batches]
+            for future in as_completed(futures):
+                collect(future.result())
+    return tally
+
+
+def worker_counts(cores):
+    """
+    Returns 1, 2, 4, ... up to and including the given number of cores.
+    """
+    counts = []
+    count = 1
+    while count < cores:
+        counts.append(count)
+        count *= 2
+    return counts + [cores]
+
+
+def scaling_report(games, policy, size, max_ticks, batch, first_seed, cores=None):
+    """
+    Plays the same games with more and more workers and returns the games per second, speed-up
+    and efficiency of each as a table.
+    Args:
+        cores (int, optional): Most workers to try. Defaults to the number of cores.
+    """
+    cores = cores or os.cpu_count() or 1
+    lines = [f"{'workers':>7} {'games/s':>9} {'speed-up':>9} {'efficiency':>11}"]
+    base = None
+    for workers in worker_counts(cores):
+        rate = run(games, workers, policy, size, max_ticks, batch, first_seed, report_every=None).games_per_second()
+        base = base or rate
+        lines.append(f'{workers:>7} {rate:>9.1f} {rate / base:>9.2f} {rate / base / workers:>10.0%}')
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play many headless games over a pool of worker processes.')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes, or the most to try with --scaling (default: one per core)')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='greedy')
+    parser.add_argument('--size', type=int, default=CELL_NUMBER, help='cells along each side of the board')
+    parser.add_argument('--max-ticks', type=int, default=20000, help='ticks after which a game is stopped')
+    parser.add_argument('--batch', type=int, default=16, help='games per task sent to a worker')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--report-every', type=float, default=1.0, help='seconds between progress lines')
+    parser.add_argument('--scaling', action='store_true',
+                        help='play the games with 1, 2, 4, ... workers up to --workers and compare')
+    args = parser.parse_args()
+    if args.scaling:
+        print(scaling_report(args.games, args.policy, args.size, args.max_ticks, args.batch, args.seed,
+                             args.workers))
+        return
+    tally = run(args.games, args.workers, args.policy, args.size, args.max_ticks, args.batch, args.seed,
+                args.report_every)
+    print(tally.summary())
+
+
+if __name__ == '__main__':
+    main()